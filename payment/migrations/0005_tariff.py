@@ -0,0 +1,50 @@
+# Generated by Django 5.0 on 2026-10-19 06:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0004_alter_payment_options"),
+        ("taxi", "0007_cityhourlystats_citystats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tariff",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_hour", models.PositiveSmallIntegerField(default=0)),
+                ("end_hour", models.PositiveSmallIntegerField(default=24)),
+                ("base_fare", models.PositiveIntegerField(default=0)),
+                (
+                    "price_per_meter",
+                    models.DecimalField(
+                        decimal_places=3, default=1, max_digits=8
+                    ),
+                ),
+                ("minimum_fare", models.PositiveIntegerField(default=0)),
+                (
+                    "city",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tariffs",
+                        to="taxi.city",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["city", "start_hour"],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0 on 2026-10-19 06:57
+
+import django.utils.timezone
+import django_enum.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0005_tariff"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payment",
+            name="created",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="status",
+            field=django_enum.fields.EnumCharField(
+                choices=[
+                    ("1", "Pending"),
+                    ("2", "Paid"),
+                    ("3", "Canceled"),
+                    ("4", "Expired"),
+                ],
+                max_length=1,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["status", "created"], name="payment_status_created_idx"
+            ),
+        ),
+    ]
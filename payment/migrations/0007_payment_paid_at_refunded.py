@@ -0,0 +1,40 @@
+# Generated by Django 5.0 on 2026-10-19 07:50
+
+import django_enum.fields
+from django.db import migrations, models
+
+
+def backfill_paid_at(apps, schema_editor):
+    # The payment time was not recorded, creation is the closest to it.
+    Payment = apps.get_model("payment", "Payment")
+    Payment.objects.filter(status="2").update(paid_at=models.F("created"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0006_payment_created_expired"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payment",
+            name="paid_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="status",
+            field=django_enum.fields.EnumCharField(
+                choices=[
+                    ("1", "Pending"),
+                    ("2", "Paid"),
+                    ("3", "Canceled"),
+                    ("4", "Expired"),
+                    ("5", "Refunded"),
+                ],
+                max_length=1,
+            ),
+        ),
+        migrations.RunPython(backfill_paid_at, migrations.RunPython.noop),
+    ]
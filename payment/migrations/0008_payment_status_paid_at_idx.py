@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0007_payment_paid_at_refunded"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["status", "paid_at"], name="payment_status_paid_at_idx"
+            ),
+        ),
+    ]
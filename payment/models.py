@@ -1,7 +1,8 @@
 from django.db import models
+from django.utils import timezone
 from django_enum import EnumField
 
-from taxi.models import Order
+from taxi.models import City, Order
 
 
 class Payment(models.Model):
@@ -9,6 +10,8 @@ class Payment(models.Model):
         pending = "1", "Pending"
         paid = "2", "Paid"
         canceled = "3", "Canceled"
+        expired = "4", "Expired"
+        refunded = "5", "Refunded"
 
     status = EnumField(StatusEnum)
     session_url = models.URLField(max_length=500, null=True, blank=True)
@@ -17,6 +20,49 @@ class Payment(models.Model):
     order = models.OneToOneField(
         Order, on_delete=models.CASCADE, related_name="payment"
     )
+    created = models.DateTimeField(default=timezone.now)
+    paid_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["status"]
+        indexes = [
+            models.Index(
+                fields=["status", "created"],
+                name="payment_status_created_idx",
+            ),
+            models.Index(
+                fields=["status", "paid_at"],
+                name="payment_status_paid_at_idx",
+            ),
+        ]
+
+
+class Tariff(models.Model):
+    """
+    Fare for a city during the local hours [start_hour, end_hour).
+    A band with start_hour > end_hour wraps around midnight.
+    Amounts are in cents, like Stripe's unit_amount.
+    """
+
+    city = models.ForeignKey(
+        City, on_delete=models.CASCADE, related_name="tariffs"
+    )
+    start_hour = models.PositiveSmallIntegerField(default=0)
+    end_hour = models.PositiveSmallIntegerField(default=24)
+    base_fare = models.PositiveIntegerField(default=0)
+    price_per_meter = models.DecimalField(
+        max_digits=8, decimal_places=3, default=1
+    )
+    minimum_fare = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["city", "start_hour"]
+
+    def __str__(self) -> str:
+        return f"{self.city}: {self.start_hour}-{self.end_hour}"
+
+    @property
+    def hours(self) -> list[int]:
+        if self.start_hour < self.end_hour:
+            return list(range(self.start_hour, self.end_hour))
+        return list(range(self.start_hour, 24)) + list(range(0, self.end_hour))
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from payment.models import Payment
+from payment.models import Payment, Tariff
 from taxi.serializers import OrderListSerializer, OrderDetailSerializer
 
 
@@ -26,3 +26,53 @@ class PaymentListSerializer(PaymentSerializer):
     class Meta:
         model = Payment
         fields = ("id", "status", "order", "money_to_pay")
+
+
+class TariffSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tariff
+        fields = (
+            "id",
+            "city",
+            "start_hour",
+            "end_hour",
+            "base_fare",
+            "price_per_meter",
+            "minimum_fare",
+        )
+
+    def validate(self, attrs: dict) -> dict:
+        start_hour = attrs.get(
+            "start_hour", getattr(self.instance, "start_hour", 0)
+        )
+        end_hour = attrs.get(
+            "end_hour", getattr(self.instance, "end_hour", 24)
+        )
+        if start_hour > 23 or end_hour > 24 or start_hour == end_hour:
+            raise serializers.ValidationError(
+                "Hours must form a band within 0-24"
+            )
+        city = attrs.get("city", getattr(self.instance, "city", None))
+        hours = set(Tariff(start_hour=start_hour, end_hour=end_hour).hours)
+        others = Tariff.objects.filter(city=city)
+        if self.instance is not None:
+            others = others.exclude(id=self.instance.id)
+        for other in others:
+            if hours.intersection(other.hours):
+                raise serializers.ValidationError(
+                    f"Hours overlap the {other.start_hour}-{other.end_hour} "
+                    "tariff of this city"
+                )
+        return attrs
+
+
+class TariffQuoteItemSerializer(serializers.Serializer):
+    city = serializers.IntegerField()
+    distance = serializers.IntegerField(min_value=0)
+    hour = serializers.IntegerField(min_value=0, max_value=23, required=False)
+
+
+class TariffQuoteSerializer(serializers.Serializer):
+    orders = TariffQuoteItemSerializer(
+        many=True, allow_empty=False, max_length=10000
+    )
@@ -0,0 +1,160 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+SESSION_PATH = re.compile(r"^/v1/checkout/sessions/([\w-]+)$")
+EXPIRE_PATH = re.compile(r"^/v1/checkout/sessions/([\w-]+)/expire$")
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    server: "FakeStripe"
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        params = dict(parse_qsl(self.rfile.read(length).decode()))
+        self.reply(
+            *self.server.handle_call(
+                self.path, params, self.headers.get("Idempotency-Key")
+            )
+        )
+
+    def do_GET(self) -> None:
+        self.reply(*self.server.handle_call(self.path, {}, None))
+
+    def reply(self, code: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Request-Id", f"req_{time.time_ns()}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class FakeStripe(ThreadingHTTPServer):
+    """
+    Local stand-in for the checkout session endpoints, for load tests
+    and tests. Adds ``latency`` to every call and fails ``error_rate``
+    of them with a 500, or exactly the next calls after ``fail_next``.
+    Idempotency keys replay the first successful answer like Stripe.
+    Point STRIPE_API_BASE at ``api_base``.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+    ) -> None:
+        super().__init__(address, FakeStripeHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.failures = []
+        self.sessions = {}
+        self.refunds = []
+        self.replies = {}
+        self.calls = []
+
+    @property
+    def api_base(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail_next(self, count: int = 1, status: int = 500) -> None:
+        with self.lock:
+            self.failures += [status] * count
+
+    def pay(self, session_id: str) -> None:
+        """Complete the session as if the customer paid."""
+        with self.lock:
+            self.sessions[session_id].update(
+                status="complete",
+                url=None,
+                payment_intent=f"pi_{session_id}",
+            )
+
+    def handle_call(
+        self, path: str, params: dict, idempotency_key: str | None
+    ) -> tuple[int, dict]:
+        with self.lock:
+            self.calls.append((path, idempotency_key))
+        time.sleep(self.latency)
+        with self.lock:
+            if self.failures or random.random() < self.error_rate:
+                status = self.failures.pop(0) if self.failures else 500
+                return status, {
+                    "error": {
+                        "type": "api_error",
+                        "message": "Injected failure",
+                    }
+                }
+            if idempotency_key in self.replies:
+                return self.replies[idempotency_key]
+            reply = self.route(path, params)
+            if idempotency_key and reply[0] == 200:
+                self.replies[idempotency_key] = reply
+            return reply
+
+    def route(self, path: str, params: dict) -> tuple[int, dict]:
+        if path == "/v1/checkout/sessions":
+            session_id = f"cs_test_{len(self.sessions) + 1}"
+            self.sessions[session_id] = {
+                "id": session_id,
+                "object": "checkout.session",
+                "status": "open",
+                "mode": params.get("mode"),
+                "url": f"{self.api_base}/pay/{session_id}",
+                "payment_intent": None,
+                "expires_at": int(params.get("expires_at") or 0) or None,
+            }
+            return 200, self.sessions[session_id]
+        if path == "/v1/refunds":
+            refund = {
+                "id": f"re_test_{len(self.refunds) + 1}",
+                "object": "refund",
+                "payment_intent": params.get("payment_intent"),
+                "status": "succeeded",
+            }
+            self.refunds.append(refund)
+            return 200, refund
+        match = SESSION_PATH.match(path)
+        if match and match.group(1) in self.sessions:
+            return 200, self.sessions[match.group(1)]
+        match = EXPIRE_PATH.match(path)
+        if match and match.group(1) in self.sessions:
+            session = self.sessions[match.group(1)]
+            if session["status"] != "open":
+                return 400, {
+                    "error": {
+                        "type": "invalid_request_error",
+                        "message": "Only open sessions can be expired.",
+                    }
+                }
+            session.update(status="expired", url=None)
+            return 200, session
+        return 404, {
+            "error": {
+                "type": "invalid_request_error",
+                "message": f"Unrecognized request URL ({path})",
+            }
+        }
+
+    def handle_error(self, request: object, client_address: tuple) -> None:
+        # Clients that timed out have closed the connection already.
+        pass
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
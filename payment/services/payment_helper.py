@@ -1,51 +1,75 @@
+from datetime import timedelta
+
 import stripe
 from django.conf import settings
-from django.db import transaction
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
 
 from payment.models import Payment
 from payment.serializers import PaymentSerializer
+from payment.services.stripe_gateway import StripeUnavailable, stripe_gateway
+from payment.services.tariffs import tariff_book
 from taxi.models import Order
-
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
-PRICE_PER_METER = 1
+from taxi.services.demand import demand_counters
 
 
 def payment_helper(order: Order) -> Response:
-    money_to_pay = order.distance * PRICE_PER_METER
-    with transaction.atomic():
-        try:
-            checkout_session = stripe.checkout.Session.create(
-                payment_method_types=["card"],
-                line_items=[
+    money_to_pay = tariff_book.quote(
+        order.city_id,
+        order.distance,
+        order.date_created,
+        multiplier=demand_counters.surge_multiplier(order.city_id),
+    )
+    try:
+        checkout_session = stripe_gateway.create_checkout_session(
+            {
+                "payment_method_types": ["card"],
+                "line_items": [
                     {
                         "price_data": {
                             "currency": "usd",
-                            "product_data": {"name": order},
+                            "product_data": {"name": str(order)},
                             "unit_amount": money_to_pay,
                         },
                         "quantity": 1,
                     },
                 ],
-                mode="payment",
-                success_url=settings.SITE_DOMAIN
-                + "api/v1/payment/success?session_id={CHECKOUT_SESSION_ID}",
-                cancel_url=settings.SITE_DOMAIN
-                + "api/v1/payment/cancel?session_id={CHECKOUT_SESSION_ID}",
-            )
+                "mode": "payment",
+                # Closed by Stripe when the reaper expires the payment, at
+                # least 30 minutes after creation as Stripe requires.
+                "expires_at": int(
+                    (
+                        timezone.now()
+                        + timedelta(
+                            minutes=max(
+                                settings.PENDING_PAYMENT_TTL_MINUTES, 30
+                            )
+                        )
+                    ).timestamp()
+                ),
+                "success_url": settings.SITE_DOMAIN + "api/v1/payment/success"
+                "?session_id={CHECKOUT_SESSION_ID}",
+                "cancel_url": settings.SITE_DOMAIN + "api/v1/payment/cancel"
+                "?session_id={CHECKOUT_SESSION_ID}",
+            },
+            idempotency_key=f"order-{order.id}-checkout",
+        )
+    except StripeUnavailable as e:
+        return Response(
+            {"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    except stripe.StripeError as e:
+        return Response({"error": str(e)}, status=400)
 
-            payment = Payment.objects.create(
-                status="1",
-                order=order,
-                session_url=checkout_session.url,
-                session_id=checkout_session.id,
-                money_to_pay=round(money_to_pay / 100, 2),
-            )
+    payment = Payment.objects.create(
+        status="1",
+        order=order,
+        session_url=checkout_session.url,
+        session_id=checkout_session.id,
+        money_to_pay=round(money_to_pay / 100, 2),
+    )
 
-            serializer = PaymentSerializer(payment)
+    serializer = PaymentSerializer(payment)
 
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        except Exception as e:
-            return Response({"error": str(e)}, status=400)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
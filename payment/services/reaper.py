@@ -0,0 +1,89 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from payment.models import Payment
+from payment.services.stripe_gateway import stripe_gateway
+from taxi.models import Order
+from taxi.services import city_stats
+
+logger = logging.getLogger(__name__)
+
+
+class StripeSessions:
+    """Checkout session calls the reaper makes, replaceable in tests."""
+
+    def expire(self, session_id: str) -> None:
+        stripe_gateway.expire_checkout_session(session_id)
+
+
+class PaymentReaper:
+    """
+    Expires pending payments older than PENDING_PAYMENT_TTL_MINUTES so
+    abandoned checkouts stop blocking new orders. Works in chunks of
+    PENDING_PAYMENT_CHUNK_SIZE, each its own transaction with a single
+    UPDATE of the payments, walking the (status, created) index.
+    """
+
+    def __init__(self, sessions: StripeSessions | None = None) -> None:
+        self.sessions = sessions or StripeSessions()
+
+    def expire_stale(
+        self, ttl: timedelta | None = None, chunk_size: int | None = None
+    ) -> int:
+        ttl = ttl or timedelta(minutes=settings.PENDING_PAYMENT_TTL_MINUTES)
+        chunk_size = chunk_size or settings.PENDING_PAYMENT_CHUNK_SIZE
+        cutoff = timezone.now() - ttl
+        expired = 0
+        while True:
+            session_ids = self._expire_chunk(cutoff, chunk_size)
+            expired += len(session_ids)
+            if settings.PENDING_PAYMENT_EXPIRE_SESSIONS:
+                self._expire_sessions(session_ids)
+            if len(session_ids) < chunk_size:
+                return expired
+
+    @staticmethod
+    def _expire_chunk(cutoff: datetime, chunk_size: int) -> list[str]:
+        with transaction.atomic():
+            rows = list(
+                Payment.objects.select_for_update(skip_locked=True)
+                .filter(status=Payment.StatusEnum.pending, created__lt=cutoff)
+                .order_by("created")
+                .values_list("id", "order_id", "session_id")[:chunk_size]
+            )
+            if not rows:
+                return []
+            payment_ids, order_ids, session_ids = zip(*rows)
+            Payment.objects.filter(id__in=payment_ids).update(
+                status=Payment.StatusEnum.expired, session_url=None
+            )
+            closed = Counter(
+                Order.objects.select_for_update()
+                .filter(id__in=order_ids, is_active=True)
+                .order_by()
+                .values_list("city_id", flat=True)
+            )
+            if closed:
+                Order.objects.filter(id__in=order_ids).update(is_active=False)
+                for city_id, count in closed.items():
+                    city_stats.record_orders_closed(city_id, count)
+        return list(session_ids)
+
+    def _expire_sessions(self, session_ids: list[str]) -> None:
+        for session_id in session_ids:
+            try:
+                self.sessions.expire(session_id)
+            except Exception:
+                logger.warning(
+                    "Could not expire checkout session %s",
+                    session_id,
+                    exc_info=True,
+                )
+
+
+payment_reaper = PaymentReaper()
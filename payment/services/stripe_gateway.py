@@ -0,0 +1,196 @@
+import random
+import threading
+import time
+from collections.abc import Callable
+from typing import TypeVar
+
+import requests
+import stripe
+from django.conf import settings
+
+from taxi.services.instrumentation import STRIPE, external_call
+
+T = TypeVar("T")
+
+
+class StripeUnavailable(Exception):
+    """Stripe is failing or the breaker is open, the call can be retried."""
+
+
+class CircuitBreaker:
+    """
+    Opens after STRIPE_BREAKER_FAILURES calls in a row failed and then
+    rejects calls for STRIPE_BREAKER_RESET_SECONDS. After that a single
+    trial call is let through: success closes the breaker, failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if (
+            time.monotonic() - self.opened_at
+            < settings.STRIPE_BREAKER_RESET_SECONDS
+        ):
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if (
+                self.opened_at is not None
+                or self.failures >= settings.STRIPE_BREAKER_FAILURES
+            ):
+                self.opened_at = time.monotonic()
+
+
+def is_retryable(error: stripe.StripeError) -> bool:
+    """Network errors, rate limits and 5xx answers; never card errors."""
+    return (
+        isinstance(error, (stripe.APIConnectionError, stripe.RateLimitError))
+        or (error.http_status or 0) >= 500
+    )
+
+
+class StripeGateway:
+    """
+    Every Stripe API call goes through here. Calls share one keep-alive
+    requests session, have a timeout per operation from STRIPE_TIMEOUTS
+    and are retried up to STRIPE_MAX_RETRIES times with full jitter
+    when they carry an idempotency key, so Stripe applies them once.
+    """
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+        self.clients = {}
+        self.breaker = CircuitBreaker()
+
+    def client(self, timeout: float) -> stripe.StripeClient:
+        key = (settings.STRIPE_SECRET_KEY, settings.STRIPE_API_BASE, timeout)
+        client = self.clients.get(key)
+        if client is None:
+            client = self.clients[key] = stripe.StripeClient(
+                settings.STRIPE_SECRET_KEY or "",
+                base_addresses=(
+                    {"api": settings.STRIPE_API_BASE}
+                    if settings.STRIPE_API_BASE
+                    else {}
+                ),
+                http_client=stripe.RequestsClient(
+                    timeout=(settings.STRIPE_CONNECT_TIMEOUT_SECONDS, timeout),
+                    session=self.session,
+                ),
+                max_network_retries=0,
+            )
+        return client
+
+    def call(
+        self,
+        operation: str,
+        request: Callable[[stripe.StripeClient, dict], T],
+        idempotency_key: str | None = None,
+    ) -> T:
+        if not self.breaker.allow():
+            raise StripeUnavailable("Stripe is unavailable, try again later")
+        client = self.client(
+            settings.STRIPE_TIMEOUTS.get(operation, settings.STRIPE_TIMEOUT)
+        )
+        options = (
+            {"idempotency_key": idempotency_key} if idempotency_key else {}
+        )
+        attempts = 1 + (settings.STRIPE_MAX_RETRIES if idempotency_key else 0)
+        for attempt in range(attempts):
+            try:
+                with external_call(STRIPE, operation):
+                    result = request(client, options)
+            except stripe.StripeError as error:
+                if not is_retryable(error):
+                    self.breaker.record_success()
+                    raise
+                if attempt + 1 == attempts:
+                    self.breaker.record_failure()
+                    raise StripeUnavailable(str(error)) from error
+                time.sleep(
+                    random.uniform(
+                        0, settings.STRIPE_RETRY_BACKOFF_SECONDS * 2**attempt
+                    )
+                )
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def create_checkout_session(
+        self, params: dict, idempotency_key: str
+    ) -> stripe.checkout.Session:
+        return self.call(
+            "checkout.Session.create",
+            lambda client, options: client.checkout.sessions.create(
+                params=params, options=options
+            ),
+            idempotency_key,
+        )
+
+    def expire_checkout_session(
+        self, session_id: str
+    ) -> stripe.checkout.Session:
+        return self.call(
+            "checkout.Session.expire",
+            lambda client, options: client.checkout.sessions.expire(
+                session_id, options=options
+            ),
+            f"expire-{session_id}",
+        )
+
+    def refund_checkout_session(self, session_id: str) -> stripe.Refund | None:
+        """Refund what was paid through the session, if anything."""
+        session = self.call(
+            "checkout.Session.retrieve",
+            lambda client, options: client.checkout.sessions.retrieve(
+                session_id, options=options
+            ),
+        )
+        if not session.payment_intent:
+            return None
+        return self.call(
+            "Refund.create",
+            lambda client, options: client.refunds.create(
+                params={"payment_intent": session.payment_intent},
+                options=options,
+            ),
+            f"refund-{session_id}",
+        )
+
+
+stripe_gateway = StripeGateway()
@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from payment.models import Tariff
+
+DEFAULT_PRICE_PER_METER = Decimal(1)
+
+VERSION_CACHE_KEY = "tariffs:version"
+
+
+class TariffBook:
+    """
+    All tariffs compiled into a per-city table of 24 hourly slots,
+    so a quote is a dict lookup and a list index. The table is
+    rebuilt when the shared version key changes.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.version = None
+        self.table = {}
+
+    def invalidate(self) -> None:
+        try:
+            cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, 1, timeout=None)
+        self.version = None
+
+    def _current_table(self) -> dict[int, list[Tariff | None]]:
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    self.table = self.compile()
+                    self.version = version
+        return self.table
+
+    @staticmethod
+    def compile() -> dict[int, list[Tariff | None]]:
+        table = {}
+        for tariff in Tariff.objects.all():
+            slots = table.setdefault(tariff.city_id, [None] * 24)
+            for hour in tariff.hours:
+                slots[hour] = tariff
+        return table
+
+    @staticmethod
+    def _price(
+        tariff: Tariff | None, distance: int, multiplier: Decimal = 1
+    ) -> int:
+        if tariff is None:
+            amount = distance * DEFAULT_PRICE_PER_METER
+        else:
+            amount = max(
+                tariff.base_fare + distance * tariff.price_per_meter,
+                Decimal(tariff.minimum_fare),
+            )
+        amount *= multiplier
+        return int(amount.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+    def quote(
+        self,
+        city_id: int,
+        distance: int,
+        at: datetime | None = None,
+        multiplier: Decimal = 1,
+    ) -> int:
+        """
+        Price of a ride in cents, scaled by the surge `multiplier`.
+        """
+        hour = timezone.localtime(at).hour
+        slots = self._current_table().get(city_id)
+        return self._price(
+            slots[hour] if slots else None, distance, multiplier
+        )
+
+    def quote_many(self, orders: list[dict]) -> list[int]:
+        """
+        Price many hypothetical orders given as dicts with
+        `city`, `distance` and an optional local `hour`.
+        """
+        table = self._current_table()
+        default_hour = timezone.localtime().hour
+        quotes = []
+        for order in orders:
+            slots = table.get(order["city"])
+            tariff = slots[order.get("hour", default_hour)] if slots else None
+            quotes.append(self._price(tariff, order["distance"]))
+        return quotes
+
+
+tariff_book = TariffBook()
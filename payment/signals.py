@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from payment.models import Tariff
+from payment.services.tariffs import tariff_book
+
+
+@receiver([post_save, post_delete], sender=Tariff)
+def invalidate_tariffs(**kwargs) -> None:
+    # After commit, or another process could compile the old tariffs
+    # under the new version.
+    transaction.on_commit(tariff_book.invalidate)
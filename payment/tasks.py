@@ -2,6 +2,8 @@ from celery import shared_task
 from datetime import date
 
 from payment.models import Payment
+from payment.services.reaper import payment_reaper
+from payment.services.stripe_gateway import StripeUnavailable, stripe_gateway
 from taxi.services.telegram_helper import send_message
 
 
@@ -21,3 +23,17 @@ def check_daily_profit() -> None:
         send_message(message)
     else:
         send_message("No profit today!")
+
+
+@shared_task
+def expire_stale_payments() -> int:
+    return payment_reaper.expire_stale()
+
+
+@shared_task(
+    autoretry_for=(StripeUnavailable,),
+    retry_backoff=True,
+    max_retries=8,
+)
+def refund_payment(session_id: str) -> None:
+    stripe_gateway.refund_checkout_session(session_id)
@@ -156,9 +156,47 @@ class SimpleUserPaymentAPITest(BaseTest):
         payment.refresh_from_db()
 
         self.assertEqual(payment.status, "2")
+        self.assertIsNotNone(payment.paid_at)
 
         mock_send_message.assert_called_once()
 
+    @patch("payment.views.send_message")
+    def test_repeated_success_is_recorded_once(self, mock_send_message):
+        payment = self.sample_payment(self.sample_order(self.user))
+        url = (
+            reverse("payment:payment-success")
+            + f"?session_id={payment.session_id}"
+        )
+
+        self.client.get(url)
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        mock_send_message.assert_called_once()
+
+    @patch("payment.views.refund_payment")
+    @patch("payment.views.send_message")
+    def test_success_of_expired_payment_is_refunded(
+        self, mock_send_message, mock_refund_payment
+    ):
+        order = self.sample_order(self.user)
+        payment = self.sample_payment(order)
+        Payment.objects.filter(id=payment.id).update(
+            status=Payment.StatusEnum.expired
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.get(
+                reverse("payment:payment-success")
+                + f"?session_id={payment.session_id}"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, Payment.StatusEnum.expired)
+        mock_refund_payment.delay.assert_called_once_with(payment.session_id)
+        mock_send_message.assert_not_called()
+
     @patch("payment.views.send_message")
     def test_canceled_payment(self, mock_send_message):
         order = self.sample_order(self.user)
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from payment.models import Payment
+from payment.services.reaper import PaymentReaper
+from payment.tasks import expire_stale_payments
+from taxi.tests.base import TestBase
+
+
+class PaymentReaperTest(TestBase):
+    def sample_payment(self, minutes_ago: int, **params) -> Payment:
+        payload = {
+            "status": Payment.StatusEnum.pending,
+            "session_url": "https://checkout.stripe.com/test",
+            "session_id": f"cs_test_{Payment.objects.count()}",
+            "money_to_pay": 10,
+            "order": self.sample_order(self.default_user),
+            "created": timezone.now() - timedelta(minutes=minutes_ago),
+        }
+        payload.update(**params)
+        return Payment.objects.create(**payload)
+
+    def test_stale_pending_payments_expire_with_their_orders(self):
+        stale = self.sample_payment(90)
+        fresh = self.sample_payment(5)
+        paid = self.sample_payment(90, status=Payment.StatusEnum.paid)
+
+        with override_settings(PENDING_PAYMENT_TTL_MINUTES=60):
+            expired = expire_stale_payments()
+
+        for payment in (stale, fresh, paid):
+            payment.refresh_from_db()
+            payment.order.refresh_from_db()
+        self.assertEqual(expired, 1)
+        self.assertEqual(stale.status, Payment.StatusEnum.expired)
+        self.assertIsNone(stale.session_url)
+        self.assertFalse(stale.order.is_active)
+        self.assertEqual(fresh.status, Payment.StatusEnum.pending)
+        self.assertTrue(fresh.order.is_active)
+        self.assertEqual(paid.status, Payment.StatusEnum.paid)
+        self.assertTrue(paid.order.is_active)
+
+    def test_expires_in_chunks_with_one_update_each(self):
+        for _ in range(5):
+            self.sample_payment(90)
+        reaper = PaymentReaper(sessions=Mock())
+
+        with CaptureQueriesContext(connection) as queries:
+            expired = reaper.expire_stale(timedelta(hours=1), chunk_size=2)
+
+        payment_updates = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "payment_payment"')
+        ]
+        self.assertEqual(expired, 5)
+        self.assertEqual(len(payment_updates), 3)
+        self.assertFalse(
+            Payment.objects.filter(status=Payment.StatusEnum.pending).exists()
+        )
+
+    @override_settings(PENDING_PAYMENT_EXPIRE_SESSIONS=True)
+    def test_stripe_sessions_are_expired_and_failures_ignored(self):
+        first = self.sample_payment(90)
+        second = self.sample_payment(90)
+        sessions = Mock()
+        sessions.expire.side_effect = [Exception("stripe down"), None]
+
+        expired = PaymentReaper(sessions).expire_stale(timedelta(hours=1))
+
+        self.assertEqual(expired, 2)
+        self.assertEqual(
+            sorted(call.args[0] for call in sessions.expire.call_args_list),
+            sorted([first.session_id, second.session_id]),
+        )
@@ -0,0 +1,186 @@
+import time
+from unittest.mock import patch
+
+import stripe
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from payment.services.fake_stripe import FakeStripe
+from payment.services.stripe_gateway import (
+    CircuitBreaker,
+    StripeGateway,
+    StripeUnavailable,
+)
+from taxi.models import Order
+from taxi.tests.base import TestBase
+
+ORDER_URL = reverse("taxi:order-list")
+PARAMS = {"mode": "payment"}
+
+
+@override_settings(
+    STRIPE_RETRY_BACKOFF_SECONDS=0,
+    STRIPE_MAX_RETRIES=2,
+    STRIPE_BREAKER_FAILURES=5,
+)
+class StripeGatewayTest(TestCase):
+    def setUp(self):
+        self.stripe = FakeStripe()
+        self.stripe.start()
+        self.addCleanup(self.stripe.server_close)
+        self.addCleanup(self.stripe.shutdown)
+        settings_override = override_settings(
+            STRIPE_API_BASE=self.stripe.api_base
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.gateway = StripeGateway()
+
+    def test_failed_calls_are_retried_with_the_same_idempotency_key(self):
+        self.stripe.fail_next(2)
+
+        session = self.gateway.create_checkout_session(PARAMS, "order-1")
+
+        self.assertEqual(session.id, "cs_test_1")
+        self.assertEqual(
+            self.stripe.calls, [("/v1/checkout/sessions", "order-1")] * 3
+        )
+
+    def test_repeated_call_returns_the_first_session(self):
+        first = self.gateway.create_checkout_session(PARAMS, "order-1")
+        second = self.gateway.create_checkout_session(PARAMS, "order-1")
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(len(self.stripe.sessions), 1)
+
+    def test_client_errors_are_not_retried(self):
+        self.stripe.fail_next(1, status=400)
+
+        with self.assertRaises(stripe.InvalidRequestError):
+            self.gateway.create_checkout_session(PARAMS, "order-1")
+
+        self.assertEqual(len(self.stripe.calls), 1)
+        self.assertEqual(self.gateway.breaker.state, CircuitBreaker.CLOSED)
+
+    @override_settings(STRIPE_TIMEOUTS={"checkout.Session.create": 0.05})
+    def test_slow_calls_time_out(self):
+        self.stripe.latency = 0.3
+
+        with self.assertRaises(StripeUnavailable):
+            self.gateway.create_checkout_session(PARAMS, "order-1")
+
+        self.assertEqual(len(self.stripe.calls), 3)
+
+    @override_settings(STRIPE_MAX_RETRIES=0, STRIPE_BREAKER_FAILURES=2)
+    def test_breaker_opens_and_recovers(self):
+        self.stripe.fail_next(2)
+        for _ in range(2):
+            with self.assertRaises(StripeUnavailable):
+                self.gateway.create_checkout_session(PARAMS, "order-1")
+
+        with self.assertRaises(StripeUnavailable):
+            self.gateway.create_checkout_session(PARAMS, "order-1")
+        self.assertEqual(len(self.stripe.calls), 2)
+        self.assertEqual(self.gateway.breaker.state, CircuitBreaker.OPEN)
+
+        with override_settings(STRIPE_BREAKER_RESET_SECONDS=0):
+            session = self.gateway.create_checkout_session(PARAMS, "order-1")
+        self.assertEqual(session.id, "cs_test_1")
+        self.assertEqual(self.gateway.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_sessions_are_expired(self):
+        session = self.gateway.create_checkout_session(PARAMS, "order-1")
+
+        expired = self.gateway.expire_checkout_session(session.id)
+
+        self.assertEqual(expired.status, "expired")
+
+    def test_paid_sessions_are_refunded_once(self):
+        session = self.gateway.create_checkout_session(PARAMS, "order-1")
+        self.stripe.pay(session.id)
+
+        first = self.gateway.refund_checkout_session(session.id)
+        second = self.gateway.refund_checkout_session(session.id)
+
+        self.assertEqual(first.payment_intent, f"pi_{session.id}")
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(len(self.stripe.refunds), 1)
+
+    def test_unpaid_sessions_are_not_refunded(self):
+        session = self.gateway.create_checkout_session(PARAMS, "order-1")
+
+        self.assertIsNone(self.gateway.refund_checkout_session(session.id))
+        self.assertEqual(self.stripe.refunds, [])
+
+
+class OrderPaymentTest(TestBase):
+    @patch("taxi.serializers.send_message")
+    @override_settings(STRIPE_MAX_RETRIES=0)
+    def test_order_gets_503_while_stripe_is_down(self, mock_send_message):
+        fake_stripe = FakeStripe(error_rate=1.0)
+        fake_stripe.start()
+        self.addCleanup(fake_stripe.server_close)
+        self.addCleanup(fake_stripe.shutdown)
+        self.client = APIClient()
+        self.client.force_authenticate(self.default_user)
+
+        payload = {
+            "city": self.default_city.id,
+            "street_from": "Airport",
+            "street_to": "Station",
+            "distance": 500,
+        }
+
+        with (
+            override_settings(STRIPE_API_BASE=fake_stripe.api_base),
+            patch(
+                "payment.services.payment_helper.stripe_gateway",
+                StripeGateway(),
+            ),
+            self.captureOnCommitCallbacks() as callbacks,
+        ):
+            res = self.client.post(ORDER_URL, payload)
+            self.assertFalse(Order.objects.exists())
+            fake_stripe.error_rate = 0.0
+            retry = self.client.post(ORDER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().payment.status, "1")
+        # Only the retried order's demand and street index updates remain.
+        self.assertEqual(len(callbacks), 2)
+
+    @patch("taxi.serializers.send_message")
+    @override_settings(PENDING_PAYMENT_TTL_MINUTES=60)
+    def test_session_expires_with_the_pending_payment(self, mock_send_message):
+        fake_stripe = FakeStripe()
+        fake_stripe.start()
+        self.addCleanup(fake_stripe.server_close)
+        self.addCleanup(fake_stripe.shutdown)
+        self.client = APIClient()
+        self.client.force_authenticate(self.default_user)
+
+        with (
+            override_settings(STRIPE_API_BASE=fake_stripe.api_base),
+            patch(
+                "payment.services.payment_helper.stripe_gateway",
+                StripeGateway(),
+            ),
+        ):
+            res = self.client.post(
+                ORDER_URL,
+                {
+                    "city": self.default_city.id,
+                    "street_from": "Airport",
+                    "street_to": "Station",
+                    "distance": 500,
+                },
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        (session,) = fake_stripe.sessions.values()
+        self.assertAlmostEqual(
+            session["expires_at"], time.time() + 60 * 60, delta=60
+        )
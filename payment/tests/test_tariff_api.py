@@ -0,0 +1,166 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from payment.models import Tariff
+from payment.services.tariffs import tariff_book
+from taxi.models import City
+
+TARIFF_URL = reverse("payment:tariff-list")
+TARIFF_QUOTE_URL = reverse("payment:tariff-quote")
+
+
+def local_time(hour: int) -> datetime:
+    return timezone.make_aware(datetime(2024, 1, 1, hour))
+
+
+class TariffBookTest(TestCase):
+    def setUp(self):
+        self.city = City.objects.create(name="test city")
+        with self.captureOnCommitCallbacks(execute=True):
+            Tariff.objects.create(
+                city=self.city,
+                start_hour=6,
+                end_hour=22,
+                base_fare=100,
+                price_per_meter=2,
+                minimum_fare=500,
+            )
+            Tariff.objects.create(
+                city=self.city, start_hour=22, end_hour=6, price_per_meter=3
+            )
+
+    def test_city_without_tariff_uses_default_price(self):
+        other_city = City.objects.create(name="other city")
+
+        self.assertEqual(tariff_book.quote(other_city.id, 51), 51)
+
+    def test_day_tariff_with_minimum_fare(self):
+        self.assertEqual(
+            tariff_book.quote(self.city.id, 100, local_time(12)), 500
+        )
+        self.assertEqual(
+            tariff_book.quote(self.city.id, 1000, local_time(12)), 2100
+        )
+
+    def test_night_band_wraps_midnight(self):
+        self.assertEqual(
+            tariff_book.quote(self.city.id, 100, local_time(23)), 300
+        )
+        self.assertEqual(
+            tariff_book.quote(self.city.id, 100, local_time(3)), 300
+        )
+
+    def test_quote_does_not_query_database(self):
+        tariff_book.quote(self.city.id, 100)
+
+        with self.assertNumQueries(0):
+            tariff_book.quote(self.city.id, 100)
+
+    def test_tariff_change_invalidates_book(self):
+        tariff_book.quote(self.city.id, 1000, local_time(12))
+        Tariff.objects.filter(start_hour=6).update(price_per_meter=5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Tariff.objects.get(start_hour=6).save()
+            self.assertEqual(
+                tariff_book.quote(self.city.id, 1000, local_time(12)), 2100
+            )
+
+        self.assertEqual(
+            tariff_book.quote(self.city.id, 1000, local_time(12)), 5100
+        )
+
+
+class TariffAPITest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.city = City.objects.create(name="test city")
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@admin.com",
+            first_name="admin",
+            last_name="admin",
+            password="admin1234",
+        )
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            first_name="test",
+            last_name="test",
+            password="test1234",
+        )
+
+    def test_simple_user_cant_manage_tariffs(self):
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(TARIFF_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_can_create_tariff(self):
+        self.client.force_authenticate(self.admin)
+
+        res = self.client.post(
+            TARIFF_URL,
+            {"city": self.city.id, "price_per_meter": "1.5", "base_fare": 50},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_empty_band_is_rejected(self):
+        self.client.force_authenticate(self.admin)
+
+        res = self.client.post(
+            TARIFF_URL, {"city": self.city.id, "start_hour": 5, "end_hour": 5}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_overlapping_band_is_rejected(self):
+        Tariff.objects.create(city=self.city, start_hour=22, end_hour=6)
+        self.client.force_authenticate(self.admin)
+
+        res = self.client.post(
+            TARIFF_URL,
+            {"city": self.city.id, "start_hour": 5, "end_hour": 9},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_band_can_be_moved_within_itself(self):
+        tariff = Tariff.objects.create(
+            city=self.city, start_hour=22, end_hour=6
+        )
+        Tariff.objects.create(city=self.city, start_hour=6, end_hour=22)
+        self.client.force_authenticate(self.admin)
+
+        res = self.client.patch(
+            reverse("payment:tariff-detail", args=[tariff.id]),
+            {"end_hour": 5},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_batch_quote(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Tariff.objects.create(city=self.city, base_fare=100)
+        self.client.force_authenticate(self.admin)
+
+        res = self.client.post(
+            TARIFF_QUOTE_URL,
+            {
+                "orders": [
+                    {"city": self.city.id, "distance": 400, "hour": 8},
+                    {"city": self.city.id + 1, "distance": 150},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["quotes"], ["5.00", "1.50"])
+        self.assertEqual(res.data["total"], "6.50")
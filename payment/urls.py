@@ -5,12 +5,14 @@ from payment.views import (
     PaymentSuccessView,
     PaymentCancelView,
     PaymentViewSet,
+    TariffViewSet,
 )
 
 
 app_name = "payment"
 
 router = routers.DefaultRouter()
+router.register("tariffs", TariffViewSet)
 router.register("", PaymentViewSet)
 
 urlpatterns = [
@@ -1,15 +1,29 @@
+from decimal import Decimal
+
 from django.db import transaction
 from django.db.models import QuerySet
+from django.utils import timezone
 from rest_framework import mixins, serializers, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.viewsets import GenericViewSet
-
-from payment.models import Payment
-from payment.serializers import PaymentListSerializer, PaymentSerializer
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
+
+from payment.models import Payment, Tariff
+from payment.serializers import (
+    PaymentListSerializer,
+    PaymentSerializer,
+    TariffQuoteSerializer,
+    TariffSerializer,
+)
 from payment.services.filters import PaymentFilters
+from payment.services.tariffs import tariff_book
+from payment.tasks import refund_payment
+from taxi.services import city_stats
+from taxi.services.fast_list import FastListMixin
+from taxi.services.fieldsets import SparseFieldsetMixin
 from taxi.services.telegram_helper import send_message
 
 
@@ -17,13 +31,34 @@ class PaymentSuccessView(APIView):
     """
     Automatically redirects when payment is successful,
     updates payment status and sends a message to the telegram.
+    A payment that already expired or was cancelled is refunded.
     """
 
     def get(self, request: Request, *args, **kwargs) -> Response:
         with transaction.atomic():
             session_id = request.query_params.get("session_id")
-            payment = Payment.objects.get(session_id=session_id)
+            payment = (
+                Payment.objects.select_for_update(of=("self",))
+                .select_related("order__user")
+                .get(session_id=session_id)
+            )
+            if payment.status == Payment.StatusEnum.paid:
+                return Response(
+                    {"message": "Payment was successful."},
+                    status=status.HTTP_200_OK,
+                )
+            if payment.status != Payment.StatusEnum.pending:
+                transaction.on_commit(lambda: refund_payment.delay(session_id))
+                return Response(
+                    {
+                        "message": "Payment is no longer pending "
+                        "and will be refunded."
+                    },
+                    status=status.HTTP_409_CONFLICT,
+                )
+            city_stats.record_payment_paid(payment.order, payment.money_to_pay)
             payment.status = "2"
+            payment.paid_at = timezone.now()
             payment.save()
             telegram_message = (
                 f"User {payment.order.user.full_name} "
@@ -53,6 +88,8 @@ class PaymentCancelView(APIView):
             payment.save()
 
             order = payment.order
+            if order.is_active:
+                city_stats.record_orders_closed(order.city_id)
             order.is_active = False
             order.save()
 
@@ -69,6 +106,8 @@ class PaymentCancelView(APIView):
 
 
 class PaymentViewSet(
+    SparseFieldsetMixin,
+    FastListMixin,
     GenericViewSet,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -84,7 +123,43 @@ class PaymentViewSet(
         return PaymentSerializer
 
     def get_queryset(self) -> QuerySet:
-        queryset = self.queryset.all()
+        queryset = super().get_queryset()
         if not self.request.user.is_staff:
             return queryset.filter(order__user_id=self.request.user.id)
         return queryset
+
+
+class TariffViewSet(SparseFieldsetMixin, ModelViewSet):
+    queryset = Tariff.objects.all()
+    permission_classes = [IsAdminUser]
+    filterset_fields = ["city"]
+
+    def get_serializer_class(self) -> serializers.SerializerMetaclass:
+        if self.action == "quote":
+            return TariffQuoteSerializer
+        return TariffSerializer
+
+    @action(
+        detail=False,
+        methods=["post"],
+    )
+    def quote(self, request: Request) -> Response:
+        """
+        Price a batch of hypothetical orders for what-if analysis.
+        Every order has `city`, `distance` and an optional local `hour`.
+        Amounts are in dollars, like payments.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quotes = tariff_book.quote_many(serializer.validated_data["orders"])
+        cent = Decimal("0.01")
+        return Response(
+            {
+                "quotes": [
+                    str((Decimal(quote) / 100).quantize(cent))
+                    for quote in quotes
+                ],
+                "total": str((Decimal(sum(quotes)) / 100).quantize(cent)),
+            },
+            status=status.HTTP_200_OK,
+        )
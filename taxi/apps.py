@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TaxiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'taxi'
+
+    def ready(self) -> None:
+        import taxi.signals  # noqa: F401
+        from taxi.services import slow_queries, tracing
+
+        tracing.install()
+        slow_queries.install()
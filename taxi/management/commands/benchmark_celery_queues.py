@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from taxi.tasks import queue_load, queue_probe
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how long dispatch tasks wait before they start, first on "
+        "idle workers and then while report jobs saturate their queue. "
+        "Needs the broker, result backend and workers running, e.g. "
+        "`docker compose --profile queues up`."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--probes", type=int, default=50)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.1,
+            help="Seconds between two probe tasks.",
+        )
+        parser.add_argument(
+            "--load", type=int, default=200, help="Report jobs to enqueue."
+        )
+        parser.add_argument("--load-seconds", type=float, default=1.0)
+        parser.add_argument(
+            "--shared-queue",
+            action="store_true",
+            help="Send probes to the reports queue, as before routing.",
+        )
+        parser.add_argument("--timeout", type=float, default=600)
+
+    def probe(self, options: dict) -> list[float]:
+        route = {"queue": "reports"} if options["shared_queue"] else {}
+        results = []
+        for _ in range(options["probes"]):
+            results.append(queue_probe.apply_async((time.time(),), **route))
+            time.sleep(options["interval"])
+        return [result.get(timeout=options["timeout"]) for result in results]
+
+    def report(self, label: str, latencies: list[float]) -> None:
+        latencies = sorted(latencies)
+        p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+        self.stdout.write(
+            f"{label}: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p95 {p95 * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms"
+        )
+
+    def handle(self, *args, **options) -> None:
+        self.report("Idle", self.probe(options))
+        for _ in range(options["load"]):
+            queue_load.delay(options["load_seconds"])
+        self.report(
+            f"{options['load']} report jobs queued", self.probe(options)
+        )
+        self.stdout.write(
+            self.style.WARNING(
+                "Report jobs keep running until the reports queue drains."
+            )
+        )
@@ -0,0 +1,91 @@
+import random
+import time
+import zlib
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from taxi.models import City
+from taxi.services.routing import DistanceService, RoutingBackend
+
+
+class SimulatedRoutingBackend(RoutingBackend):
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+
+    def distance(
+        self, city_id: int, street_from: str, street_to: str
+    ) -> int | None:
+        self.calls += 1
+        time.sleep(self.latency)
+        return 50 + zlib.crc32(f"{street_from}:{street_to}".encode()) % 20000
+
+
+class Command(BaseCommand):
+    help = (
+        "Resolve a skewed stream of street pairs through the distance "
+        "service and report hit rates and timings. Nothing is persisted."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--lookups", type=int, default=20000)
+        parser.add_argument("--streets", type=int, default=300)
+        parser.add_argument("--cache-size", type=int, default=2000)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.005,
+            help="Seconds the simulated routing backend takes per route.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        rng = random.Random(42)
+        streets = [f"street {i}" for i in range(options["streets"])]
+
+        def pick() -> str:
+            index = int(rng.paretovariate(1.2)) - 1
+            return streets[index % len(streets)]
+
+        backend = SimulatedRoutingBackend(options["latency"])
+        service = DistanceService(backend, options["cache_size"])
+
+        with transaction.atomic():
+            city = City.objects.create(name="benchmark city")
+            pairs = [(pick(), pick()) for _ in range(options["lookups"])]
+            started = time.perf_counter()
+            for street_from, street_to in pairs:
+                service.resolve(city.id, street_from, street_to)
+            elapsed = time.perf_counter() - started
+            stats = service.stats()
+
+            sample = pairs[:1000]
+            timings = {}
+            for phase in ("matrix", "memory"):
+                if phase == "matrix":
+                    service.cache.clear()
+                started = time.perf_counter()
+                for street_from, street_to in sample:
+                    service.resolve(city.id, street_from, street_to)
+                timings[phase] = (time.perf_counter() - started) / len(sample)
+            transaction.set_rollback(True)
+
+        uncached = options["lookups"] * options["latency"]
+        self.stdout.write(f"Lookups: {options['lookups']}")
+        self.stdout.write(f"Distinct pairs routed: {backend.calls}")
+        for name, value in stats.items():
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(
+            f"Total: {elapsed:.3f}s "
+            f"({elapsed / options['lookups'] * 1e6:.1f} us per lookup)"
+        )
+        self.stdout.write(
+            f"Matrix table lookup: {timings['matrix'] * 1e6:.1f} us, "
+            f"LRU lookup: {timings['memory'] * 1e6:.1f} us"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Without caching the backend alone would take "
+                f"{uncached:.3f}s ({uncached / elapsed:.1f}x slower)"
+            )
+        )
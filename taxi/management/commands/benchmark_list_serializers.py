@@ -0,0 +1,157 @@
+import time
+from collections.abc import Callable
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from payment.models import Payment
+from payment.serializers import PaymentListSerializer
+from taxi.models import Car, City, Driver, Order, Ride
+from taxi.serializers import (
+    DriverListSerializer,
+    OrderListSerializer,
+    RideListSerializer,
+)
+from taxi.services.fast_list import RowRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Render large driver, order, ride and payment lists with the "
+        "DRF list serializers and with the compiled row renderers, "
+        "check both produce identical JSON and report the timings. "
+        "Nothing is persisted."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def populate(self, rows: int) -> None:
+        city = City.objects.create(name="benchmark city")
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(
+                email=f"benchmark{i}@example.com",
+                first_name=f"First{i}",
+                last_name=f"Last{i}",
+                password="!",
+            )
+            for i in range(rows)
+        )
+        drivers = Driver.objects.bulk_create(
+            Driver(
+                user=user,
+                license_number=f"LN{i}",
+                age=30,
+                city=city,
+                sex="M",
+                rate=Decimal(i % 500) / 100,
+            )
+            for i, user in enumerate(users)
+        )
+        cars = Car.objects.bulk_create(
+            Car(model="Benchmark", number=f"AA{i:06d}", driver=driver)
+            for i, driver in enumerate(drivers)
+        )
+        orders = Order.objects.bulk_create(
+            Order(
+                city=city,
+                user=user,
+                street_from=f"street {i}",
+                street_to=f"street {i + 1}",
+                distance=100 + i,
+                is_active=False,
+            )
+            for i, user in enumerate(users)
+        )
+        Payment.objects.bulk_create(
+            Payment(
+                order=order,
+                status=Payment.StatusEnum.paid,
+                session_id=f"session {i}",
+                money_to_pay=Decimal(order.distance) / 100,
+            )
+            for i, order in enumerate(orders)
+        )
+        Ride.objects.bulk_create(
+            Ride(
+                order=order,
+                driver=driver,
+                car=car,
+                status="3",
+                rate=i % 5 + 1,
+            )
+            for i, (order, driver, car) in enumerate(
+                zip(orders, drivers, cars)
+            )
+        )
+
+    def measure(
+        self, repeat: int, render: Callable[[], list]
+    ) -> tuple[float, bytes]:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = JSONRenderer().render(render())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
+
+    def handle(self, *args, **options) -> None:
+        cases = [
+            (DriverListSerializer, Driver.objects.select_related("user")),
+            (
+                OrderListSerializer,
+                Order.objects.select_related("user").prefetch_related(
+                    "payment"
+                ),
+            ),
+            (
+                RideListSerializer,
+                Ride.objects.select_related("car", "driver__user"),
+            ),
+            (
+                PaymentListSerializer,
+                Payment.objects.select_related("order__user"),
+            ),
+        ]
+
+        def serialize(
+            serializer_class: type[serializers.Serializer],
+            queryset: QuerySet,
+        ) -> list:
+            return serializer_class(queryset.all(), many=True).data
+
+        with transaction.atomic():
+            self.populate(options["rows"])
+            for serializer_class, queryset in cases:
+                renderer = RowRenderer(serializer_class)
+                slow, expected = self.measure(
+                    options["repeat"],
+                    lambda: serialize(serializer_class, queryset),
+                )
+                fast, content = self.measure(
+                    options["repeat"],
+                    lambda: renderer.render_rows(renderer.values(queryset)),
+                )
+                if content != expected:
+                    raise AssertionError(
+                        f"{serializer_class.__name__} output differs"
+                    )
+                self.stdout.write(
+                    f"{serializer_class.__name__}: "
+                    f"serializer {slow * 1000:.0f} ms, "
+                    f"fast list {fast * 1000:.0f} ms "
+                    f"({slow / fast:.1f}x faster)"
+                )
+            transaction.set_rollback(True)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{options['rows']} rows per list, identical JSON output"
+            )
+        )
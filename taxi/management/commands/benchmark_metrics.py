@@ -0,0 +1,62 @@
+import time
+from collections.abc import Callable
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from taxi.middleware import MetricsMiddleware
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request overhead of MetricsMiddleware against a "
+        "view that runs a fixed number of trivial SQL statements."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=5,
+            help="SQL statements executed by the benchmark view.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        path = reverse("taxi:order-list")
+        match = resolve(path)
+        factory = RequestFactory()
+
+        def view(request: HttpRequest) -> HttpResponse:
+            request.resolver_match = match
+            with connection.cursor() as cursor:
+                for _ in range(options["queries"]):
+                    cursor.execute("SELECT 1")
+            return HttpResponse()
+
+        def run(handler: Callable[[HttpRequest], HttpResponse]) -> float:
+            started = time.perf_counter()
+            for _ in range(options["requests"]):
+                handler(factory.get(path))
+            return (time.perf_counter() - started) / options["requests"]
+
+        run(view)
+        baseline = min(run(view) for _ in range(3))
+        instrumented = min(run(MetricsMiddleware(view)) for _ in range(3))
+        overhead = instrumented - baseline
+
+        self.stdout.write(
+            f"{options['requests']} requests, "
+            f"{options['queries']} queries each"
+        )
+        self.stdout.write(f"Without metrics: {baseline * 1e6:.1f} us/request")
+        self.stdout.write(f"With metrics: {instrumented * 1e6:.1f} us/request")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Overhead: {overhead * 1e6:.1f} us/request "
+                f"({overhead / baseline:.1%} of this minimal view)"
+            )
+        )
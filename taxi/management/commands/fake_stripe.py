@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from payment.services.fake_stripe import FakeStripe
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local fake of Stripe's checkout session API for load tests. "
+        "Set STRIPE_API_BASE to the printed URL in the app and workers."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=12111)
+        parser.add_argument(
+            "--latency-ms", type=float, default=0, help="Added per call."
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Fraction of calls answered with a 500.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        server = FakeStripe(
+            (options["host"], options["port"]),
+            options["latency_ms"] / 1000,
+            options["error_rate"],
+        )
+        self.stdout.write(f"STRIPE_API_BASE={server.api_base}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f"{len(server.calls)} calls, "
+                f"{len(server.sessions)} sessions created"
+            )
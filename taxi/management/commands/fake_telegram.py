@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from taxi.services.fake_telegram import FakeBotAPI
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local fake of the Telegram Bot API for load tests. Set "
+        "TELEGRAM_API_URL to the printed URL in the app and workers."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8081)
+        parser.add_argument(
+            "--per-minute",
+            type=int,
+            default=20,
+            help="Messages accepted per chat and minute before 429s.",
+        )
+        parser.add_argument(
+            "--latency-ms", type=float, default=0, help="Added per call."
+        )
+
+    def handle(self, *args, **options) -> None:
+        server = FakeBotAPI(
+            (options["host"], options["port"]),
+            options["per_minute"],
+            options["latency_ms"] / 1000,
+        )
+        self.stdout.write(f"TELEGRAM_API_URL={server.api_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f"{len(server.messages)} messages accepted, "
+                f"{server.rejected} rejected with 429"
+            )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from taxi.services import ride_summary
+
+
+class Command(BaseCommand):
+    help = "Recompute the ride list read model from the live tables."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options) -> None:
+        rebuilt = ride_summary.rebuild(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rebuilt} ride summaries.")
+        )
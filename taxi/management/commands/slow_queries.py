@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from taxi.models import SlowQuery
+from taxi.services.slow_queries import TOP_ORDERINGS, top_slow_queries
+
+
+class Command(BaseCommand):
+    help = "Show the slowest SQL statements captured, by fingerprint."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--order", choices=TOP_ORDERINGS, default="total_ms"
+        )
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete the captured statements after showing them.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        slow_queries = top_slow_queries(options["order"], options["limit"])
+        for rank, slow_query in enumerate(slow_queries, start=1):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"#{rank} {slow_query.count}x  "
+                    f"total {slow_query.total_ms:.0f} ms  "
+                    f"p95 {slow_query.p95_ms:.0f} ms  "
+                    f"max {slow_query.max_ms:.0f} ms  "
+                    f"{slow_query.origin}"
+                )
+            )
+            self.stdout.write(slow_query.sql)
+            if slow_query.stack:
+                self.stdout.write(slow_query.stack)
+            self.stdout.write("")
+        if not slow_queries:
+            self.stdout.write("No slow queries captured.")
+        if options["reset"]:
+            SlowQuery.objects.all().delete()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from taxi.services.telegram_helper import telegram_sender
+
+
+class Command(BaseCommand):
+    help = (
+        "Show how many Telegram digests were sent and how many events "
+        "were merged, delayed, dropped or failed."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--reset", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        for name, value in telegram_sender.stats().items():
+            self.stdout.write(f"{name}: {value}")
+        if options["reset"]:
+            telegram_sender.reset_stats()
@@ -0,0 +1,69 @@
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+
+class Command(BaseCommand):
+    help = (
+        "List the latest traces recorded in TRACING_FILE, or print one "
+        "trace as a tree of spans with their durations."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("trace_id", nargs="?")
+        parser.add_argument("--limit", type=int, default=20)
+
+    def load(self) -> dict[str, list[dict]]:
+        traces = defaultdict(list)
+        path = Path(settings.TRACING_FILE)
+        if path.exists():
+            with path.open() as file:
+                for line in file:
+                    span = json.loads(line)
+                    traces[span["trace_id"]].append(span)
+        return traces
+
+    def print_tree(self, spans: list[dict]) -> None:
+        children = defaultdict(list)
+        span_ids = {span["span_id"] for span in spans}
+        for span in sorted(spans, key=lambda span: span["start"]):
+            parent_id = span["parent_id"]
+            children[parent_id if parent_id in span_ids else None].append(span)
+
+        def write(span: dict, depth: int) -> None:
+            error = f"  ERROR {span['error']}" if span["error"] else ""
+            statement = span["attributes"].get("db.statement", "")
+            self.stdout.write(
+                f"{'  ' * depth}{span['name']} "
+                f"{span['duration_us'] / 1000:.2f} ms"
+                f"{'  ' + statement[:100] if statement else ''}{error}"
+            )
+            for child in children[span["span_id"]]:
+                write(child, depth + 1)
+
+        for root in children[None]:
+            write(root, 0)
+
+    def handle(self, *args, **options) -> None:
+        traces = self.load()
+        if options["trace_id"]:
+            spans = traces.get(options["trace_id"])
+            if not spans:
+                self.stderr.write("Trace not found")
+                return
+            self.print_tree(spans)
+            return
+        latest = sorted(
+            traces.items(),
+            key=lambda item: min(span["start"] for span in item[1]),
+            reverse=True,
+        )[: options["limit"]]
+        for trace_id, spans in latest:
+            root = max(spans, key=lambda span: span["duration_us"])
+            self.stdout.write(
+                f"{trace_id}  {root['name']}  "
+                f"{root['duration_us'] / 1000:.2f} ms  {len(spans)} spans"
+            )
@@ -0,0 +1,108 @@
+import random
+import time
+from collections.abc import Callable
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+
+from taxi.services.metrics import QueryCounter, observe_request, view_labels
+from taxi.services.permissions import is_staff_request
+from taxi.services.profiling import profile_request
+from taxi.services.slow_queries import current_origin, slow_query_log
+from taxi.services.tracing import span
+
+
+class SamplingProfilerMiddleware:
+    """
+    Profiles PROFILER_SAMPLE_RATE of all requests, plus every request
+    from a staff user that carries the PROFILER_HEADER header.
+    """
+
+    def __init__(
+        self, get_response: Callable[[HttpRequest], HttpResponse]
+    ) -> None:
+        self.get_response = get_response
+
+    def should_profile(self, request: HttpRequest) -> bool:
+        if random.random() < settings.PROFILER_SAMPLE_RATE:
+            return True
+        header = "HTTP_" + settings.PROFILER_HEADER.upper().replace("-", "_")
+        return bool(request.META.get(header)) and is_staff_request(request)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not self.should_profile(request):
+            return self.get_response(request)
+        return profile_request(self.get_response, request)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and SQL statement count and time of every
+    request, labelled by viewset and action.
+    """
+
+    def __init__(
+        self, get_response: Callable[[HttpRequest], HttpResponse]
+    ) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        observe_request(
+            request,
+            response.status_code,
+            time.perf_counter() - started,
+            queries,
+        )
+        return response
+
+
+class TracingMiddleware:
+    """
+    Opens the root span of a request, continuing the caller's trace
+    when a ``traceparent`` header is sent. The span is named after the
+    viewset and action once the route is resolved.
+    """
+
+    def __init__(
+        self, get_response: Callable[[HttpRequest], HttpResponse]
+    ) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with span(
+            "http.request",
+            {"http.method": request.method, "http.path": request.path},
+            request.headers.get("traceparent"),
+        ) as request_span:
+            response = self.get_response(request)
+            if request_span is not None:
+                request_span.name = ".".join(view_labels(request))
+                request_span.attributes["http.status"] = response.status_code
+                response["X-Trace-Id"] = request_span.trace_id
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Attributes slow statements to the request that ran them and
+    flushes the slow query log once a request is done.
+    """
+
+    def __init__(
+        self, get_response: Callable[[HttpRequest], HttpResponse]
+    ) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        token = current_origin.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_origin.reset(token)
+        slow_query_log.maybe_flush()
+        return response
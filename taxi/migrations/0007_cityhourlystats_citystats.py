@@ -0,0 +1,84 @@
+# Generated by Django 5.0 on 2026-10-19 06:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0006_alter_car_options_alter_city_options_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CityHourlyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField()),
+                ("orders_created", models.IntegerField(default=0)),
+                ("distance_total", models.BigIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=12
+                    ),
+                ),
+                (
+                    "city",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hourly_stats",
+                        to="taxi.city",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "city hourly stats",
+                "ordering": ["-hour"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CityStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("active_orders", models.IntegerField(default=0)),
+                ("rides_waiting", models.IntegerField(default=0)),
+                ("rides_in_process", models.IntegerField(default=0)),
+                ("rides_finished", models.IntegerField(default=0)),
+                (
+                    "city",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stats",
+                        to="taxi.city",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "city stats",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="cityhourlystats",
+            constraint=models.UniqueConstraint(
+                fields=("city", "hour"), name="unique_city_hour"
+            ),
+        ),
+    ]
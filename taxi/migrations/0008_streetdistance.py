@@ -0,0 +1,46 @@
+# Generated by Django 5.0 on 2026-10-19 06:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0007_cityhourlystats_citystats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StreetDistance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("street_from", models.CharField(max_length=255)),
+                ("street_to", models.CharField(max_length=255)),
+                ("distance", models.IntegerField()),
+                (
+                    "city",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="street_distances",
+                        to="taxi.city",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="streetdistance",
+            constraint=models.UniqueConstraint(
+                fields=("city", "street_from", "street_to"),
+                name="unique_street_distance",
+            ),
+        ),
+    ]
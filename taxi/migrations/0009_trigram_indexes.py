@@ -0,0 +1,37 @@
+# Generated by Django 5.0 on 2026-10-19 06:39
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0008_streetdistance"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="car",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("number"),
+                    name="gin_trgm_ops",
+                ),
+                name="car_number_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="city",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="gin_trgm_ops",
+                ),
+                name="city_name_trgm",
+            ),
+        ),
+    ]
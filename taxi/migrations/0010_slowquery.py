@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-19 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0009_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=64, unique=True)),
+                ("sql", models.TextField()),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("total_ms", models.FloatField(default=0)),
+                ("max_ms", models.FloatField(default=0)),
+                ("p95_ms", models.FloatField(default=0)),
+                ("durations", models.JSONField(default=list)),
+                ("origin", models.CharField(blank=True, max_length=255)),
+                ("stack", models.TextField(blank=True)),
+                ("last_seen", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name_plural": "slow queries",
+                "ordering": ["-total_ms"],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-19 06:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0010_slowquery"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="city",
+            name="order_ttl_minutes",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Minutes an unclaimed order stays open, ORDER_TTL_MINUTES when empty.",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["date_created"],
+                name="order_active_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,160 @@
+# Generated by Django 5.0 on 2026-10-19 07:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_ride_summaries(apps, schema_editor):
+    # The read model must not start empty for rides created before it.
+    # Written against the historical models, as taxi.services.ride_summary
+    # follows the live ones; `rebuild_ride_summaries` repairs drift later.
+    Ride = apps.get_model("taxi", "Ride")
+    RideSummary = apps.get_model("taxi", "RideSummary")
+    rides = (
+        Ride.objects.using(schema_editor.connection.alias)
+        .order_by("id")
+        .values_list(
+            "id",
+            "order_id",
+            "order__user_id",
+            "driver_id",
+            "driver__user_id",
+            "driver__user__first_name",
+            "driver__user__last_name",
+            "car__number",
+            "status",
+            "rate",
+        )
+    )
+    summaries = RideSummary.objects.using(schema_editor.connection.alias)
+    batch = []
+    for (
+        ride_id,
+        order_id,
+        user_id,
+        driver_id,
+        driver_user_id,
+        first_name,
+        last_name,
+        car_number,
+        status,
+        rate,
+    ) in rides.iterator(chunk_size=BATCH_SIZE):
+        batch.append(
+            RideSummary(
+                ride_id=ride_id,
+                order_id=order_id,
+                user_id=user_id,
+                driver_id=driver_id,
+                driver_user_id=driver_user_id,
+                driver_name=f"{first_name} {last_name}",
+                car_number=car_number,
+                status=status,
+                rate=rate,
+            )
+        )
+        if len(batch) == BATCH_SIZE:
+            summaries.bulk_create(batch)
+            batch = []
+    summaries.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0011_city_order_ttl_order_active_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RideSummary",
+            fields=[
+                (
+                    "ride",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="summary",
+                        serialize=False,
+                        to="taxi.ride",
+                    ),
+                ),
+                ("driver_name", models.CharField(max_length=201)),
+                ("car_number", models.CharField(max_length=255)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("3", "Finished"),
+                            ("1", "Waiting for client"),
+                            ("2", "In process"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+                ("rate", models.IntegerField(blank=True, null=True)),
+                (
+                    "driver",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="taxi.driver",
+                    ),
+                ),
+                (
+                    "driver_user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="taxi.order",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "ride summaries",
+                "ordering": ["status"],
+                "indexes": [
+                    models.Index(
+                        fields=["status"], name="ride_summary_status_idx"
+                    ),
+                    models.Index(
+                        fields=["user", "status"], name="ride_summary_user_idx"
+                    ),
+                    models.Index(
+                        fields=["driver", "status"],
+                        name="ride_summary_driver_idx",
+                    ),
+                    models.Index(
+                        fields=["driver_user", "status"],
+                        name="ride_summary_driver_user_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(
+            backfill_ride_summaries, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-19 07:45
+
+from django.db import migrations, models
+
+
+def mark_history_routes_estimated(apps, schema_editor):
+    # Every route so far came from the order history backend.
+    StreetDistance = apps.get_model("taxi", "StreetDistance")
+    StreetDistance.objects.update(estimated=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0012_ridesummary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="streetdistance",
+            name="estimated",
+            field=models.BooleanField(
+                default=False,
+                help_text="Not routed but estimated, replaced once it expires.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="streetdistance",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(
+            mark_history_routes_estimated, migrations.RunPython.noop
+        ),
+    ]
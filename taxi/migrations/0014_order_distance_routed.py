@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-19 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0013_streetdistance_estimated"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="distance_routed",
+            field=models.BooleanField(
+                default=False,
+                help_text="Set by the distance service, not reported by the client.",
+            ),
+        ),
+    ]
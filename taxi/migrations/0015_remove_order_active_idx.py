@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-19 08:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taxi", "0014_order_distance_routed"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="order",
+            name="order_active_created_idx",
+        ),
+    ]
@@ -1,14 +1,28 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from taxi_service import settings
 
 
 class City(models.Model):
     name = models.CharField(max_length=255)
+    order_ttl_minutes = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Minutes an unclaimed order stays open, "
+        "ORDER_TTL_MINUTES when empty.",
+    )
 
     class Meta:
         verbose_name_plural = "cities"
         ordering = ["name"]
+        indexes = [
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="city_name_trgm",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -45,6 +59,12 @@ class Car(models.Model):
 
     class Meta:
         ordering = ["model"]
+        indexes = [
+            GinIndex(
+                OpClass(Upper("number"), name="gin_trgm_ops"),
+                name="car_number_trgm",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.driver}: {self.model}"
@@ -86,6 +106,10 @@ class Order(models.Model):
     street_from = models.CharField(max_length=255)
     street_to = models.CharField(max_length=255)
     distance = models.IntegerField()
+    distance_routed = models.BooleanField(
+        default=False,
+        help_text="Set by the distance service, not reported by the client.",
+    )
     date_created = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
 
@@ -117,3 +141,147 @@ class Ride(models.Model):
 
     def __str__(self) -> str:
         return f"{self.driver}: {self.order}"
+
+
+class RideSummary(models.Model):
+    """
+    One narrow row per ride with what the ride list shows and filters
+    on, kept in sync with the live tables by taxi.services.ride_summary.
+    """
+
+    ride = models.OneToOneField(
+        Ride,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="summary",
+    )
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="+"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+    )
+    driver = models.ForeignKey(
+        Driver, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    driver_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+    )
+    driver_name = models.CharField(max_length=201)
+    car_number = models.CharField(max_length=255)
+    status = models.CharField(max_length=6, choices=Ride.STATUS_CHOICES)
+    rate = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "ride summaries"
+        ordering = ["status"]
+        indexes = [
+            models.Index(fields=["status"], name="ride_summary_status_idx"),
+            models.Index(
+                fields=["user", "status"], name="ride_summary_user_idx"
+            ),
+            models.Index(
+                fields=["driver", "status"], name="ride_summary_driver_idx"
+            ),
+            models.Index(
+                fields=["driver_user", "status"],
+                name="ride_summary_driver_user_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.driver_name}: {self.ride_id}"
+
+
+class CityStats(models.Model):
+    city = models.OneToOneField(
+        City, on_delete=models.CASCADE, related_name="stats"
+    )
+    active_orders = models.IntegerField(default=0)
+    rides_waiting = models.IntegerField(default=0)
+    rides_in_process = models.IntegerField(default=0)
+    rides_finished = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "city stats"
+
+    def __str__(self) -> str:
+        return f"{self.city}: stats"
+
+
+class CityHourlyStats(models.Model):
+    city = models.ForeignKey(
+        City, on_delete=models.CASCADE, related_name="hourly_stats"
+    )
+    hour = models.DateTimeField()
+    orders_created = models.IntegerField(default=0)
+    distance_total = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "city hourly stats"
+        ordering = ["-hour"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["city", "hour"], name="unique_city_hour"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.city}: {self.hour}"
+
+
+class StreetDistance(models.Model):
+    city = models.ForeignKey(
+        City, on_delete=models.CASCADE, related_name="street_distances"
+    )
+    street_from = models.CharField(max_length=255)
+    street_to = models.CharField(max_length=255)
+    distance = models.IntegerField()
+    estimated = models.BooleanField(
+        default=False,
+        help_text="Not routed but estimated, replaced once it expires.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["city", "street_from", "street_to"],
+                name="unique_street_distance",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.street_from} - {self.street_to}: {self.distance}"
+
+
+class SlowQuery(models.Model):
+    """
+    Statements slower than SLOW_QUERY_THRESHOLD_MS, aggregated by
+    fingerprint: the SQL with literals and parameters normalized away.
+    """
+
+    fingerprint = models.CharField(max_length=64, unique=True)
+    sql = models.TextField()
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    p95_ms = models.FloatField(default=0)
+    durations = models.JSONField(default=list)
+    origin = models.CharField(max_length=255, blank=True)
+    stack = models.TextField(blank=True)
+    last_seen = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "slow queries"
+        ordering = ["-total_ms"]
+
+    def __str__(self) -> str:
+        return f"{self.count}x {self.sql[:80]}"
@@ -1,7 +1,25 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 
 from payment.models import Payment
-from taxi.models import City, DriverApplication, Driver, Order, Ride, Car
+from taxi.models import (
+    City,
+    CityHourlyStats,
+    CityStats,
+    DriverApplication,
+    Driver,
+    Order,
+    Ride,
+    RideSummary,
+    Car,
+    SlowQuery,
+)
+from taxi.services import city_stats
+from taxi.services.demand import demand_counters
+from taxi.services.routing import distance_service
+from taxi.services.slow_queries import TOP_ORDERINGS
+from taxi.services.street_index import street_index
 from taxi.services.telegram_helper import send_message
 from user.serializers import UserSerializer
 
@@ -12,6 +30,57 @@ class CitySerializer(serializers.ModelSerializer):
         fields = ("id", "name")
 
 
+class CityAdminSerializer(CitySerializer):
+    class Meta:
+        model = City
+        fields = ("id", "name", "order_ttl_minutes")
+
+
+class CityStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CityStats
+        fields = (
+            "active_orders",
+            "rides_waiting",
+            "rides_in_process",
+            "rides_finished",
+        )
+
+
+class CityHourlyStatsSerializer(serializers.ModelSerializer):
+    average_distance = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CityHourlyStats
+        fields = ("hour", "orders_created", "average_distance", "revenue")
+
+    def get_average_distance(self, obj: CityHourlyStats) -> float | None:
+        if not obj.orders_created:
+            return None
+        return round(obj.distance_total / obj.orders_created, 2)
+
+
+class CityDashboardQuerySerializer(serializers.Serializer):
+    hours = serializers.IntegerField(min_value=1, max_value=168, default=24)
+
+
+class CitySurgeSerializer(serializers.Serializer):
+    orders_opened = serializers.IntegerField()
+    orders_taken = serializers.IntegerField()
+    free_drivers = serializers.IntegerField()
+    multiplier = serializers.DecimalField(max_digits=3, decimal_places=1)
+
+
+class StreetAutocompleteQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=1, max_length=255)
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=10)
+
+
+class StreetSuggestionSerializer(serializers.Serializer):
+    street = serializers.CharField()
+    count = serializers.IntegerField()
+
+
 class DriverApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = DriverApplication
@@ -98,6 +167,15 @@ class DriverApplicationDetailSerializer(DriverApplicationSerializer):
     sex = serializers.CharField(source="get_sex_display")
 
 
+class DriverApplicationBulkReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=5000
+    )
+    status = serializers.ChoiceField(
+        choices=[("A", "Approved"), ("R", "Rejected")]
+    )
+
+
 class DriverSerializer(serializers.ModelSerializer):
     class Meta:
         model = Driver
@@ -116,12 +194,60 @@ class DriverListSerializer(serializers.ModelSerializer):
         fields = ("id", "user", "rate")
 
 
+class DriverLeaderboardQuerySerializer(serializers.Serializer):
+    city = serializers.PrimaryKeyRelatedField(queryset=City.objects.all())
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class DriverDashboardPeriodSerializer(serializers.Serializer):
+    rides = serializers.IntegerField()
+    finished = serializers.IntegerField()
+    distance = serializers.IntegerField()
+    earnings = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class DriverDashboardRatingSerializer(serializers.Serializer):
+    average = serializers.DecimalField(
+        max_digits=3, decimal_places=2, allow_null=True
+    )
+    count = serializers.IntegerField()
+    breakdown = serializers.DictField(child=serializers.IntegerField())
+
+
+class DriverDashboardSerializer(serializers.Serializer):
+    today = DriverDashboardPeriodSerializer()
+    week = DriverDashboardPeriodSerializer()
+    total = DriverDashboardPeriodSerializer()
+    rating = DriverDashboardRatingSerializer()
+
+
 class DriverDetailSerializer(DriverSerializer):
     user = UserSerializer(many=False, read_only=True)
     city = CitySerializer(many=False, read_only=True)
     sex = serializers.CharField(source="get_sex_display")
 
 
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=3, max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class DriverSearchSerializer(DriverListSerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Driver
+        fields = ("id", "user", "rate", "similarity")
+
+
+class CitySearchSerializer(CitySerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = City
+        fields = ("id", "name", "similarity")
+
+
 class CarSerializer(serializers.ModelSerializer):
     driver = serializers.SlugRelatedField(
         many=False,
@@ -154,6 +280,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "is_active",
         )
         read_only_fields = ("id", "user", "date_created", "is_active")
+        extra_kwargs = {"distance": {"required": False}}
 
     def validate(self, attrs: dict) -> dict:
         if Order.objects.filter(
@@ -168,6 +295,16 @@ class OrderSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "You can`t create an order with pending payment"
             )
+        route_distance = distance_service.resolve(
+            attrs["city"].id, attrs["street_from"], attrs["street_to"]
+        )
+        if route_distance is not None:
+            attrs["distance"] = route_distance
+            attrs["distance_routed"] = True
+        elif "distance" not in attrs:
+            raise serializers.ValidationError(
+                "Distance is required for an unknown route"
+            )
         if attrs["distance"] < 50:
             raise serializers.ValidationError(
                 "Distance must be at least 50 meters"
@@ -178,6 +315,11 @@ class OrderSerializer(serializers.ModelSerializer):
         order = Order.objects.create(
             user=self.context["request"].user, **validated_data
         )
+        city_stats.record_order_created(order)
+        transaction.on_commit(
+            lambda: demand_counters.record_order_opened(order.city_id)
+        )
+        transaction.on_commit(lambda: street_index.refresh(order.city_id))
         telegram_message = (
             f"User {self.context['request'].user.full_name} created an order\n"
             f"City: {order.city.name}\n"
@@ -260,6 +402,20 @@ class RideListSerializer(serializers.ModelSerializer):
         fields = ("id", "order", "driver", "car", "status", "rate")
 
 
+class RideSummaryListSerializer(serializers.ModelSerializer):
+    """The output of RideListSerializer, read from the RideSummary table."""
+
+    id = serializers.IntegerField(source="ride_id", read_only=True)
+    order = serializers.IntegerField(source="order_id", read_only=True)
+    driver = serializers.CharField(source="driver_name", read_only=True)
+    car = serializers.CharField(source="car_number", read_only=True)
+    status = serializers.CharField(source="get_status_display")
+
+    class Meta:
+        model = RideSummary
+        fields = ("id", "order", "driver", "car", "status", "rate")
+
+
 class RideDetailSerializer(RideListSerializer):
     order = OrderDetailSerializer(many=False, read_only=True)
     driver = DriverDetailSerializer(many=False, read_only=True)
@@ -268,3 +424,48 @@ class RideDetailSerializer(RideListSerializer):
 
 class RideRateSerializer(serializers.Serializer):
     rate = serializers.ChoiceField(choices=range(1, 6))
+
+
+class CarSearchSerializer(CarSerializer):
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Car
+        fields = ("id", "model", "number", "driver", "similarity")
+
+
+class SlowQuerySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SlowQuery
+        fields = (
+            "fingerprint",
+            "sql",
+            "count",
+            "total_ms",
+            "p95_ms",
+            "max_ms",
+            "origin",
+            "stack",
+            "last_seen",
+        )
+
+
+class SlowQueryTopSerializer(serializers.Serializer):
+    order = serializers.ChoiceField(choices=TOP_ORDERINGS, default="total_ms")
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=["GET"], default="GET")
+    path = serializers.RegexField(r"^/api/v1/", max_length=2048)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, value: list[dict]) -> list[dict]:
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"At most {settings.BATCH_MAX_REQUESTS} requests per batch."
+            )
+        return value
@@ -0,0 +1,91 @@
+from collections import Counter
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from taxi.models import Driver, DriverApplication
+from taxi.services.demand import demand_counters
+
+
+def bulk_review_applications(ids: list[int], new_status: str) -> list[dict]:
+    """
+    Approve or reject many pending applications in a constant number
+    of queries: one locking select, one bulk insert of drivers,
+    one users update and one applications update.
+    """
+    ids = list(dict.fromkeys(ids))
+    reviewed_at = timezone.now()
+    results = {}
+    with transaction.atomic():
+        applications = {
+            application.id: application
+            for application in DriverApplication.objects.select_for_update(
+                of=("self",)
+            ).filter(id__in=ids)
+        }
+        pending = []
+        for application_id in ids:
+            application = applications.get(application_id)
+            if application is None:
+                results[application_id] = "Application not found"
+            elif application.status != "P":
+                results[application_id] = "Application already processed"
+            else:
+                pending.append(application)
+
+        drivers = {}
+        if new_status == "A" and pending:
+            existing_drivers = set(
+                Driver.objects.filter(
+                    user_id__in=[
+                        application.user_id for application in pending
+                    ]
+                ).values_list("user_id", flat=True)
+            )
+            approved = []
+            for application in pending:
+                if application.user_id in existing_drivers:
+                    results[application.id] = "User is already a driver"
+                    continue
+                existing_drivers.add(application.user_id)
+                approved.append(application)
+                drivers[application.id] = Driver(
+                    user_id=application.user_id,
+                    license_number=application.license_number,
+                    age=application.age,
+                    city_id=application.city_id,
+                    sex=application.sex,
+                )
+            pending = approved
+            Driver.objects.bulk_create(drivers.values())
+            get_user_model().objects.filter(
+                id__in=[application.user_id for application in pending]
+            ).update(is_driver=True)
+
+        DriverApplication.objects.filter(
+            id__in=[application.id for application in pending]
+        ).update(status=new_status, reviewed_at=reviewed_at)
+
+        hired = Counter(driver.city_id for driver in drivers.values())
+        for city_id, count in hired.items():
+            transaction.on_commit(
+                partial(demand_counters.record_drivers_freed, city_id, count)
+            )
+
+    status_display = dict(DriverApplication.STATUS_CHOICES)[new_status]
+    for application in pending:
+        driver = drivers.get(application.id)
+        results[application.id] = {
+            "status": status_display,
+            "driver": driver.id if driver else None,
+        }
+    return [
+        (
+            {"id": application_id, **results[application_id]}
+            if isinstance(results[application_id], dict)
+            else {"id": application_id, "error": results[application_id]}
+        )
+        for application_id in ids
+    ]
@@ -0,0 +1,146 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import HttpRequest, QueryDict
+from django.urls import ResolverMatch, Resolver404, resolve
+from rest_framework import mixins, status
+from rest_framework.request import Request
+
+from taxi.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Viewset actions that only read. Several GET actions change state
+# (e.g. the payment redirects, apply, fire, in_process), so a batch
+# item may only reach the ones listed here.
+READ_ONLY_ACTIONS = frozenset(
+    {
+        "list",
+        "retrieve",
+        "dashboard",
+        "surge",
+        "streets",
+        "leaderboard",
+        "rank",
+        "stats",
+    }
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BATCH_MAX_WORKERS,
+                thread_name_prefix="batch",
+            )
+        return _executor
+
+
+def sub_request(request: Request, method: str, path: str) -> HttpRequest:
+    """
+    A bare Django request for ``path`` carrying the batch's headers and
+    its already authenticated user, so the view skips JWT decoding.
+    """
+    url = urlsplit(path)
+    sub = HttpRequest()
+    sub.method = method
+    sub.path = sub.path_info = url.path
+    sub.META = {
+        **request._request.META,
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+    }
+    sub.GET = QueryDict(url.query)
+    # Picked up by rest_framework.request.Request as forced authentication.
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def is_read_only(match: ResolverMatch) -> bool:
+    """
+    Whether GET on the matched view is a read-only action: an allowed
+    viewset action, or a generic view's list or retrieve.
+    """
+    actions = getattr(match.func, "actions", None)
+    if actions is not None:
+        return actions.get("get") in READ_ONLY_ACTIONS
+    view_class = getattr(match.func, "view_class", None)
+    return view_class is not None and issubclass(
+        view_class, (mixins.ListModelMixin, mixins.RetrieveModelMixin)
+    )
+
+
+def run_one(request: Request, item: dict) -> dict:
+    method, path = item["method"], item["path"]
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        match = None
+    if match is None or not is_read_only(match):
+        return {
+            "status": status.HTTP_404_NOT_FOUND,
+            "body": {"detail": "Not found."},
+        }
+    sub = sub_request(request, method, path)
+    sub.resolver_match = match
+    with span("batch.item", {"http.method": method, "http.target": path}):
+        try:
+            response = match.func(sub, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception("Batch item %s %s failed", method, path)
+            return {
+                "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "body": {"detail": "A server error occurred."},
+            }
+    return {
+        "status": response.status_code,
+        "body": getattr(response, "data", None),
+    }
+
+
+def run_in_thread(request: Request, item: dict) -> dict:
+    # Worker threads keep their own DB connection between batches and
+    # drop it like a request would, according to CONN_MAX_AGE.
+    close_old_connections()
+    try:
+        return run_one(request, item)
+    finally:
+        close_old_connections()
+
+
+def can_run_in_parallel(items: list[dict]) -> bool:
+    """
+    Only reads are batched, so items may run side by side, except
+    inside a transaction: other threads would not see its rows.
+    """
+    return (
+        len(items) > 1
+        and settings.BATCH_MAX_WORKERS > 1
+        and not connection.in_atomic_block
+    )
+
+
+def run_batch(request: Request, items: list[dict]) -> list[dict]:
+    """
+    Run every item through its view in this process and return the
+    responses in item order, each with its own status code.
+    """
+    if not can_run_in_parallel(items):
+        return [run_one(request, item) for item in items]
+    futures = [
+        executor().submit(copy_context().run, run_in_thread, request, item)
+        for item in items
+    ]
+    return [future.result() for future in futures]
@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Model, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from payment.models import Payment
+from taxi.models import City, CityHourlyStats, CityStats, Order, Ride
+
+RIDE_STATUS_FIELDS = {
+    "1": "rides_waiting",
+    "2": "rides_in_process",
+    "3": "rides_finished",
+}
+
+
+def truncate_hour(moment: datetime) -> datetime:
+    return moment.astimezone(dt_timezone.utc).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+def _increment(model: type[Model], keys: dict, deltas: dict) -> None:
+    """
+    Atomically add ``deltas`` to the row identified by ``keys``,
+    creating it when missing, with a single INSERT ... ON CONFLICT.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    meta = model._meta
+    values = {
+        field.name: deltas.get(field.name, field.get_default())
+        for field in meta.concrete_fields
+        if not field.primary_key and field.name not in keys
+    }
+    columns = {
+        field: meta.get_field(field).column for field in [*keys, *values]
+    }
+    insert_columns = ", ".join(columns[field] for field in [*keys, *values])
+    placeholders = ", ".join(["%s"] * (len(keys) + len(values)))
+    conflict_columns = ", ".join(columns[field] for field in keys)
+    updates = ", ".join(
+        f"{columns[field]} = {meta.db_table}.{columns[field]} "
+        f"+ EXCLUDED.{columns[field]}"
+        for field in deltas
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {meta.db_table} ({insert_columns}) "
+            f"VALUES ({placeholders}) "
+            f"ON CONFLICT ({conflict_columns}) DO UPDATE SET {updates}",
+            [*keys.values(), *values.values()],
+        )
+
+
+def _increment_gauges(city_id: int, **deltas) -> None:
+    _increment(CityStats, {"city": city_id}, deltas)
+
+
+def _increment_hourly(city_id: int, moment: datetime, **deltas) -> None:
+    _increment(
+        CityHourlyStats,
+        {"city": city_id, "hour": truncate_hour(moment)},
+        deltas,
+    )
+
+
+def record_order_created(order: Order) -> None:
+    _increment_hourly(
+        order.city_id,
+        order.date_created,
+        orders_created=1,
+        distance_total=order.distance,
+    )
+    _increment_gauges(order.city_id, active_orders=1)
+
+
+def record_orders_closed(city_id: int, count: int = 1) -> None:
+    _increment_gauges(city_id, active_orders=-count)
+
+
+def record_ride_status(
+    city_id: int, old_status: str | None, new_status: str
+) -> None:
+    if old_status == new_status:
+        return
+    deltas = {RIDE_STATUS_FIELDS[new_status]: 1}
+    if old_status:
+        deltas[RIDE_STATUS_FIELDS[old_status]] = -1
+    _increment_gauges(city_id, **deltas)
+
+
+def record_payment_paid(order: Order, amount: Decimal) -> None:
+    """
+    Revenue is bucketed by the hour the order was created,
+    the same way the daily profit report counts it.
+    """
+    _increment_hourly(order.city_id, order.date_created, revenue=amount)
+
+
+def reconcile_city_stats(hours: int = 48) -> None:
+    """
+    Recompute gauges from the live tables and the hourly rollups
+    for the last ``hours`` hours, fixing any drift left by paths
+    that bypass the incremental updates.
+    """
+    since = truncate_hour(timezone.now() - timedelta(hours=hours))
+    gauges = {
+        city_id: {"city_id": city_id}
+        for city_id in City.objects.values_list("id", flat=True)
+    }
+    for row in (
+        Order.objects.filter(is_active=True)
+        .values("city_id")
+        .annotate(count=Count("id"))
+        .order_by()
+    ):
+        gauges[row["city_id"]]["active_orders"] = row["count"]
+    for row in (
+        Ride.objects.values("order__city_id", "status")
+        .annotate(count=Count("id"))
+        .order_by()
+    ):
+        field = RIDE_STATUS_FIELDS[row["status"]]
+        gauges[row["order__city_id"]][field] = row["count"]
+
+    hourly = {}
+    for row in (
+        Order.objects.filter(date_created__gte=since)
+        .annotate(hour=TruncHour("date_created", tzinfo=dt_timezone.utc))
+        .values("city_id", "hour")
+        .annotate(orders_created=Count("id"), distance_total=Sum("distance"))
+        .order_by()
+    ):
+        hourly[(row["city_id"], row["hour"])] = CityHourlyStats(
+            city_id=row["city_id"],
+            hour=row["hour"],
+            orders_created=row["orders_created"],
+            distance_total=row["distance_total"],
+        )
+    for row in (
+        Payment.objects.filter(
+            status=Payment.StatusEnum.paid, order__date_created__gte=since
+        )
+        .annotate(
+            hour=TruncHour("order__date_created", tzinfo=dt_timezone.utc)
+        )
+        .values("order__city_id", "hour")
+        .annotate(revenue=Sum("money_to_pay"))
+        .order_by()
+    ):
+        key = (row["order__city_id"], row["hour"])
+        hourly.setdefault(
+            key, CityHourlyStats(city_id=key[0], hour=key[1])
+        ).revenue = row["revenue"]
+
+    with transaction.atomic():
+        CityStats.objects.bulk_create(
+            [CityStats(**values) for values in gauges.values()],
+            update_conflicts=True,
+            unique_fields=["city"],
+            update_fields=[
+                "active_orders",
+                "rides_waiting",
+                "rides_in_process",
+                "rides_finished",
+            ],
+        )
+        CityHourlyStats.objects.filter(hour__gte=since).delete()
+        CityHourlyStats.objects.bulk_create(
+            hourly.values(),
+            update_conflicts=True,
+            unique_fields=["city", "hour"],
+            update_fields=["orders_created", "distance_total", "revenue"],
+        )
@@ -0,0 +1,228 @@
+import threading
+import time
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db.models import Count, Exists, OuterRef
+from redis import Redis
+
+from taxi.models import City, Driver, Ride
+from taxi.services.redis_client import get_redis
+
+ORDER_OPENED = "opened"
+ORDER_TAKEN = "taken"
+
+# Move a gauge only once it has been seeded, a missing key stays
+# missing so the next read counts the drivers.
+ADD_IF_SEEDED = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    return redis.call("INCRBY", KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+class RedisCounterBackend:
+    """
+    One key per city, event and time bucket. INCRBY is atomic,
+    so concurrent workers never coordinate with each other.
+    """
+
+    def __init__(self, client: Redis) -> None:
+        self.client = client
+
+    @staticmethod
+    def _key(city_id: int, event: str, bucket: int) -> str:
+        return f"demand:{city_id}:{event}:{bucket}"
+
+    @staticmethod
+    def _gauge_key(city_id: int) -> str:
+        return f"demand:{city_id}:free_drivers"
+
+    def add(self, city_id: int, event: str, bucket: int, ttl: int) -> None:
+        key = self._key(city_id, event, bucket)
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.incr(key)
+        pipeline.expire(key, ttl)
+        pipeline.execute()
+
+    def total(self, city_id: int, event: str, buckets: range) -> int:
+        values = self.client.mget(
+            [self._key(city_id, event, bucket) for bucket in buckets]
+        )
+        return sum(int(value) for value in values if value)
+
+    def add_gauge(self, city_id: int, delta: int) -> None:
+        self.client.eval(ADD_IF_SEEDED, 1, self._gauge_key(city_id), delta)
+
+    def get_gauge(self, city_id: int) -> int | None:
+        value = self.client.get(self._gauge_key(city_id))
+        return None if value is None else int(value)
+
+    def seed_gauge(self, city_id: int, value: int) -> None:
+        self.client.set(self._gauge_key(city_id), value, nx=True)
+
+    def set_gauges(self, values: dict[int, int]) -> None:
+        if values:
+            self.client.mset(
+                {
+                    self._gauge_key(city_id): value
+                    for city_id, value in values.items()
+                }
+            )
+
+
+class MemoryCounterBackend:
+    """Per-process fallback used when REDIS_URL is not configured."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.buckets = defaultdict(dict)
+        self.gauges = {}
+
+    def add(self, city_id: int, event: str, bucket: int, ttl: int) -> None:
+        keep = ttl // settings.SURGE_BUCKET_SECONDS
+        with self.lock:
+            counts = self.buckets[(city_id, event)]
+            counts[bucket] = counts.get(bucket, 0) + 1
+            if len(counts) > keep:
+                for old_bucket in [b for b in counts if b <= bucket - keep]:
+                    del counts[old_bucket]
+
+    def total(self, city_id: int, event: str, buckets: range) -> int:
+        counts = self.buckets.get((city_id, event), {})
+        return sum(counts.get(bucket, 0) for bucket in buckets)
+
+    def add_gauge(self, city_id: int, delta: int) -> None:
+        with self.lock:
+            if city_id in self.gauges:
+                self.gauges[city_id] += delta
+
+    def get_gauge(self, city_id: int) -> int | None:
+        return self.gauges.get(city_id)
+
+    def seed_gauge(self, city_id: int, value: int) -> None:
+        with self.lock:
+            self.gauges.setdefault(city_id, value)
+
+    def set_gauges(self, values: dict[int, int]) -> None:
+        with self.lock:
+            self.gauges.update(values)
+
+
+class DemandCounters:
+    """
+    Orders opened and taken per city over a sliding window made of
+    SURGE_BUCKET_SECONDS buckets, plus a gauge of free drivers.
+    """
+
+    def __init__(self) -> None:
+        self.memory_backend = MemoryCounterBackend()
+
+    @property
+    def backend(self) -> RedisCounterBackend | MemoryCounterBackend:
+        client = get_redis()
+        if client is None:
+            return self.memory_backend
+        return RedisCounterBackend(client)
+
+    @staticmethod
+    def _current_bucket() -> int:
+        return int(time.time()) // settings.SURGE_BUCKET_SECONDS
+
+    @staticmethod
+    def _window_size() -> int:
+        return settings.SURGE_WINDOW_SECONDS // settings.SURGE_BUCKET_SECONDS
+
+    def _record(self, city_id: int, event: str) -> None:
+        self.backend.add(
+            city_id,
+            event,
+            self._current_bucket(),
+            settings.SURGE_WINDOW_SECONDS + settings.SURGE_BUCKET_SECONDS,
+        )
+
+    def record_order_opened(self, city_id: int) -> None:
+        self._record(city_id, ORDER_OPENED)
+
+    def record_order_taken(self, city_id: int) -> None:
+        self._record(city_id, ORDER_TAKEN)
+
+    def record_drivers_freed(self, city_id: int, count: int = 1) -> None:
+        self.backend.add_gauge(city_id, count)
+
+    def record_drivers_removed(self, city_id: int, count: int = 1) -> None:
+        self.backend.add_gauge(city_id, -count)
+
+    @staticmethod
+    def count_free_drivers(city_ids: list[int] | None = None) -> dict:
+        """Drivers without an active ride, per city."""
+        busy = Ride.objects.filter(
+            driver=OuterRef("pk"), status__in=["1", "2"]
+        )
+        cities = City.objects.all()
+        drivers = Driver.objects.filter(~Exists(busy))
+        if city_ids is not None:
+            cities = cities.filter(id__in=city_ids)
+            drivers = drivers.filter(city_id__in=city_ids)
+        free = {city_id: 0 for city_id in cities.values_list("id", flat=True)}
+        for row in (
+            drivers.values("city_id").annotate(count=Count("id")).order_by()
+        ):
+            free[row["city_id"]] = row["count"]
+        return free
+
+    def reset_free_drivers(self) -> None:
+        """
+        Recount drivers without an active ride, correcting drift
+        from transitions that bypass the counters.
+        """
+        self.backend.set_gauges(self.count_free_drivers())
+
+    def free_drivers(self, city_id: int) -> int:
+        """
+        The gauge of the city, counted from the database when it is
+        missing: in a fresh process, after a deploy or an eviction.
+        """
+        backend = self.backend
+        value = backend.get_gauge(city_id)
+        if value is None:
+            backend.seed_gauge(
+                city_id, self.count_free_drivers([city_id]).get(city_id, 0)
+            )
+            value = backend.get_gauge(city_id) or 0
+        return value
+
+    def snapshot(self, city_id: int) -> dict:
+        backend = self.backend
+        current = self._current_bucket()
+        buckets = range(current - self._window_size() + 1, current + 1)
+        return {
+            "orders_opened": backend.total(city_id, ORDER_OPENED, buckets),
+            "orders_taken": backend.total(city_id, ORDER_TAKEN, buckets),
+            "free_drivers": max(self.free_drivers(city_id), 0),
+        }
+
+    @staticmethod
+    def multiplier(snapshot: dict) -> Decimal:
+        """
+        Orders still waiting in the window against free drivers:
+        no surge while there is a driver for every order, then
+        SURGE_STEP per extra order per driver up to the maximum.
+        """
+        waiting = max(snapshot["orders_opened"] - snapshot["orders_taken"], 0)
+        ratio = Decimal(waiting) / max(snapshot["free_drivers"], 1)
+        if ratio <= 1:
+            return Decimal("1.0")
+        multiplier = min(
+            1 + (ratio - 1) * settings.SURGE_STEP,
+            settings.SURGE_MAX_MULTIPLIER,
+        )
+        return multiplier.quantize(Decimal("0.1"), rounding=ROUND_HALF_UP)
+
+    def surge_multiplier(self, city_id: int) -> Decimal:
+        return self.multiplier(self.snapshot(city_id))
+
+
+demand_counters = DemandCounters()
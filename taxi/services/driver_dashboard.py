@@ -0,0 +1,131 @@
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from payment.models import Payment
+from taxi.models import Ride
+
+RATES = range(1, 6)
+
+
+def period_starts(now: datetime) -> dict[str, datetime | None]:
+    today = timezone.localtime(now).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return {
+        "today": today,
+        "week": today - timedelta(days=today.weekday()),
+        "total": None,
+    }
+
+
+class DriverDashboard:
+    """
+    Ride counts, distance, earnings and rating breakdown of a driver,
+    computed with one aggregate query and cached per driver user until
+    one of their rides changes, DRIVER_DASHBOARD_CACHE_SECONDS pass or
+    the day ends, whichever comes first. Entries are keyed by a per
+    driver generation that invalidation bumps, so a dashboard computed
+    before a change lands under a key nobody reads any more.
+    """
+
+    @staticmethod
+    def generation_key(user_id: int) -> str:
+        return f"driver-dashboard:{user_id}:generation"
+
+    def generation(self, user_id: int) -> int:
+        key = self.generation_key(user_id)
+        generation = cache.get(key)
+        if generation is None:
+            # Seeded from the clock: a generation lost to eviction does
+            # not start over at a value older entries were stored under.
+            cache.add(key, time.time_ns(), None)
+            generation = cache.get(key)
+        return generation
+
+    def cache_key(self, user_id: int) -> str:
+        return f"driver-dashboard:{user_id}:{self.generation(user_id)}"
+
+    def get(self, user_id: int) -> dict:
+        key = self.cache_key(user_id)
+        dashboard = cache.get(key)
+        if dashboard is None:
+            now = timezone.now()
+            dashboard = self.compute(user_id, now)
+            tomorrow = period_starts(now)["today"] + timedelta(days=1)
+            cache.set(
+                key,
+                dashboard,
+                min(
+                    settings.DRIVER_DASHBOARD_CACHE_SECONDS,
+                    max(int((tomorrow - now).total_seconds()), 1),
+                ),
+            )
+        return dashboard
+
+    def invalidate(self, user_id: int) -> None:
+        try:
+            cache.incr(self.generation_key(user_id))
+        except ValueError:
+            cache.add(self.generation_key(user_id), time.time_ns(), None)
+
+    @staticmethod
+    def compute(user_id: int, now: datetime) -> dict:
+        """Every figure from a single pass over the driver's rides."""
+        paid = Q(order__payment__status=Payment.StatusEnum.paid)
+        finished = Q(status="3")
+        aggregates = {}
+        for period, since in period_starts(now).items():
+            in_period = Q(order__date_created__gte=since) if since else Q()
+            aggregates.update(
+                {
+                    f"{period}_rides": Count("id", filter=in_period or None),
+                    f"{period}_finished": Count(
+                        "id", filter=in_period & finished
+                    ),
+                    f"{period}_distance": Sum(
+                        "order__distance",
+                        filter=in_period & finished,
+                        default=0,
+                    ),
+                    f"{period}_earnings": Sum(
+                        "order__payment__money_to_pay",
+                        filter=in_period & paid,
+                        default=Decimal(0),
+                    ),
+                }
+            )
+        aggregates.update(
+            {
+                f"rated_{rate}": Count("id", filter=Q(rate=rate))
+                for rate in RATES
+            }
+        )
+        row = Ride.objects.filter(driver__user_id=user_id).aggregate(
+            rating_average=Avg("rate"), **aggregates
+        )
+        breakdown = {str(rate): row[f"rated_{rate}"] for rate in RATES}
+        return {
+            **{
+                period: {
+                    "rides": row[f"{period}_rides"],
+                    "finished": row[f"{period}_finished"],
+                    "distance": row[f"{period}_distance"],
+                    "earnings": row[f"{period}_earnings"],
+                }
+                for period in ("today", "week", "total")
+            },
+            "rating": {
+                "average": row["rating_average"],
+                "count": sum(breakdown.values()),
+                "breakdown": breakdown,
+            },
+        }
+
+
+driver_dashboard = DriverDashboard()
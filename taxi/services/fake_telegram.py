@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class FakeBotAPIHandler(BaseHTTPRequestHandler):
+    server: "FakeBotAPI"
+
+    def do_GET(self) -> None:
+        self.do_POST()
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode()))
+        if not url.path.endswith("/sendMessage"):
+            self.reply(404, {"ok": False, "error_code": 404})
+            return
+        self.reply(*self.server.send_message(params))
+
+    def reply(self, code: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class FakeBotAPI(ThreadingHTTPServer):
+    """
+    Local stand-in for the Bot API's sendMessage. It enforces a per-chat
+    limit of ``per_minute`` messages and answers 429 with retry_after
+    like Telegram does. Point TELEGRAM_API_URL at ``api_url``.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        per_minute: int = 20,
+        latency: float = 0.0,
+    ) -> None:
+        super().__init__(address, FakeBotAPIHandler)
+        self.per_minute = per_minute
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.messages = []
+        self.rejected = 0
+        self.sent_at = defaultdict(deque)
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/bot{{0}}/{{1}}"
+
+    def send_message(self, params: dict) -> tuple[int, dict]:
+        time.sleep(self.latency)
+        chat_id, text = params.get("chat_id"), params.get("text", "")
+        now = time.monotonic()
+        with self.lock:
+            sent_at = self.sent_at[chat_id]
+            while sent_at and sent_at[0] <= now - 60:
+                sent_at.popleft()
+            if len(sent_at) >= self.per_minute:
+                self.rejected += 1
+                retry_after = int(sent_at[0] + 60 - now) + 1
+                return 429, {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: "
+                    f"retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                }
+            sent_at.append(now)
+            self.messages.append((chat_id, text))
+            message_id = len(self.messages)
+        return 200, {
+            "ok": True,
+            "result": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(chat_id), "type": "group"},
+                "text": text,
+            },
+        }
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
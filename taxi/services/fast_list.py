@@ -0,0 +1,157 @@
+from collections.abc import Callable
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Model, QuerySet
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+# Model properties a list serializer may read, with the columns
+# they are computed from. Properties are not selectable with values().
+PROPERTIES = {
+    "full_name": (
+        ("first_name", "last_name"),
+        lambda first_name, last_name: f"{first_name} {last_name}",
+    ),
+}
+
+
+class RowRenderer:
+    """
+    A read-only list serializer compiled into the columns it needs
+    and a function turning one ``values_list()`` row into the same
+    dict the serializer would produce. Values are converted with the
+    serializer's own field instances so the output matches exactly.
+    """
+
+    def __init__(
+        self,
+        serializer_class: type[serializers.Serializer],
+        serializer: serializers.Serializer | None = None,
+    ) -> None:
+        self.lookups = []
+        self.render = self._compile(serializer or serializer_class(), "")
+
+    def _column(self, lookup: str) -> int:
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    @staticmethod
+    def _related_model(model: type[Model], path: list[str]) -> type[Model]:
+        for name in path:
+            model = model._meta.get_field(name).related_model
+        return model
+
+    def _compile(
+        self, serializer: serializers.ModelSerializer, prefix: str
+    ) -> Callable[[tuple], dict]:
+        model = serializer.Meta.model
+        getters = [
+            (name, self._compile_field(field, model, prefix))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+
+        def render(row: tuple) -> dict:
+            return {name: getter(row) for name, getter in getters}
+
+        return render
+
+    def _compile_field(
+        self, field: serializers.Field, model: type[Model], prefix: str
+    ) -> Callable[[tuple], object]:
+        if isinstance(field, serializers.ModelSerializer):
+            index = self._column(prefix + field.source)
+            render = self._compile(field, prefix + field.source + "__")
+            return lambda row: None if row[index] is None else render(row)
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return self._convert(field, self._column(prefix + field.source))
+
+        path = field.source.split(".")
+        if isinstance(field, serializers.SlugRelatedField):
+            path += field.slug_field.split("__")
+        elif field.source == "*" or isinstance(
+            field, serializers.RelatedField
+        ):
+            raise ImproperlyConfigured(
+                f"Field {field.field_name!r} of {model.__name__} "
+                "cannot be rendered from values()"
+            )
+        relation, attribute = path[:-1], path[-1]
+        lookup = prefix + "".join(f"{name}__" for name in relation)
+        model = self._related_model(model, relation)
+
+        if attribute in PROPERTIES:
+            names, compute = PROPERTIES[attribute]
+            indexes = [self._column(lookup + name) for name in names]
+            return lambda row: (
+                None
+                if row[indexes[0]] is None
+                else compute(*[row[index] for index in indexes])
+            )
+
+        if attribute.startswith("get_") and attribute.endswith("_display"):
+            name = attribute[len("get_") : -len("_display")]
+            choices = dict(model._meta.get_field(name).flatchoices)
+            index = self._column(lookup + name)
+            to_representation = field.to_representation
+            return lambda row: (
+                None
+                if row[index] is None
+                else to_representation(choices[row[index]])
+            )
+
+        model._meta.get_field(attribute)
+        return self._convert(field, self._column(lookup + attribute))
+
+    @staticmethod
+    def _convert(
+        field: serializers.Field, index: int
+    ) -> Callable[[tuple], object]:
+        if isinstance(field, serializers.RelatedField):
+            return lambda row: row[index]
+        to_representation = field.to_representation
+        return lambda row: (
+            None if row[index] is None else to_representation(row[index])
+        )
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        return queryset.prefetch_related(None).values_list(*self.lookups)
+
+    def render_rows(self, rows: QuerySet | list[tuple]) -> list[dict]:
+        render = self.render
+        return [render(row) for row in rows]
+
+
+class FastListMixin:
+    """
+    Serves ``list`` from ``values_list()`` rows rendered by the
+    compiled list serializer instead of model instances. Filtering,
+    permissions and pagination behave as in ``ListModelMixin``.
+    """
+
+    row_renderers = {}
+
+    @classmethod
+    def get_row_renderer(
+        cls, serializer_class: type[serializers.Serializer]
+    ) -> RowRenderer:
+        renderer = cls.row_renderers.get(serializer_class)
+        if renderer is None:
+            renderer = cls.row_renderers[serializer_class] = RowRenderer(
+                serializer_class
+            )
+        return renderer
+
+    def get_list_renderer(self) -> RowRenderer:
+        return self.get_row_renderer(self.get_serializer_class())
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        renderer = self.get_list_renderer()
+        rows = renderer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(renderer.render_rows(page))
+        return Response(renderer.render_rows(rows))
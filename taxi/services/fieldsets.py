@@ -0,0 +1,113 @@
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from taxi.services.fast_list import RowRenderer
+from taxi.services.join_planner import (
+    JoinPlan,
+    JoinPlannerMixin,
+    join_plan,
+    nested_serializer,
+)
+
+
+def parse_paths(value: str) -> dict:
+    """``id,order.city`` as the tree ``{"id": {}, "order": {"city": {}}}``."""
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def collapse(name: str, field: serializers.Field) -> serializers.Field:
+    """The nested object as its primary key, read without a join."""
+    return serializers.PrimaryKeyRelatedField(
+        read_only=True,
+        many=isinstance(field, serializers.ListSerializer),
+        **({"source": field.source} if field.source != name else {}),
+    )
+
+
+def shape(
+    serializer: serializers.Serializer,
+    fields: dict | None,
+    expand: dict | None,
+    path: str = "",
+) -> None:
+    """
+    Trim a bound serializer to ``fields`` and, when ``expand`` is given,
+    render the nested serializers it does not list as primary keys.
+    A nested path in ``fields`` expands the objects along it.
+    """
+    unknown = sorted(
+        {*(fields or ()), *(expand or ())} - serializer.fields.keys()
+    )
+    if unknown:
+        raise ValidationError(
+            {"fields": [f"Unknown field {path}{name}." for name in unknown]}
+        )
+    if fields:
+        for name in list(serializer.fields):
+            if name not in fields:
+                del serializer.fields[name]
+    for name, field in list(serializer.fields.items()):
+        nested = nested_serializer(field)
+        sub_fields = (fields or {}).get(name) or None
+        sub_expand = None if expand is None else expand.get(name)
+        if nested is None:
+            if sub_fields or sub_expand is not None:
+                raise ValidationError(
+                    {"fields": [f"Field {path}{name} cannot be expanded."]}
+                )
+            continue
+        if expand is not None and sub_expand is None and sub_fields is None:
+            serializer.fields[name] = collapse(name, field)
+            continue
+        shape(
+            nested,
+            sub_fields,
+            None if expand is None else sub_expand or {},
+            f"{path}{name}.",
+        )
+
+
+class SparseFieldsetMixin(JoinPlannerMixin):
+    """
+    ``?fields=id,order.city`` keeps only the listed fields, dotted paths
+    reaching into nested objects. ``?expand=order`` renders only the
+    listed nested objects in full and every other one as its id. Both
+    apply to ``list`` and ``retrieve``, whose joins then follow the
+    requested shape.
+    """
+
+    fieldset_actions = ("list", "retrieve")
+
+    def get_fieldset(self) -> tuple[dict | None, dict | None] | None:
+        params = self.request.query_params
+        if self.action not in self.fieldset_actions or not (
+            "fields" in params or "expand" in params
+        ):
+            return None
+        return (
+            parse_paths(params.get("fields", "")) or None,
+            parse_paths(params["expand"]) if "expand" in params else None,
+        )
+
+    def get_serializer(self, *args, **kwargs) -> serializers.Serializer:
+        serializer = super().get_serializer(*args, **kwargs)
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            shape(nested_serializer(serializer), *fieldset)
+        return serializer
+
+    def get_join_plan(self) -> JoinPlan | None:
+        if self.get_fieldset() is None:
+            return super().get_join_plan()
+        return join_plan(self.get_serializer())
+
+    def get_list_renderer(self) -> RowRenderer:
+        if self.get_fieldset() is None:
+            return super().get_list_renderer()
+        return RowRenderer(self.get_serializer_class(), self.get_serializer())
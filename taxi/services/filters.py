@@ -1,6 +1,14 @@
 import django_filters
 
-from taxi.models import Car, City, DriverApplication, Driver, Order, Ride
+from taxi.models import (
+    Car,
+    City,
+    DriverApplication,
+    Driver,
+    Order,
+    Ride,
+    RideSummary,
+)
 
 
 class CarFilters(django_filters.FilterSet):
@@ -76,3 +84,21 @@ class RideFilters(django_filters.FilterSet):
     class Meta:
         model = Ride
         fields = ["driver", "user", "status"]
+
+
+class RideSummaryFilters(django_filters.FilterSet):
+    driver = django_filters.NumberFilter(field_name="driver_id")
+    user = django_filters.NumberFilter(field_name="user_id")
+    status = django_filters.ChoiceFilter(
+        field_name="status",
+        choices=[
+            ("1", "Waiting for client"),
+            ("2", "In process"),
+            ("3", "Finished"),
+        ],
+        label="Status",
+    )
+
+    class Meta:
+        model = RideSummary
+        fields = ["driver", "user", "status"]
@@ -0,0 +1,114 @@
+import functools
+import hashlib
+import json
+import time
+from collections.abc import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.viewsets import GenericViewSet
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+POLL_SECONDS = 0.05
+
+
+def cache_key(user_id: int, scope: str, key: str) -> str:
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"idempotency:{user_id}:{scope}:{digest}"
+
+
+def request_fingerprint(request: Request) -> str:
+    data = request.data
+    if hasattr(data, "lists"):
+        data = dict(data.lists())
+    return hashlib.sha256(
+        json.dumps(
+            [request.method, request.path, data], sort_keys=True, default=str
+        ).encode()
+    ).hexdigest()
+
+
+def replay(stored: dict, fingerprint: str) -> Response:
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            {"detail": f"{HEADER} was already used for another request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(
+        stored["data"],
+        status=stored["status"],
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+def run_once(
+    request: Request, scope: str, key: str, view: Callable[[], Response]
+) -> Response:
+    """
+    Run ``view`` once per user, scope and key. The response is cached
+    for IDEMPOTENCY_TTL_SECONDS and replayed for repeated requests;
+    a repeat arriving while the first one still runs waits for it up
+    to IDEMPOTENCY_WAIT_SECONDS. Server errors are not cached, so the
+    request can be retried.
+    """
+    response_key = cache_key(request.user.id, scope, key)
+    lock_key = f"{response_key}:lock"
+    fingerprint = request_fingerprint(request)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while not cache.add(lock_key, 1, settings.IDEMPOTENCY_LOCK_SECONDS):
+        stored = cache.get(response_key)
+        if stored is not None:
+            return replay(stored, fingerprint)
+        if time.monotonic() >= deadline:
+            return Response(
+                {"detail": f"A request with this {HEADER} is in progress."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        time.sleep(POLL_SECONDS)
+    try:
+        stored = cache.get(response_key)
+        if stored is not None:
+            return replay(stored, fingerprint)
+        response = view()
+        if response.status_code < 500:
+            cache.set(
+                response_key,
+                {
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "data": response.data,
+                },
+                settings.IDEMPOTENCY_TTL_SECONDS,
+            )
+        return response
+    finally:
+        cache.delete(lock_key)
+
+
+def idempotent(view_method: Callable[..., Response]) -> Callable:
+    """Honour the Idempotency-Key header on a viewset action."""
+
+    @functools.wraps(view_method)
+    def wrapper(
+        self: GenericViewSet, request: Request, *args, **kwargs
+    ) -> Response:
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                {"detail": f"{HEADER} must be at most 255 characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return run_once(
+            request,
+            f"{type(self).__name__}.{view_method.__name__}",
+            key,
+            lambda: view_method(self, request, *args, **kwargs),
+        )
+
+    return wrapper
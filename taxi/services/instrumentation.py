@@ -0,0 +1,33 @@
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+STRIPE = "stripe"
+TELEGRAM = "telegram"
+
+# Called with (service, operation, seconds, error) after every call
+# made through ``external_call``; error is None on success.
+Listener = Callable[[str, str, float, BaseException | None], None]
+
+listeners: list[Listener] = []
+
+
+def add_listener(listener: Listener) -> None:
+    if listener not in listeners:
+        listeners.append(listener)
+
+
+@contextmanager
+def external_call(service: str, operation: str) -> Iterator[None]:
+    """Time a call to an external API and report it to the listeners."""
+    error = None
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        for listener in listeners:
+            listener(service, operation, duration, error)
@@ -0,0 +1,155 @@
+import threading
+from collections.abc import Iterator
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, QuerySet
+from rest_framework import serializers
+
+JoinPlan = tuple[list[str], list[str]]
+
+
+def nested_serializer(
+    field: serializers.Field,
+) -> serializers.Serializer | None:
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.Serializer):
+        return field
+    return None
+
+
+def relation_path(model: type[Model], attrs: list[str]) -> list[str]:
+    """The leading attributes of ``attrs`` that are model relations."""
+    path = []
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or attr != field.name:
+            break
+        path.append(attr)
+        model = field.related_model
+    return path
+
+
+def relation_paths(
+    serializer: serializers.Serializer, prefix: list[str]
+) -> Iterator[list[str]]:
+    """Every relation the serializer reads, as paths from the root."""
+    model = serializer.Meta.model
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        attrs = field.source_attrs
+        nested = nested_serializer(field)
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            # Read from the foreign key column, see use_pk_only_optimization.
+            attrs = attrs[:-1]
+        elif isinstance(field, serializers.SlugRelatedField):
+            attrs = attrs + field.slug_field.replace("__", ".").split(".")
+        path = relation_path(model, attrs)
+        if path:
+            yield prefix + path
+        if nested is not None:
+            yield from relation_paths(nested, prefix + path)
+
+
+def is_to_many(model: type[Model], path: list[str]) -> bool:
+    for name in path:
+        field = model._meta.get_field(name)
+        if field.many_to_many or field.one_to_many:
+            return True
+        model = field.related_model
+    return False
+
+
+def join_plan(
+    serializer: serializers.Serializer,
+) -> JoinPlan:
+    """``select_related`` and ``prefetch_related`` lookups the output needs."""
+    model = serializer.Meta.model
+    lookups = {
+        "__".join(path): path for path in relation_paths(serializer, [])
+    }
+    # A longer lookup joins its prefixes as well.
+    lookups = {
+        lookup: path
+        for lookup, path in lookups.items()
+        if not any(other.startswith(f"{lookup}__") for other in lookups)
+    }
+    select = sorted(
+        lookup
+        for lookup, path in lookups.items()
+        if not is_to_many(model, path)
+    )
+    prefetch = sorted(set(lookups) - set(select))
+    return select, prefetch
+
+
+def apply_join_plan(queryset: QuerySet, plan: JoinPlan) -> QuerySet:
+    select, prefetch = plan
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class JoinPlanner:
+    """
+    Join plans of serializer classes, derived from their source paths
+    the first time a class is used and kept for the process lifetime.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.plans = {}
+
+    def plan(self, serializer_class: type[serializers.Serializer]) -> JoinPlan:
+        plan = self.plans.get(serializer_class)
+        if plan is None:
+            plan = join_plan(serializer_class())
+            with self.lock:
+                self.plans[serializer_class] = plan
+        return plan
+
+    def apply(
+        self,
+        queryset: QuerySet,
+        serializer_class: type[serializers.Serializer],
+    ) -> QuerySet:
+        """
+        Join what the serializer reads. Serializers of another model,
+        like the input of an action, leave the queryset unjoined.
+        """
+        model = getattr(getattr(serializer_class, "Meta", None), "model", None)
+        if model is not queryset.model:
+            return apply_join_plan(queryset, ([], []))
+        return apply_join_plan(queryset, self.plan(serializer_class))
+
+
+join_planner = JoinPlanner()
+
+
+class JoinPlannerMixin:
+    """
+    Derives ``get_queryset``'s select_related and prefetch_related from
+    the serializer of the current action. Viewsets filter the result of
+    ``super().get_queryset()`` instead of declaring joins.
+    """
+
+    def get_join_serializer_class(self) -> type[serializers.Serializer]:
+        """The serializer the response is rendered with."""
+        return self.get_serializer_class()
+
+    def get_join_plan(self) -> JoinPlan | None:
+        return None
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+        plan = self.get_join_plan()
+        if plan is not None:
+            return apply_join_plan(queryset, plan)
+        return join_planner.apply(queryset, self.get_join_serializer_class())
@@ -0,0 +1,152 @@
+import threading
+from bisect import bisect_left, insort
+
+from redis import Redis
+
+from taxi.models import Driver
+from taxi.services.redis_client import get_redis
+
+
+class RedisLeaderboardBackend:
+    """One sorted set per city, every operation is O(log n)."""
+
+    def __init__(self, client: Redis) -> None:
+        self.client = client
+
+    @staticmethod
+    def _key(city_id: int) -> str:
+        return f"leaderboard:city:{city_id}"
+
+    def is_loaded(self, city_id: int) -> bool:
+        return bool(self.client.exists(self._key(city_id)))
+
+    def load(self, city_id: int, scores: dict[int, float]) -> None:
+        pipeline = self.client.pipeline()
+        pipeline.delete(self._key(city_id))
+        if scores:
+            pipeline.zadd(self._key(city_id), scores)
+        pipeline.execute()
+
+    def set(self, city_id: int, driver_id: int, score: float) -> None:
+        self.client.zadd(self._key(city_id), {driver_id: score})
+
+    def remove(self, city_id: int, driver_id: int) -> None:
+        self.client.zrem(self._key(city_id), driver_id)
+
+    def top(self, city_id: int, limit: int) -> list[tuple[int, float]]:
+        return [
+            (int(driver_id), score)
+            for driver_id, score in self.client.zrevrange(
+                self._key(city_id), 0, limit - 1, withscores=True
+            )
+        ]
+
+    def rank(self, city_id: int, driver_id: int) -> int | None:
+        rank = self.client.zrevrank(self._key(city_id), driver_id)
+        return None if rank is None else rank + 1
+
+
+class MemoryLeaderboardBackend:
+    """
+    Per-city list of (-score, driver_id) kept sorted with bisect,
+    lookups are O(log n) and inserts shift the list in C.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.scores = {}
+
+    def is_loaded(self, city_id: int) -> bool:
+        return city_id in self.entries
+
+    def load(self, city_id: int, scores: dict[int, float]) -> None:
+        with self.lock:
+            self.scores[city_id] = dict(scores)
+            self.entries[city_id] = sorted(
+                (-score, driver_id) for driver_id, score in scores.items()
+            )
+
+    def _discard(self, city_id: int, driver_id: int) -> None:
+        score = self.scores.setdefault(city_id, {}).pop(driver_id, None)
+        if score is not None:
+            entries = self.entries[city_id]
+            del entries[bisect_left(entries, (-score, driver_id))]
+
+    def set(self, city_id: int, driver_id: int, score: float) -> None:
+        with self.lock:
+            self._discard(city_id, driver_id)
+            self.scores[city_id][driver_id] = score
+            insort(self.entries.setdefault(city_id, []), (-score, driver_id))
+
+    def remove(self, city_id: int, driver_id: int) -> None:
+        with self.lock:
+            self._discard(city_id, driver_id)
+
+    def top(self, city_id: int, limit: int) -> list[tuple[int, float]]:
+        return [
+            (driver_id, -score)
+            for score, driver_id in self.entries.get(city_id, [])[:limit]
+        ]
+
+    def rank(self, city_id: int, driver_id: int) -> int | None:
+        score = self.scores.get(city_id, {}).get(driver_id)
+        if score is None:
+            return None
+        return bisect_left(self.entries[city_id], (-score, driver_id)) + 1
+
+
+class DriverLeaderboard:
+    """
+    Drivers of each city ranked by rate. A city is loaded from the
+    database on first use and then kept current by ``update``.
+    """
+
+    def __init__(self) -> None:
+        self.memory_backend = MemoryLeaderboardBackend()
+
+    @property
+    def backend(self) -> RedisLeaderboardBackend | MemoryLeaderboardBackend:
+        client = get_redis()
+        if client is None:
+            return self.memory_backend
+        return RedisLeaderboardBackend(client)
+
+    def _loaded_backend(
+        self, city_id: int
+    ) -> RedisLeaderboardBackend | MemoryLeaderboardBackend:
+        backend = self.backend
+        if not backend.is_loaded(city_id):
+            self.rebuild(city_id)
+        return backend
+
+    def rebuild(self, city_id: int) -> None:
+        scores = Driver.objects.filter(
+            city_id=city_id, rate__isnull=False
+        ).values_list("id", "rate")
+        self.backend.load(
+            city_id, {driver_id: float(rate) for driver_id, rate in scores}
+        )
+
+    def update(self, driver: Driver) -> None:
+        backend = self.backend
+        if not backend.is_loaded(driver.city_id):
+            self.rebuild(driver.city_id)
+        elif driver.rate is None:
+            backend.remove(driver.city_id, driver.id)
+        else:
+            backend.set(driver.city_id, driver.id, float(driver.rate))
+
+    def remove(self, city_id: int, driver_id: int) -> None:
+        self.backend.remove(city_id, driver_id)
+
+    def top(self, city_id: int, limit: int = 10) -> list[tuple[int, float]]:
+        return self._loaded_backend(city_id).top(city_id, limit)
+
+    def rank(self, driver: Driver) -> int | None:
+        return self._loaded_backend(driver.city_id).rank(
+            driver.city_id, driver.id
+        )
+
+
+driver_leaderboard = DriverLeaderboard()
@@ -0,0 +1,145 @@
+import os
+import time
+from collections.abc import Callable
+
+from django.http import HttpRequest
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from taxi.services.instrumentation import add_listener
+
+registry = CollectorRegistry()
+
+REQUEST_LATENCY = Histogram(
+    "taxi_http_request_duration_seconds",
+    "Request latency by viewset and action.",
+    ["view", "action"],
+    registry=registry,
+)
+REQUESTS = Counter(
+    "taxi_http_requests",
+    "Requests by viewset, action and response status.",
+    ["view", "action", "status"],
+    registry=registry,
+)
+DB_QUERIES = Histogram(
+    "taxi_db_queries_per_request",
+    "SQL statements executed per request.",
+    ["view", "action"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+    registry=registry,
+)
+DB_TIME = Histogram(
+    "taxi_db_seconds_per_request",
+    "Time spent in SQL per request.",
+    ["view", "action"],
+    registry=registry,
+)
+EXTERNAL_LATENCY = Histogram(
+    "taxi_external_call_duration_seconds",
+    "Latency of Stripe and Telegram API calls.",
+    ["service", "operation"],
+    registry=registry,
+)
+EXTERNAL_ERRORS = Counter(
+    "taxi_external_call_errors",
+    "Failed Stripe and Telegram API calls.",
+    ["service", "operation"],
+    registry=registry,
+)
+
+
+def view_labels(request: HttpRequest) -> tuple[str, str]:
+    """
+    ``(view, action)`` of the matched route: the viewset and its
+    action (``OrderViewSet``, ``take_order``) or the APIView and the
+    lowercased method. Unrouted requests share one label set.
+    """
+    match = request.resolver_match
+    if match is None:
+        return "unmatched", request.method.lower()
+    view = getattr(match.func, "cls", None) or match.func
+    actions = getattr(match.func, "actions", None) or {}
+    return (
+        getattr(view, "__name__", match.view_name),
+        actions.get(request.method.lower(), request.method.lower()),
+    )
+
+
+class QueryCounter:
+    """Connection execute wrapper counting statements and their time."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(
+        self,
+        execute: Callable,
+        sql: str,
+        params: object,
+        many: bool,
+        context: dict,
+    ) -> object:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+# Labelled children per (view, action, status); resolving labels on
+# every request costs more than the observations themselves.
+request_children = {}
+
+
+def observe_request(
+    request: HttpRequest,
+    status_code: int,
+    duration: float,
+    queries: QueryCounter,
+) -> None:
+    view, action = view_labels(request)
+    key = (view, action, status_code)
+    children = request_children.get(key)
+    if children is None:
+        children = request_children[key] = (
+            REQUEST_LATENCY.labels(view, action),
+            REQUESTS.labels(view, action, str(status_code)),
+            DB_QUERIES.labels(view, action),
+            DB_TIME.labels(view, action),
+        )
+    latency, requests, db_queries, db_time = children
+    latency.observe(duration)
+    requests.inc()
+    db_queries.observe(queries.count)
+    db_time.observe(queries.duration)
+
+
+def observe_external_call(
+    service: str, operation: str, duration: float, error: BaseException | None
+) -> None:
+    EXTERNAL_LATENCY.labels(service, operation).observe(duration)
+    if error is not None:
+        EXTERNAL_ERRORS.labels(service, operation).inc()
+
+
+add_listener(observe_external_call)
+
+
+def render_metrics() -> bytes:
+    """
+    Exposition of this process' metrics, or of all worker processes
+    when they share a PROMETHEUS_MULTIPROC_DIR.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        collector_registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(collector_registry)
+        return generate_latest(collector_registry)
+    return generate_latest(registry)
@@ -0,0 +1,120 @@
+import heapq
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from payment.models import Payment
+from payment.tasks import refund_payment
+from taxi.models import City, Order
+from taxi.services import city_stats
+
+
+class OrderExpiryScheduler:
+    """
+    Per-city min-heaps of active paid orders keyed by payment time, kept
+    by the Celery worker. Drivers only see paid orders, so the TTL runs
+    from the payment; orders still waiting for one are left to the
+    payment reaper. Each tick pulls orders paid after the last one
+    seen, pops those older than their city's TTL and closes them in
+    batches, refunding their payments. A TTL change applies on the next
+    tick since deadlines are computed when popping. The heaps are
+    rebuilt every ORDER_EXPIRY_RESYNC_SECONDS, picking up anything a
+    pull missed.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.heaps = defaultdict(list)
+        self.last_paid_at = None
+        self.loaded_at = None
+
+    def _sync(self) -> None:
+        active = Order.objects.filter(
+            is_active=True,
+            payment__status=Payment.StatusEnum.paid,
+            payment__paid_at__isnull=False,
+        ).order_by()
+        if (
+            self.loaded_at is None
+            or time.monotonic() - self.loaded_at
+            >= settings.ORDER_EXPIRY_RESYNC_SECONDS
+        ):
+            self.heaps = defaultdict(list)
+            self.last_paid_at = None
+            self.loaded_at = time.monotonic()
+        elif self.last_paid_at is not None:
+            active = active.filter(payment__paid_at__gt=self.last_paid_at)
+        for order_id, city_id, paid_at in active.values_list(
+            "id", "city_id", "payment__paid_at"
+        ):
+            heapq.heappush(self.heaps[city_id], (paid_at, order_id))
+            if self.last_paid_at is None or paid_at > self.last_paid_at:
+                self.last_paid_at = paid_at
+
+    def _ttls(self) -> dict[int, timedelta]:
+        return {
+            city_id: timedelta(minutes=minutes)
+            for city_id, minutes in City.objects.filter(
+                id__in=list(self.heaps), order_ttl_minutes__isnull=False
+            ).values_list("id", "order_ttl_minutes")
+        }
+
+    def pop_due(self, now: datetime | None = None) -> list[int]:
+        now = now or timezone.now()
+        default_ttl = timedelta(minutes=settings.ORDER_TTL_MINUTES)
+        due = []
+        with self.lock:
+            self._sync()
+            ttls = self._ttls()
+            for city_id, heap in self.heaps.items():
+                cutoff = now - ttls.get(city_id, default_ttl)
+                while heap and heap[0][0] <= cutoff:
+                    due.append(heapq.heappop(heap)[1])
+        return due
+
+    def expire_due(self, now: datetime | None = None) -> list[int]:
+        """Close unclaimed paid orders past their TTL, return their ids."""
+        due = self.pop_due(now)
+        batch_size = settings.ORDER_EXPIRY_BATCH_SIZE
+        expired = []
+        for start in range(0, len(due), batch_size):
+            expired += self._expire(due[start : start + batch_size])
+        return expired
+
+    @staticmethod
+    def _expire(order_ids: list[int]) -> list[int]:
+        with transaction.atomic():
+            rows = list(
+                Order.objects.select_for_update()
+                .filter(id__in=order_ids, is_active=True)
+                .order_by()
+                .values_list("id", "city_id")
+            )
+            if not rows:
+                return []
+            expired = [order_id for order_id, _ in rows]
+            Order.objects.filter(id__in=expired).update(is_active=False)
+            payments = Payment.objects.filter(
+                order_id__in=expired, status=Payment.StatusEnum.paid
+            )
+            session_ids = list(payments.values_list("session_id", flat=True))
+            payments.update(status=Payment.StatusEnum.refunded)
+            transaction.on_commit(lambda: refund_payments(session_ids))
+            for city_id, count in Counter(
+                city_id for _, city_id in rows
+            ).items():
+                city_stats.record_orders_closed(city_id, count)
+        return expired
+
+
+def refund_payments(session_ids: list[str]) -> None:
+    for session_id in session_ids:
+        refund_payment.delay(session_id)
+
+
+order_expiry = OrderExpiryScheduler()
@@ -0,0 +1,37 @@
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from taxi.services.renderers import MessagePackRenderer, OrjsonRenderer
+
+
+class OrjsonParser(JSONParser):
+    renderer_class = OrjsonRenderer
+
+    def parse(
+        self,
+        stream: object,
+        media_type: str | None = None,
+        parser_context: dict | None = None,
+    ) -> object:
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(
+        self,
+        stream: object,
+        media_type: str | None = None,
+        parser_context: dict | None = None,
+    ) -> object:
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
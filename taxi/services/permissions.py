@@ -1,5 +1,26 @@
+from django.http import HttpRequest
+from rest_framework.exceptions import APIException
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def is_staff_request(request: HttpRequest) -> bool:
+    """
+    Whether a plain Django request comes from a staff user, logged in
+    through the session or any of the API's authentication classes.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(request)
+        except APIException:
+            return False
+        if result is not None:
+            return result[0].is_staff
+    return False
 
 
 class IsAdminOrReadOnly(BasePermission):
@@ -14,3 +35,8 @@ class IsDriverOrAdminUser(BasePermission):
         return request.user.is_authenticated and (
             request.user.is_driver or request.user.is_staff
         )
+
+
+class IsDriver(BasePermission):
+    def has_permission(self, request: Request, *args, **kwargs) -> bool:
+        return request.user.is_authenticated and request.user.is_driver
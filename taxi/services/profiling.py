@@ -0,0 +1,220 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+from taxi.services.instrumentation import add_listener
+
+current_profile = ContextVar("current_profile", default=None)
+
+# Python 3.12 allows one active cProfile profiler per process, so
+# requests arriving while another one is profiled are served as usual.
+profiler_lock = threading.Lock()
+
+
+class RequestProfile:
+    """
+    Everything captured while one request is profiled: the cProfile
+    call graph, each SQL statement and each external API call.
+    """
+
+    def __init__(self, method: str, path: str) -> None:
+        self.id = f"{time.time_ns()}-{os.getpid()}"
+        self.method = method
+        self.path = path
+        self.started_at = timezone.now()
+        self.profiler = cProfile.Profile()
+        self.queries = []
+        self.external_calls = []
+        self.duration = 0.0
+
+    def record_query(
+        self,
+        execute: Callable,
+        sql: str,
+        params: object,
+        many: bool,
+        context: dict,
+    ) -> object:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "sql": sql,
+                    "many": many,
+                    "duration": time.perf_counter() - started,
+                }
+            )
+
+    def summary(self, status_code: int, user: str) -> dict:
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+            settings.PROFILER_TOP_FUNCTIONS
+        )
+        sql_time = sum(query["duration"] for query in self.queries)
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": status_code,
+            "user": user,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "sql_count": len(self.queries),
+            "sql_ms": round(sql_time * 1000, 3),
+            "external_ms": round(
+                sum(call["duration"] for call in self.external_calls) * 1000,
+                3,
+            ),
+            "queries": [
+                dict(query, duration=round(query["duration"] * 1000, 3))
+                for query in sorted(
+                    self.queries, key=lambda query: -query["duration"]
+                )
+            ],
+            "external_calls": [
+                dict(call, duration=round(call["duration"] * 1000, 3))
+                for call in self.external_calls
+            ],
+            "functions": stream.getvalue(),
+        }
+
+
+def record_external_call(
+    service: str, operation: str, duration: float, error: BaseException | None
+) -> None:
+    profile = current_profile.get()
+    if profile is not None:
+        profile.external_calls.append(
+            {
+                "service": service,
+                "operation": operation,
+                "duration": duration,
+                "error": repr(error) if error else None,
+            }
+        )
+
+
+add_listener(record_external_call)
+
+
+class ProfileStore:
+    """
+    Profiles kept as files in PROFILER_DIR: a JSON summary and the raw
+    pstats dump per request. Only the newest PROFILER_RING_SIZE are
+    kept, older ones are pruned whenever a new profile is written.
+    """
+
+    @property
+    def directory(self) -> Path:
+        return Path(settings.PROFILER_DIR)
+
+    def save(self, profile: RequestProfile, summary: dict) -> None:
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        profile.profiler.dump_stats(directory / f"{profile.id}.prof")
+        temporary = directory / f"{profile.id}.json.tmp"
+        temporary.write_text(json.dumps(summary))
+        temporary.replace(directory / f"{profile.id}.json")
+        self.prune()
+
+    def ids(self) -> list[str]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            (path.stem for path in self.directory.glob("*.json")),
+            key=lambda profile_id: int(profile_id.split("-")[0]),
+            reverse=True,
+        )
+
+    def prune(self) -> None:
+        for profile_id in self.ids()[settings.PROFILER_RING_SIZE :]:
+            for suffix in (".json", ".prof"):
+                (self.directory / f"{profile_id}{suffix}").unlink(
+                    missing_ok=True
+                )
+
+    def _path(self, profile_id: str, suffix: str) -> Path | None:
+        if profile_id not in self.ids():
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.is_file() else None
+
+    def get(self, profile_id: str) -> dict | None:
+        path = self._path(profile_id, ".json")
+        try:
+            return json.loads(path.read_text()) if path else None
+        except FileNotFoundError:
+            return None
+
+    def stats_path(self, profile_id: str) -> Path | None:
+        return self._path(profile_id, ".prof")
+
+    def list(self) -> list[dict]:
+        summaries = []
+        for profile_id in self.ids():
+            summary = self.get(profile_id)
+            if summary is not None:
+                summaries.append(
+                    {
+                        key: value
+                        for key, value in summary.items()
+                        if key
+                        not in ("queries", "external_calls", "functions")
+                    }
+                )
+        return summaries
+
+
+profile_store = ProfileStore()
+
+
+def profile_request(
+    get_response: Callable[[HttpRequest], HttpResponse], request: HttpRequest
+) -> HttpResponse:
+    """
+    Run the rest of the middleware chain under the profiler, or without
+    it when another request is being profiled.
+    """
+    with ExitStack() as stack:
+        if not profiler_lock.acquire(blocking=False):
+            return get_response(request)
+        stack.callback(profiler_lock.release)
+        profile = RequestProfile(request.method, request.get_full_path())
+        stack.callback(current_profile.reset, current_profile.set(profile))
+        for connection in connections.all():
+            stack.enter_context(
+                connection.execute_wrapper(profile.record_query)
+            )
+        started = time.perf_counter()
+        profile.profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profile.profiler.disable()
+            profile.duration = time.perf_counter() - started
+    user = getattr(request, "user", None)
+    profile_store.save(
+        profile,
+        profile.summary(
+            response.status_code,
+            str(user) if user and user.is_authenticated else "",
+        ),
+    )
+    response["X-Profile-Id"] = profile.id
+    return response
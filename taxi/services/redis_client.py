@@ -0,0 +1,19 @@
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+
+
+@lru_cache
+def _connect(url: str) -> redis.Redis:
+    return redis.Redis.from_url(url)
+
+
+def get_redis() -> redis.Redis | None:
+    """
+    Shared Redis connection, or None when REDIS_URL is not configured
+    and callers should fall back to in-process structures.
+    """
+    if not settings.REDIS_URL:
+        return None
+    return _connect(settings.REDIS_URL)
@@ -0,0 +1,67 @@
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+)
+
+# Types DRF's encoder renders differently from orjson and msgpack
+# are routed through it, so every format shows the same values.
+encode_default = JSONEncoder().default
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    Drop-in for DRF's JSONRenderer producing the same compact output
+    with orjson. Indented output (the browsable API) still goes
+    through the stdlib encoder.
+    """
+
+    def render(
+        self,
+        data: object,
+        accepted_media_type: str | None = None,
+        renderer_context: dict | None = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        if (
+            not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        content = orjson.dumps(
+            data, default=encode_default, option=ORJSON_OPTIONS
+        )
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack for clients sending ``Accept: application/msgpack``.
+    Dates, decimals and lazy strings are encoded as in the JSON output.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(
+        self,
+        data: object,
+        accepted_media_type: str | None = None,
+        renderer_context: dict | None = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        return msgpack.packb(
+            data, default=encode_default, use_bin_type=True, datetime=False
+        )
@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models import QuerySet
+
+from taxi.models import Ride, RideSummary
+
+UPDATE_FIELDS = [
+    "order",
+    "user",
+    "driver",
+    "driver_user",
+    "driver_name",
+    "car_number",
+    "status",
+    "rate",
+]
+
+
+def refresh(rides: QuerySet) -> int:
+    """
+    Upsert the summaries of ``rides`` from the live tables: one joined
+    SELECT and one INSERT ... ON CONFLICT. Run inside the transaction
+    that changed them, so the read model never lags behind.
+    """
+    summaries = [
+        RideSummary(
+            ride_id=ride_id,
+            order_id=order_id,
+            user_id=user_id,
+            driver_id=driver_id,
+            driver_user_id=driver_user_id,
+            driver_name=f"{first_name} {last_name}",
+            car_number=car_number,
+            status=status,
+            rate=rate,
+        )
+        for (
+            ride_id,
+            order_id,
+            user_id,
+            driver_id,
+            driver_user_id,
+            first_name,
+            last_name,
+            car_number,
+            status,
+            rate,
+        ) in rides.order_by().values_list(
+            "id",
+            "order_id",
+            "order__user_id",
+            "driver_id",
+            "driver__user_id",
+            "driver__user__first_name",
+            "driver__user__last_name",
+            "car__number",
+            "status",
+            "rate",
+        )
+    ]
+    if summaries:
+        RideSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=["ride"],
+            update_fields=UPDATE_FIELDS,
+        )
+    return len(summaries)
+
+
+def refresh_rides(ride_ids: list[int]) -> int:
+    return refresh(Ride.objects.filter(id__in=ride_ids))
+
+
+def refresh_for_driver_user(user_id: int) -> int:
+    """A driver's name is shown on every one of their rides."""
+    return refresh(Ride.objects.filter(driver__user_id=user_id))
+
+
+def refresh_for_car(car_id: int) -> int:
+    return refresh(Ride.objects.filter(car_id=car_id))
+
+
+def rebuild(batch_size: int = 1000) -> int:
+    """
+    Recompute every summary from the live tables in batches of rides,
+    each in its own transaction, for backfills and to repair drift.
+    """
+    last_id = 0
+    rebuilt = 0
+    while True:
+        with transaction.atomic():
+            ride_ids = list(
+                Ride.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ride_ids:
+                return rebuilt
+            rebuilt += refresh_rides(ride_ids)
+        last_id = ride_ids[-1]
@@ -0,0 +1,208 @@
+import abc
+import threading
+import time
+from collections import OrderedDict
+from statistics import median
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from payment.models import Payment
+from taxi.models import Order, StreetDistance
+
+
+def normalize_street(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class RoutingBackend(abc.ABC):
+    """
+    Resolves a street pair of a city to a distance in meters,
+    or None when the route is unknown.
+    """
+
+    # Answers of a backend that only estimates routes are stored as
+    # estimates, which expire and give way to a real route.
+    authoritative = True
+
+    @abc.abstractmethod
+    def distance(
+        self, city_id: int, street_from: str, street_to: str
+    ) -> int | None:
+        """Meters between the normalized streets, None when unknown."""
+
+
+class OrderHistoryRoutingBackend(RoutingBackend):
+    """
+    Median of the distances clients reported for the pair on orders
+    that were paid or driven, one per user, once ROUTING_MIN_SAMPLES
+    users reported one. Distances the service filled in are left out,
+    so an estimate never feeds the next one. Clients report those
+    distances, so the answer is only an estimate.
+    """
+
+    authoritative = False
+
+    def distance(
+        self, city_id: int, street_from: str, street_to: str
+    ) -> int | None:
+        reports = (
+            Order.objects.filter(
+                Q(street_from__iexact=street_from, street_to__iexact=street_to)
+                | Q(
+                    street_from__iexact=street_to,
+                    street_to__iexact=street_from,
+                ),
+                Q(payment__status=Payment.StatusEnum.paid)
+                | Q(ride__status="3"),
+                city_id=city_id,
+                distance_routed=False,
+            )
+            .order_by("-date_created")
+            .values_list("user_id", "distance")[:100]
+        )
+        distances = {}
+        for user_id, distance in reports:
+            distances.setdefault(user_id, distance)
+        if len(distances) < settings.ROUTING_MIN_SAMPLES:
+            return None
+        return int(median(distances.values()))
+
+
+class DistanceService:
+    """
+    Looks a route up in a bounded in-process LRU, then in the
+    persistent StreetDistance matrix, and only then asks the routing
+    backend, storing its answer so the pair is never computed again.
+    Estimated routes are asked again after ROUTING_ESTIMATE_TTL_SECONDS,
+    or at once by an authoritative backend, and unknown routes are
+    remembered for ROUTING_NEGATIVE_TTL_SECONDS.
+    """
+
+    def __init__(self, backend: RoutingBackend, cache_size: int) -> None:
+        self.backend = backend
+        self.cache_size = cache_size
+        # key -> (distance or None, monotonic expiry or None)
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0,
+            "negative_hits": 0,
+            "table_hits": 0,
+            "backend_hits": 0,
+            "misses": 0,
+        }
+
+    def _count(self, counter: str) -> None:
+        with self.lock:
+            self.counters[counter] += 1
+
+    def _remember(
+        self, key: tuple, distance: int | None, ttl: float | None = None
+    ) -> None:
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self.lock:
+            self.cache[key] = (distance, expires)
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def _lookup(self, key: tuple) -> tuple[bool, int | None]:
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return False, None
+            distance, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self.cache[key]
+                return False, None
+            self.cache.move_to_end(key)
+            self.counters[
+                "memory_hits" if distance is not None else "negative_hits"
+            ] += 1
+            return True, distance
+
+    def resolve(
+        self, city_id: int, street_from: str, street_to: str
+    ) -> int | None:
+        key = (
+            city_id,
+            normalize_street(street_from),
+            normalize_street(street_to),
+        )
+        found, distance = self._lookup(key)
+        if found:
+            return distance
+
+        row = (
+            StreetDistance.objects.filter(
+                city_id=city_id, street_from=key[1], street_to=key[2]
+            )
+            .values_list("distance", "estimated", "updated_at")
+            .first()
+        )
+        if row is not None:
+            distance, estimated, updated_at = row
+            if not estimated:
+                self._count("table_hits")
+                self._remember(key, distance)
+                return distance
+            ttl = settings.ROUTING_ESTIMATE_TTL_SECONDS - (
+                (timezone.now() - updated_at).total_seconds()
+            )
+            if ttl > 0 and not self.backend.authoritative:
+                self._count("table_hits")
+                self._remember(key, distance, ttl)
+                return distance
+
+        routed = self.backend.distance(*key)
+        if routed is None:
+            self._count("misses")
+            if row is not None:
+                # A stale estimate still beats no route at all.
+                return row[0]
+            self._remember(key, None, settings.ROUTING_NEGATIVE_TTL_SECONDS)
+            return None
+        self._count("backend_hits")
+        StreetDistance.objects.update_or_create(
+            city_id=city_id,
+            street_from=key[1],
+            street_to=key[2],
+            defaults={
+                "distance": routed,
+                "estimated": not self.backend.authoritative,
+            },
+        )
+        self._remember(
+            key,
+            routed,
+            (
+                None
+                if self.backend.authoritative
+                else settings.ROUTING_ESTIMATE_TTL_SECONDS
+            ),
+        )
+        return routed
+
+    def stats(self) -> dict:
+        with self.lock:
+            stats = dict(self.counters, cached_routes=len(self.cache))
+        lookups = sum(self.counters.values())
+        hits = (
+            stats["memory_hits"] + stats["negative_hits"] + stats["table_hits"]
+        )
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self.lock:
+            self.cache.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+
+distance_service = DistanceService(
+    import_string(settings.ROUTING_BACKEND)(), settings.ROUTING_CACHE_SIZE
+)
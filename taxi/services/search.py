@@ -0,0 +1,51 @@
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Greatest, Upper
+
+from taxi.models import Car, City, Driver
+
+# Columns are matched as UPPER(column) so that the same trigram GIN
+# indexes serve both these searches and the icontains filters.
+
+
+def search_drivers(query: str, limit: int) -> QuerySet:
+    query = query.upper()
+    return (
+        Driver.objects.select_related("user")
+        .annotate(
+            first_name=Upper("user__first_name"),
+            last_name=Upper("user__last_name"),
+        )
+        .filter(
+            Q(first_name__trigram_similar=query)
+            | Q(last_name__trigram_similar=query)
+        )
+        .annotate(
+            similarity=Greatest(
+                TrigramSimilarity("first_name", query),
+                TrigramSimilarity("last_name", query),
+            )
+        )
+        .order_by("-similarity", "id")[:limit]
+    )
+
+
+def search_cars(query: str, limit: int) -> QuerySet:
+    query = query.upper()
+    return (
+        Car.objects.select_related("driver__user")
+        .annotate(upper_number=Upper("number"))
+        .filter(upper_number__trigram_similar=query)
+        .annotate(similarity=TrigramSimilarity("upper_number", query))
+        .order_by("-similarity", "id")[:limit]
+    )
+
+
+def search_cities(query: str, limit: int) -> QuerySet:
+    query = query.upper()
+    return (
+        City.objects.annotate(upper_name=Upper("name"))
+        .filter(upper_name__trigram_similar=query)
+        .annotate(similarity=TrigramSimilarity("upper_name", query))
+        .order_by("-similarity", "id")[:limit]
+    )
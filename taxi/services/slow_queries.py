@@ -0,0 +1,234 @@
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from contextvars import ContextVar
+
+from celery import Task
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest
+from django.utils import timezone
+
+from taxi.models import SlowQuery
+from taxi.services.metrics import view_labels
+
+logger = logging.getLogger(__name__)
+
+# The request or Celery task name the current queries run for.
+current_origin = ContextVar("current_origin", default=None)
+# Set while flushing so the log's own statements are not captured.
+suppressed = ContextVar("suppressed", default=False)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    SQL with literals and placeholders replaced by ``?`` and value
+    lists collapsed, so the same statement always looks the same.
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER.sub("?", sql.replace("%s", "?"))
+    sql = VALUE_LIST.sub("(...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql: str) -> str:
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def describe_origin() -> str:
+    origin = current_origin.get()
+    if isinstance(origin, HttpRequest):
+        if origin.resolver_match is None:
+            return f"{origin.method} {origin.path}"
+        return ".".join(view_labels(origin))
+    return origin or ""
+
+
+def short_stack(limit: int = 5) -> str:
+    """The innermost project frames that led to the statement."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    return "\n".join(
+        f"{frame.filename[len(base_dir) + 1:]}:{frame.lineno} "
+        f"in {frame.name}"
+        for frame in frames[-limit:]
+    )
+
+
+class SlowQueryLog:
+    """
+    In-memory aggregation of slow statements per fingerprint, merged
+    into the SlowQuery table at most every SLOW_QUERY_FLUSH_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.flushed_at = time.monotonic()
+
+    def record(
+        self, sql: str, duration_ms: float, origin: str, stack: str
+    ) -> None:
+        normalized = normalize_sql(sql)
+        key = fingerprint(normalized)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = {
+                    "sql": normalized,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "durations": [],
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["durations"].append(duration_ms)
+            del entry["durations"][: -settings.SLOW_QUERY_SAMPLES]
+            if duration_ms >= entry["max_ms"]:
+                entry.update(max_ms=duration_ms, origin=origin, stack=stack)
+
+    def maybe_flush(self) -> None:
+        if (
+            self.entries
+            and time.monotonic() - self.flushed_at
+            >= settings.SLOW_QUERY_FLUSH_SECONDS
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            entries, self.entries = self.entries, {}
+            self.flushed_at = time.monotonic()
+        if not entries:
+            return
+        token = suppressed.set(True)
+        try:
+            self._merge(entries)
+        except DatabaseError:
+            logger.exception("Could not flush %d slow queries", len(entries))
+        finally:
+            suppressed.reset(token)
+
+    @staticmethod
+    def _merge(entries: dict[str, dict]) -> None:
+        now = timezone.now()
+        with transaction.atomic():
+            SlowQuery.objects.bulk_create(
+                [
+                    SlowQuery(fingerprint=key, sql=entry["sql"], last_seen=now)
+                    for key, entry in entries.items()
+                ],
+                ignore_conflicts=True,
+            )
+            rows = SlowQuery.objects.select_for_update().filter(
+                fingerprint__in=entries
+            )
+            for row in rows:
+                entry = entries[row.fingerprint]
+                row.count += entry["count"]
+                row.total_ms += entry["total_ms"]
+                row.durations = (row.durations + entry["durations"])[
+                    -settings.SLOW_QUERY_SAMPLES :
+                ]
+                row.p95_ms = percentile(row.durations, 0.95)
+                if entry["max_ms"] >= row.max_ms:
+                    row.max_ms = entry["max_ms"]
+                    row.origin = entry["origin"][:255]
+                    row.stack = entry["stack"]
+                row.last_seen = now
+            SlowQuery.objects.bulk_update(
+                rows,
+                [
+                    "count",
+                    "total_ms",
+                    "durations",
+                    "p95_ms",
+                    "max_ms",
+                    "origin",
+                    "stack",
+                    "last_seen",
+                ],
+            )
+
+
+slow_query_log = SlowQueryLog()
+
+TOP_ORDERINGS = ("total_ms", "p95_ms", "max_ms", "count")
+
+
+def top_slow_queries(order: str = "total_ms", limit: int = 20) -> list:
+    """Worst fingerprints, including what this process still buffers."""
+    slow_query_log.flush()
+    return list(SlowQuery.objects.order_by(f"-{order}")[:limit])
+
+
+def capture_slow_query(
+    execute: Callable,
+    sql: str,
+    params: object,
+    many: bool,
+    context: dict,
+) -> object:
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        if (
+            duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS
+            and not suppressed.get()
+        ):
+            slow_query_log.record(
+                sql, duration_ms, describe_origin(), short_stack()
+            )
+
+
+def add_slow_query_capture(connection: object, **kwargs) -> None:
+    if capture_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(capture_slow_query)
+
+
+task_origins = {}
+
+
+def set_task_origin(task_id: str, task: Task, **kwargs) -> None:
+    task_origins[task_id] = current_origin.set(task.name)
+
+
+def flush_after_task(task_id: str, **kwargs) -> None:
+    token = task_origins.pop(task_id, None)
+    if token is not None:
+        current_origin.reset(token)
+    slow_query_log.maybe_flush()
+
+
+def install() -> None:
+    connection_created.connect(add_slow_query_capture)
+    task_prerun.connect(set_task_origin)
+    task_postrun.connect(flush_after_task)
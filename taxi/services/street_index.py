@@ -0,0 +1,114 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from taxi.models import Order
+from taxi.services.routing import normalize_street
+
+
+class CityStreetIndex:
+    """
+    Street names of one city kept as a sorted array of normalized keys,
+    so a prefix maps to one contiguous slice found with two bisects.
+    """
+
+    def __init__(self) -> None:
+        self.keys = []
+        self.names = {}
+        self.counts = {}
+        self.last_order_id = 0
+        self.refreshed_at = 0.0
+
+    def add(self, street: str, count: int = 1) -> None:
+        key = normalize_street(street)
+        if not key:
+            return
+        if key not in self.counts:
+            insort(self.keys, key)
+            self.names[key] = " ".join(street.split())
+            self.counts[key] = 0
+        self.counts[key] += count
+
+    def complete(self, prefix: str, limit: int) -> list[dict]:
+        prefix = normalize_street(prefix)
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+        counts = self.counts
+        best = heapq.nsmallest(
+            limit,
+            self.keys[start:end],
+            key=lambda key: (-counts[key], key),
+        )
+        return [
+            {"street": self.names[key], "count": counts[key]} for key in best
+        ]
+
+
+class StreetIndex:
+    """
+    Per-process autocomplete over the streets riders used in past
+    orders, weighted by how often each one appears. A city is loaded
+    on its first query and then only pulls orders newer than the last
+    one it has seen, at most every STREET_INDEX_REFRESH_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self.cities = {}
+        self.lock = threading.Lock()
+
+    def _load(self, city_id: int) -> CityStreetIndex:
+        index = CityStreetIndex()
+        orders = Order.objects.filter(city_id=city_id)
+        index.last_order_id = (
+            orders.aggregate(last_id=Max("id"))["last_id"] or 0
+        )
+        orders = orders.filter(id__lte=index.last_order_id).order_by()
+        for field in ["street_from", "street_to"]:
+            for street, count in orders.values_list(field).annotate(
+                count=Count("id")
+            ):
+                index.add(street, count)
+        index.refreshed_at = time.monotonic()
+        return index
+
+    def _pull(self, city_id: int, index: CityStreetIndex) -> None:
+        new_orders = Order.objects.filter(
+            city_id=city_id, id__gt=index.last_order_id
+        ).values_list("id", "street_from", "street_to")
+        for order_id, street_from, street_to in new_orders:
+            index.add(street_from)
+            index.add(street_to)
+            index.last_order_id = max(index.last_order_id, order_id)
+        index.refreshed_at = time.monotonic()
+
+    def refresh(self, city_id: int) -> None:
+        """Pull new orders into an already loaded city."""
+        with self.lock:
+            index = self.cities.get(city_id)
+            if index is not None:
+                self._pull(city_id, index)
+
+    def complete(
+        self, city_id: int, prefix: str, limit: int = 10
+    ) -> list[dict]:
+        with self.lock:
+            index = self.cities.get(city_id)
+            if index is None:
+                index = self.cities[city_id] = self._load(city_id)
+            elif (
+                time.monotonic() - index.refreshed_at
+                > settings.STREET_INDEX_REFRESH_SECONDS
+            ):
+                self._pull(city_id, index)
+            return index.complete(prefix, limit)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.cities.clear()
+
+
+street_index = StreetIndex()
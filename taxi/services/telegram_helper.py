@@ -1,21 +1,36 @@
 import os
 
 import telebot
+from django.conf import settings
 from dotenv import load_dotenv
+from telebot import apihelper
+
+from taxi.services.instrumentation import TELEGRAM, external_call
+from taxi.services.telegram_sender import TelegramSender
 
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
+if settings.TELEGRAM_API_URL:
+    apihelper.API_URL = settings.TELEGRAM_API_URL
+
 bot = telebot.TeleBot(BOT_TOKEN)
 
 
+def deliver(chat_id: str, message: str) -> None:
+    """Send one message right away, errors are raised."""
+    with external_call(TELEGRAM, "send_message"):
+        bot.send_message(chat_id, message)
+
+
+telegram_sender = TelegramSender(deliver)
+
+
 def send_message(message: str) -> dict:
-    try:
-        bot.send_message(CHAT_ID, message)
-        return {"success": True, "message": "Message sent successfully"}
-    except Exception as e:
-        return {
-            "success": False,
-            "message": f"Failed to send message: {str(e)}",
-        }
+    """
+    Queue a message for the operations chat. It is sent with the other
+    messages of the same digest window, subject to the rate limit.
+    """
+    telegram_sender.enqueue(CHAT_ID, message)
+    return {"success": True, "message": "Message queued"}
@@ -0,0 +1,316 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from redis import Redis
+from telebot.apihelper import ApiTelegramException
+
+from taxi.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 4096
+STATS = ("sent", "merged", "delayed", "dropped", "failed")
+
+# Refill a token bucket stored as a hash and take one token if there is
+# one. Returns the seconds to wait for the next token, "0" when taken.
+TAKE_TOKEN = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call("HMGET", KEYS[1], "tokens", "at")
+local tokens = tonumber(state[1]) or capacity
+local at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - at, 0) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "at", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisSenderBackend:
+    """
+    Pending events, flush flags, token buckets and counters in Redis,
+    shared by every web and Celery worker.
+    """
+
+    shared = True
+
+    def __init__(self, client: Redis) -> None:
+        self.client = client
+
+    def push(self, chat_id: str, text: str, limit: int) -> int:
+        """Queue an event, return how many were dropped over the limit."""
+        key = f"telegram:{chat_id}:pending"
+        pipeline = self.client.pipeline()
+        pipeline.rpush(key, text)
+        pipeline.ltrim(key, 0, limit - 1)
+        length, _ = pipeline.execute()
+        return max(length - limit, 0)
+
+    def push_front(self, chat_id: str, texts: list[str]) -> None:
+        self.client.lpush(f"telegram:{chat_id}:pending", *reversed(texts))
+
+    def pop_all(self, chat_id: str) -> list[str]:
+        key = f"telegram:{chat_id}:pending"
+        pipeline = self.client.pipeline()
+        pipeline.lrange(key, 0, -1)
+        pipeline.delete(key)
+        texts, _ = pipeline.execute()
+        return [text.decode() for text in texts]
+
+    def pending(self, chat_id: str) -> int:
+        return self.client.llen(f"telegram:{chat_id}:pending")
+
+    def claim_flush(self, chat_id: str, ttl: float) -> bool:
+        return bool(
+            self.client.set(
+                f"telegram:{chat_id}:scheduled",
+                1,
+                nx=True,
+                px=int(ttl * 1000),
+            )
+        )
+
+    def release_flush(self, chat_id: str) -> None:
+        self.client.delete(f"telegram:{chat_id}:scheduled")
+
+    def take_token(self, chat_id: str, capacity: int, rate: float) -> float:
+        return float(
+            self.client.eval(
+                TAKE_TOKEN,
+                1,
+                f"telegram:{chat_id}:bucket",
+                capacity,
+                rate,
+                time.time(),
+            )
+        )
+
+    def count(self, **counts) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for name, value in counts.items():
+            if value:
+                pipeline.hincrby("telegram:stats", name, value)
+        pipeline.execute()
+
+    def stats(self) -> dict[str, int]:
+        values = self.client.hgetall("telegram:stats")
+        return {name: int(values.get(name.encode(), 0)) for name in STATS}
+
+    def reset_stats(self) -> None:
+        self.client.delete("telegram:stats")
+
+
+class MemorySenderBackend:
+    """
+    Per-process fallback used when REDIS_URL is not configured. A
+    Celery worker cannot see it, so the process that queued a message
+    sends it.
+    """
+
+    shared = False
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.queues = defaultdict(list)
+        self.scheduled = {}
+        self.buckets = {}
+        self.counts = defaultdict(int)
+
+    def push(self, chat_id: str, text: str, limit: int) -> int:
+        with self.lock:
+            queue = self.queues[chat_id]
+            if len(queue) >= limit:
+                return 1
+            queue.append(text)
+            return 0
+
+    def push_front(self, chat_id: str, texts: list[str]) -> None:
+        with self.lock:
+            self.queues[chat_id][:0] = texts
+
+    def pop_all(self, chat_id: str) -> list[str]:
+        with self.lock:
+            return self.queues.pop(chat_id, [])
+
+    def pending(self, chat_id: str) -> int:
+        return len(self.queues.get(chat_id, ()))
+
+    def claim_flush(self, chat_id: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            if self.scheduled.get(chat_id, 0) > now:
+                return False
+            self.scheduled[chat_id] = now + ttl
+            return True
+
+    def release_flush(self, chat_id: str) -> None:
+        self.scheduled.pop(chat_id, None)
+
+    def take_token(self, chat_id: str, capacity: int, rate: float) -> float:
+        now = time.time()
+        with self.lock:
+            tokens, at = self.buckets.get(chat_id, (capacity, now))
+            tokens = min(capacity, tokens + max(now - at, 0) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self.buckets[chat_id] = (tokens, now)
+            return wait
+
+    def count(self, **counts) -> None:
+        with self.lock:
+            for name, value in counts.items():
+                self.counts[name] += value
+
+    def stats(self) -> dict[str, int]:
+        return {name: self.counts[name] for name in STATS}
+
+    def reset_stats(self) -> None:
+        self.counts.clear()
+
+
+def digest(texts: list[str]) -> tuple[str, int]:
+    """
+    One message for a burst of events: the events separated by blank
+    lines under a count, cut at Telegram's length limit. Returns the
+    message and how many events did not fit.
+    """
+    if len(texts) == 1:
+        return texts[0][:MESSAGE_LIMIT], 0
+    lines = [f"{len(texts)} updates:"]
+    length = len(lines[0])
+    for included, text in enumerate(texts):
+        footer = f"\n\n…and {len(texts) - included} more"
+        if length + 2 + len(text) + len(footer) > MESSAGE_LIMIT:
+            lines.append(footer.strip())
+            return "\n\n".join(lines), len(texts) - included
+        lines.append(text)
+        length += 2 + len(text)
+    return "\n\n".join(lines), 0
+
+
+class TelegramSender:
+    """
+    Queues messages per chat and sends them as one digest per
+    TELEGRAM_DIGEST_WINDOW_SECONDS through the flush_telegram_chat
+    task. Each chat has a token bucket of TELEGRAM_BURST messages
+    refilled at TELEGRAM_MESSAGES_PER_MINUTE; a flush without a token,
+    or one Telegram answers with 429, is retried when it may be sent.
+    Without Redis a timer in the same process sends a message as soon
+    as its chat has a token.
+    """
+
+    def __init__(self, deliver: Callable[[str, str], object]) -> None:
+        self.deliver = deliver
+        self.memory_backend = MemorySenderBackend()
+
+    @property
+    def backend(self) -> RedisSenderBackend | MemorySenderBackend:
+        client = get_redis()
+        if client is None:
+            return self.memory_backend
+        return RedisSenderBackend(client)
+
+    def enqueue(self, chat_id: str, text: str) -> None:
+        """Queue a message once the current transaction commits."""
+        transaction.on_commit(lambda: self._enqueue(chat_id, text))
+
+    def _enqueue(self, chat_id: str, text: str) -> None:
+        backend = self.backend
+        dropped = backend.push(chat_id, text, settings.TELEGRAM_MAX_PENDING)
+        if dropped:
+            backend.count(dropped=dropped)
+        self._schedule(
+            backend,
+            chat_id,
+            settings.TELEGRAM_DIGEST_WINDOW_SECONDS if backend.shared else 0,
+        )
+
+    def _schedule(
+        self,
+        backend: RedisSenderBackend | MemorySenderBackend,
+        chat_id: str,
+        countdown: float,
+    ) -> None:
+        # The flag outlives the countdown so a lost task cannot block
+        # the chat for good, the next event schedules a new flush.
+        if not backend.claim_flush(chat_id, countdown + 60):
+            return
+        if backend.shared:
+            current_app.send_task(
+                "taxi.tasks.flush_telegram_chat",
+                args=[chat_id],
+                countdown=countdown,
+            )
+        else:
+            # Even without a countdown: flushing here would send from
+            # inside the caller's on_commit hook.
+            timer = threading.Timer(countdown, self.flush, [chat_id])
+            timer.daemon = True
+            timer.start()
+
+    def flush(self, chat_id: str) -> None:
+        backend = self.backend
+        wait = backend.take_token(
+            chat_id,
+            settings.TELEGRAM_BURST,
+            settings.TELEGRAM_MESSAGES_PER_MINUTE / 60,
+        )
+        if wait:
+            backend.count(delayed=backend.pending(chat_id))
+            backend.release_flush(chat_id)
+            self._schedule(backend, chat_id, wait)
+            return
+        # Released before popping: an event queued from here on
+        # schedules the next flush instead of waiting for this one.
+        backend.release_flush(chat_id)
+        texts = backend.pop_all(chat_id)
+        if not texts:
+            return
+        message, left = digest(texts)
+        try:
+            self.deliver(chat_id, message)
+        except ApiTelegramException as exc:
+            if exc.error_code != 429:
+                backend.count(failed=len(texts))
+                logger.warning("Telegram rejected a digest: %s", exc)
+                return
+            backend.push_front(chat_id, texts)
+            backend.count(delayed=len(texts))
+            self._schedule(
+                backend,
+                chat_id,
+                exc.result_json.get("parameters", {}).get("retry_after", 1),
+            )
+            return
+        except Exception:
+            backend.count(failed=len(texts))
+            logger.warning("Could not send a Telegram digest", exc_info=True)
+            return
+        backend.count(sent=1, merged=len(texts) - 1 - left)
+        if left:
+            # The events cut from the digest go out with the next one.
+            backend.push_front(chat_id, texts[-left:])
+            backend.count(delayed=left)
+            self._schedule(backend, chat_id, 0)
+
+    def stats(self) -> dict[str, int]:
+        return self.backend.stats()
+
+    def reset_stats(self) -> None:
+        self.backend.reset_stats()
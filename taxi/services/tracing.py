@@ -0,0 +1,229 @@
+import json
+import re
+import secrets
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from celery import Task
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+)
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import BaseSerializer
+
+from taxi.services.instrumentation import add_listener
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+current_span = ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(
+        self,
+        name: str,
+        trace_id: str | None = None,
+        parent_id: str | None = None,
+        attributes: dict | None = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.start = time.time_ns()
+        self.end = None
+        self.error = None
+        self.local_root = False
+        self.token = None
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value pointing at this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_us": (self.end - self.start) // 1000,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class FileExporter:
+    """
+    Appends finished spans as JSON lines to TRACING_FILE. Spans are
+    buffered and written once their local root span ends, so a trace
+    costs one write however many queries it ran.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.buffer = []
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self.lock:
+            self.buffer.append(line)
+            if not span.local_root and len(self.buffer) < 1000:
+                return
+            lines, self.buffer = self.buffer, []
+        path = Path(settings.TRACING_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as file:
+            file.write("\n".join(lines) + "\n")
+
+
+exporter = FileExporter()
+
+
+def start_span(
+    name: str, attributes: dict | None = None, traceparent: str | None = None
+) -> Span | None:
+    """
+    Open a span as a child of the current one, or of the remote parent
+    in ``traceparent`` when there is none. None when tracing is off.
+    """
+    if not settings.TRACING_ENABLED:
+        return None
+    parent = current_span.get()
+    if parent is not None:
+        span = Span(name, parent.trace_id, parent.span_id, attributes)
+    else:
+        match = TRACEPARENT.match(traceparent or "")
+        span = Span(
+            name,
+            *(match.groups() if match else (None, None)),
+            attributes,
+        )
+        span.local_root = True
+    span.token = current_span.set(span)
+    return span
+
+
+def finish_span(span: Span | None, error: BaseException | None = None) -> None:
+    if span is None:
+        return
+    span.end = time.time_ns()
+    if error is not None:
+        span.error = repr(error)
+    current_span.reset(span.token)
+    exporter.export(span)
+
+
+@contextmanager
+def span(
+    name: str, attributes: dict | None = None, traceparent: str | None = None
+) -> Iterator[Span | None]:
+    started = start_span(name, attributes, traceparent)
+    try:
+        yield started
+    except BaseException as exc:
+        finish_span(started, exc)
+        raise
+    finish_span(started)
+
+
+def record_external_call(
+    service: str, operation: str, duration: float, error: BaseException | None
+) -> None:
+    """Add a finished Stripe or Telegram call to the current trace."""
+    parent = current_span.get()
+    if parent is None:
+        return
+    external = Span(
+        f"{service}.{operation}",
+        parent.trace_id,
+        parent.span_id,
+        {"service": service},
+    )
+    external.end = time.time_ns()
+    external.start = external.end - int(duration * 1e9)
+    external.error = repr(error) if error else None
+    exporter.export(external)
+
+
+def trace_query(
+    execute: Callable,
+    sql: str,
+    params: object,
+    many: bool,
+    context: dict,
+) -> object:
+    if current_span.get() is None:
+        return execute(sql, params, many, context)
+    with span("db.query", {"db.statement": sql, "db.many": many}):
+        return execute(sql, params, many, context)
+
+
+def add_query_tracing(connection: object, **kwargs) -> None:
+    if trace_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(trace_query)
+
+
+def inject_trace_headers(headers: dict | None = None, **kwargs) -> None:
+    parent = current_span.get()
+    if parent is not None and headers is not None:
+        headers["traceparent"] = parent.traceparent
+
+
+task_spans = {}
+
+
+def start_task_span(task_id: str, task: Task, **kwargs) -> None:
+    traceparent = getattr(task.request, "traceparent", None) or (
+        task.request.headers or {}
+    ).get("traceparent")
+    task_spans[task_id] = start_span(
+        f"celery.{task.name}", {"task_id": task_id}, traceparent
+    )
+
+
+def fail_task_span(
+    task_id: str, exception: BaseException | None = None, **kwargs
+) -> None:
+    task_span = task_spans.get(task_id)
+    if task_span is not None:
+        task_span.error = repr(exception)
+
+
+def finish_task_span(task_id: str, **kwargs) -> None:
+    finish_span(task_spans.pop(task_id, None))
+
+
+def install() -> None:
+    """
+    Hook tracing into DB connections, serializer validation, external
+    calls and Celery. Spans are only recorded while TRACING_ENABLED.
+    """
+    if getattr(BaseSerializer.is_valid, "traced", False):
+        return
+    is_valid = BaseSerializer.is_valid
+
+    def traced_is_valid(
+        self: BaseSerializer, *, raise_exception: bool = False
+    ) -> bool:
+        with span("serializer.validate", {"serializer": type(self).__name__}):
+            return is_valid(self, raise_exception=raise_exception)
+
+    traced_is_valid.traced = True
+    BaseSerializer.is_valid = traced_is_valid
+    connection_created.connect(add_query_tracing)
+    add_listener(record_external_call)
+    before_task_publish.connect(inject_trace_headers)
+    task_prerun.connect(start_task_span)
+    task_failure.connect(fail_task_span)
+    task_postrun.connect(finish_task_span)
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from taxi.models import Car, Driver, Ride
+from taxi.services import ride_summary
+from taxi.services.driver_dashboard import driver_dashboard
+
+DRIVER_NAME_FIELDS = {"first_name", "last_name"}
+
+
+@receiver(post_save, sender=Ride)
+def refresh_ride_summary(instance: Ride, **kwargs) -> None:
+    ride_summary.refresh_rides([instance.id])
+
+
+@receiver([post_save, post_delete], sender=Ride)
+def invalidate_driver_dashboard(instance: Ride, **kwargs) -> None:
+    """Transitions and ratings change the driver's dashboard figures."""
+    if Ride.driver.is_cached(instance):
+        user_id = instance.driver.user_id
+    else:
+        user_id = (
+            Driver.objects.filter(id=instance.driver_id)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+    if user_id is not None:
+        transaction.on_commit(lambda: driver_dashboard.invalidate(user_id))
+
+
+@receiver(post_save, sender=Car)
+def refresh_car_ride_summaries(instance: Car, created: bool, **kwargs) -> None:
+    if not created:
+        ride_summary.refresh_for_car(instance.id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_driver_ride_summaries(
+    instance: object,
+    created: bool,
+    update_fields: frozenset | None = None,
+    **kwargs,
+) -> None:
+    if created or not instance.is_driver:
+        return
+    if update_fields is not None and not DRIVER_NAME_FIELDS & update_fields:
+        return
+    ride_summary.refresh_for_driver_user(instance.id)
@@ -0,0 +1,49 @@
+import time
+
+from celery import shared_task
+
+from taxi.services.city_stats import reconcile_city_stats
+from taxi.models import Order
+from taxi.services.demand import demand_counters
+from taxi.services.order_expiry import order_expiry
+from taxi.services.telegram_helper import send_message, telegram_sender
+
+
+@shared_task
+def reconcile_city_dashboards() -> None:
+    reconcile_city_stats()
+    demand_counters.reset_free_drivers()
+
+
+@shared_task
+def expire_unclaimed_orders() -> int:
+    expired = order_expiry.expire_due()
+    if expired:
+        notify_expired_orders.delay(expired)
+    return len(expired)
+
+
+@shared_task
+def notify_expired_orders(order_ids: list[int]) -> None:
+    for order in Order.objects.filter(id__in=order_ids).select_related("user"):
+        send_message(
+            f"User {order.user.full_name}: order #{order.id} "
+            f"from {order.street_from} expired, no driver took it."
+        )
+
+
+@shared_task
+def flush_telegram_chat(chat_id: str) -> None:
+    telegram_sender.flush(chat_id)
+
+
+@shared_task
+def queue_probe(sent_at: float) -> float:
+    """Seconds between enqueueing and starting, for queue benchmarks."""
+    return time.time() - sent_at
+
+
+@shared_task
+def queue_load(seconds: float) -> None:
+    """Stand-in for a slow report, for queue benchmarks."""
+    time.sleep(seconds)
@@ -0,0 +1,213 @@
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from payment.models import Payment
+from taxi.models import City, Order
+from taxi.services import batch
+from taxi.tests.base import TestBase
+
+BATCH_URL = reverse("batch")
+
+
+class BatchApiTest(TestBase):
+    def batch(self, *paths: str, **extra):
+        return self.client.post(
+            BATCH_URL,
+            {"requests": [{"method": "GET", "path": path} for path in paths]},
+            format="json",
+            **extra,
+        )
+
+    def test_home_screen_in_one_request(self):
+        order = self.sample_order(self.default_user)
+        self.client.force_authenticate(self.default_user)
+
+        response = self.batch(
+            "/api/v1/user/me/",
+            "/api/v1/taxi/orders/?is_active=true",
+            "/api/v1/taxi/rides/?status=1",
+            "/api/v1/payment/?status=1",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        me, orders, rides, payments = response.data["responses"]
+        self.assertEqual(me["status"], status.HTTP_200_OK)
+        self.assertEqual(me["body"]["email"], self.default_user.email)
+        self.assertEqual(orders["status"], status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in orders["body"]], [order.id])
+        self.assertEqual(rides["status"], status.HTTP_200_OK)
+        self.assertEqual(payments["status"], status.HTTP_200_OK)
+
+    def test_items_keep_their_own_status(self):
+        self.client.force_authenticate(self.default_user)
+
+        response = self.batch(
+            "/api/v1/taxi/orders/999999/",
+            "/api/v1/taxi/slow_queries/",
+            "/api/v1/nowhere/",
+            "/api/v1/batch/",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in response.data["responses"]],
+            [
+                status.HTTP_404_NOT_FOUND,
+                status.HTTP_403_FORBIDDEN,
+                status.HTTP_404_NOT_FOUND,
+                status.HTTP_404_NOT_FOUND,
+            ],
+        )
+
+    def test_state_changing_reads_are_refused(self):
+        order = self.sample_order(self.default_user)
+        payment = Payment.objects.create(
+            status="1",
+            order=order,
+            session_id="session",
+            money_to_pay=50,
+        )
+        self.client.force_authenticate(self.default_user)
+
+        response = self.batch(
+            "/api/v1/payment/success/?session_id=session",
+            "/api/v1/payment/cancel/?session_id=session",
+            f"/api/v1/taxi/driver_applications/{order.id}/apply/",
+        )
+
+        self.assertEqual(
+            [item["status"] for item in response.data["responses"]],
+            [status.HTTP_404_NOT_FOUND] * 3,
+        )
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, "1")
+
+    def test_token_is_checked_once(self):
+        token = AccessToken.for_user(self.default_user)
+
+        with patch.object(
+            JWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as validate:
+            response = self.batch(
+                "/api/v1/user/me/",
+                "/api/v1/taxi/orders/",
+                HTTP_AUTHORIZATION=f"Bearer {token}",
+            )
+
+        self.assertEqual(validate.call_count, 1)
+        self.assertEqual(
+            [item["status"] for item in response.data["responses"]],
+            [status.HTTP_200_OK, status.HTTP_200_OK],
+        )
+
+    def test_parallel_items_come_back_in_order(self):
+        self.client.force_authenticate(self.default_user)
+
+        with (
+            patch(
+                "taxi.services.batch.can_run_in_parallel", return_value=True
+            ),
+            patch(
+                "taxi.services.batch.run_one",
+                side_effect=lambda request, item: {"path": item["path"]},
+            ),
+        ):
+            response = self.batch(*[f"/api/v1/taxi/{i}/" for i in range(10)])
+
+        self.assertEqual(
+            [item["path"] for item in response.data["responses"]],
+            [f"/api/v1/taxi/{i}/" for i in range(10)],
+        )
+
+    def test_anonymous_user_is_rejected(self):
+        response = self.batch("/api/v1/user/me/")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_batch_size_is_limited(self):
+        self.client.force_authenticate(self.default_user)
+
+        response = self.batch(*["/api/v1/user/me/"] * 3)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_only_reads_are_batched(self):
+        self.client.force_authenticate(self.default_user)
+
+        response = self.client.post(
+            BATCH_URL,
+            {"requests": [{"method": "POST", "path": "/api/v1/taxi/orders/"}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ParallelBatchApiTest(TransactionTestCase):
+    """Items run on the worker threads, against committed rows."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="parallel@test.com",
+            first_name="test",
+            last_name="test",
+            password="test1234",
+        )
+        self.order = Order.objects.create(
+            user=self.user,
+            city=City.objects.create(name="test city"),
+            street_from="test street_from",
+            street_to="test street_to",
+            distance=51,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_items_run_in_parallel_threads(self):
+        threads = set()
+
+        def run_one(request, item):
+            threads.add(threading.current_thread().name)
+            return original_run_one(request, item)
+
+        original_run_one = batch.run_one
+        with patch("taxi.services.batch.run_one", side_effect=run_one):
+            response = self.client.post(
+                BATCH_URL,
+                {
+                    "requests": [
+                        {"method": "GET", "path": "/api/v1/user/me/"},
+                        {
+                            "method": "GET",
+                            "path": f"/api/v1/taxi/orders/{self.order.id}/",
+                        },
+                        {"method": "GET", "path": "/api/v1/taxi/orders/"},
+                    ]
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        me, order, orders = response.data["responses"]
+        self.assertEqual(me["status"], status.HTTP_200_OK)
+        self.assertEqual(me["body"]["email"], self.user.email)
+        self.assertEqual(order["status"], status.HTTP_200_OK)
+        self.assertEqual(order["body"]["id"], self.order.id)
+        self.assertEqual(order["body"]["street_from"], "test street_from")
+        self.assertEqual(
+            [row["id"] for row in orders["body"]], [self.order.id]
+        )
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith("batch") for name in threads))
@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+
+from taxi_service.celery import app
+
+
+class CeleryRoutingTest(SimpleTestCase):
+    def route(self, name: str) -> tuple[str, int | None]:
+        options = app.amqp.router.route({}, name)
+        return options["queue"].name, options.get("priority")
+
+    def test_tasks_are_routed_to_their_queues(self):
+        self.assertEqual(
+            self.route("taxi.tasks.expire_unclaimed_orders"), ("dispatch", 0)
+        )
+        self.assertEqual(
+            self.route("taxi.tasks.notify_expired_orders"),
+            ("notifications", 3),
+        )
+        self.assertEqual(
+            self.route("payment.tasks.expire_stale_payments"),
+            ("payments", 3),
+        )
+        self.assertEqual(
+            self.route("payment.tasks.check_daily_profit"), ("reports", 9)
+        )
+
+    def test_unrouted_tasks_use_the_default_queue(self):
+        self.assertEqual(self.route("taxi.tasks.unknown")[0], "dispatch")
+
+    def test_every_scheduled_task_is_routed(self):
+        for entry in app.conf.beat_schedule.values():
+            self.assertIn(entry["task"], app.conf.task_routes)
@@ -2,7 +2,7 @@ from django.urls import reverse
 from rest_framework import status
 
 from taxi.models import City
-from taxi.serializers import CitySerializer
+from taxi.serializers import CityAdminSerializer, CitySerializer
 from taxi.tests.base import TestBase
 
 CITY_URL = reverse("taxi:city-list")
@@ -41,6 +41,12 @@ class SimpleUserCityAPITest(TestBase):
         super().setUp()
         self.client.force_authenticate(user=self.default_user)
 
+    def test_order_ttl_is_hidden_from_users(self):
+        res = self.client.get(get_city_detail(self.default_city.id))
+
+        self.assertEqual(res.data, CitySerializer(self.default_city).data)
+        self.assertNotIn("order_ttl_minutes", res.data)
+
     def test_simple_user_cannot_create_cities(self):
         res = self.client.post(CITY_URL, {"name": "test city"})
 
@@ -69,6 +75,15 @@ class AdminCityAPITest(TestBase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
+    def test_admin_can_set_order_ttl(self):
+        res = self.client.patch(
+            get_city_detail(self.default_city.id), {"order_ttl_minutes": 15}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.default_city.refresh_from_db()
+        self.assertEqual(self.default_city.order_ttl_minutes, 15)
+
     def test_admin_can_update_cities(self):
         res = self.client.patch(
             get_city_detail(self.default_city.id), {"name": "updated city"}
@@ -84,8 +99,8 @@ class AdminCityAPITest(TestBase):
     def test_city_filters(self):
         city2 = City.objects.create(name="test city2")
 
-        serializer1 = CitySerializer(self.default_city)
-        serializer2 = CitySerializer(city2)
+        serializer1 = CityAdminSerializer(self.default_city)
+        serializer2 = CityAdminSerializer(city2)
 
         res = self.client.get(CITY_URL, {"name": "city2"})
 
@@ -0,0 +1,103 @@
+from unittest.mock import patch
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+
+from payment.models import Payment
+from taxi.models import CityStats, Ride
+from taxi.services.city_stats import reconcile_city_stats
+from taxi.tests.base import TestBase
+
+ORDER_URL = reverse("taxi:order-list")
+
+
+def get_city_dashboard(city_id) -> str:
+    return reverse("taxi:city-dashboard", args=[city_id])
+
+
+class CityDashboardAPITest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.default_admin)
+
+    def test_simple_user_cant_see_dashboard(self):
+        self.client.force_authenticate(user=self.default_user)
+
+        res = self.client.get(get_city_dashboard(self.default_city.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @patch("taxi.serializers.send_message")
+    @patch("taxi.views.payment_helper")
+    def test_order_creation_updates_rollups(
+        self, mock_payment_helper, mock_send_message
+    ):
+        mock_payment_helper.return_value = Response(
+            status=status.HTTP_201_CREATED
+        )
+        self.client.force_authenticate(user=self.default_user)
+        self.client.post(
+            ORDER_URL,
+            {
+                "city": self.default_city.id,
+                "street_from": "test street_from",
+                "street_to": "test street_to",
+                "distance": 120,
+            },
+        )
+        self.client.force_authenticate(user=self.default_admin)
+
+        res = self.client.get(get_city_dashboard(self.default_city.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["active_orders"], 1)
+        self.assertEqual(res.data["hourly"][0]["orders_created"], 1)
+        self.assertEqual(res.data["hourly"][0]["average_distance"], 120)
+
+    @patch("taxi.views.send_message")
+    def test_ride_transitions_update_rollups(self, mock_send_message):
+        order = self.sample_order(self.default_user)
+        Payment.objects.create(
+            status="2",
+            session_id="test",
+            money_to_pay=10,
+            order=order,
+        )
+        reconcile_city_stats()
+        self.client.force_authenticate(user=self.default_driver_user)
+        self.client.post(
+            reverse("taxi:order-take-order", args=[order.id]),
+            {"car": self.default_car.id},
+        )
+        ride = Ride.objects.get(order=order)
+        self.client.get(reverse("taxi:ride-in-process", args=[ride.id]))
+
+        stats = CityStats.objects.get(city=self.default_city)
+
+        self.assertEqual(stats.active_orders, 0)
+        self.assertEqual(stats.rides_waiting, 0)
+        self.assertEqual(stats.rides_in_process, 1)
+
+    def test_reconcile_rebuilds_rollups(self):
+        order = self.sample_order(self.default_user)
+        Payment.objects.create(
+            status="2",
+            session_id="test",
+            money_to_pay=10,
+            order=order,
+        )
+        Ride.objects.create(
+            order=order,
+            driver=self.default_driver,
+            car=self.default_car,
+            status="3",
+        )
+
+        reconcile_city_stats()
+        res = self.client.get(get_city_dashboard(self.default_city.id))
+
+        self.assertEqual(res.data["active_orders"], 1)
+        self.assertEqual(res.data["rides_finished"], 1)
+        self.assertEqual(res.data["hourly"][0]["orders_created"], 1)
+        self.assertEqual(res.data["hourly"][0]["revenue"], "10.00")
@@ -0,0 +1,79 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.urls import reverse
+from rest_framework import status
+
+from payment.models import Payment
+from taxi.services.demand import MemoryCounterBackend, demand_counters
+from taxi.tests.base import TestBase
+
+
+def get_city_surge(city_id) -> str:
+    return reverse("taxi:city-surge", args=[city_id])
+
+
+class CitySurgeAPITest(TestBase):
+    def setUp(self):
+        super().setUp()
+        demand_counters.memory_backend = MemoryCounterBackend()
+        self.client.force_authenticate(self.default_user)
+
+    def test_simple_user_can_see_surge(self):
+        res = self.client.get(get_city_surge(self.default_city.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["multiplier"], "1.0")
+
+    def test_surge_grows_with_waiting_orders(self):
+        demand_counters.reset_free_drivers()
+        for _ in range(5):
+            demand_counters.record_order_opened(self.default_city.id)
+
+        res = self.client.get(get_city_surge(self.default_city.id))
+
+        self.assertEqual(res.data["orders_opened"], 5)
+        self.assertEqual(res.data["free_drivers"], 1)
+        self.assertEqual(res.data["multiplier"], "2.0")
+
+    def test_missing_gauge_is_counted_from_the_database(self):
+        demand_counters.record_drivers_removed(self.default_city.id)
+        for _ in range(5):
+            demand_counters.record_order_opened(self.default_city.id)
+
+        snapshot = demand_counters.snapshot(self.default_city.id)
+
+        self.assertEqual(snapshot["free_drivers"], 1)
+        self.assertEqual(demand_counters.multiplier(snapshot), Decimal("2.0"))
+        demand_counters.record_drivers_removed(self.default_city.id)
+        self.assertEqual(
+            demand_counters.snapshot(self.default_city.id)["free_drivers"], 0
+        )
+
+    def test_surge_is_capped(self):
+        for _ in range(100):
+            demand_counters.record_order_opened(self.default_city.id)
+
+        self.assertEqual(
+            demand_counters.surge_multiplier(self.default_city.id),
+            Decimal("3.0"),
+        )
+
+    @patch("taxi.views.send_message")
+    def test_take_order_updates_counters(self, mock_send_message):
+        demand_counters.reset_free_drivers()
+        order = self.sample_order(self.default_user)
+        Payment.objects.create(
+            status="2", session_id="test", money_to_pay=10, order=order
+        )
+        self.client.force_authenticate(self.default_driver_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("taxi:order-take-order", args=[order.id]),
+                {"car": self.default_car.id},
+            )
+        res = self.client.get(get_city_surge(self.default_city.id))
+
+        self.assertEqual(res.data["orders_taken"], 1)
+        self.assertEqual(res.data["free_drivers"], 0)
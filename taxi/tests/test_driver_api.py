@@ -1,10 +1,16 @@
+from unittest.mock import patch
+
 from django.conf.global_settings import AUTH_USER_MODEL
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 
-from taxi.models import Driver, City
+from taxi.models import Driver, City, Ride
 from taxi.serializers import DriverListSerializer
+from taxi.services.leaderboard import (
+    MemoryLeaderboardBackend,
+    driver_leaderboard,
+)
 from taxi.tests.base import TestBase
 
 DRIVER_URL = reverse("taxi:driver-list")
@@ -167,3 +173,88 @@ class TestFiltering(TestBase):
 
         self.assertIn(serializer2.data, res.data)
         self.assertNotIn(serializer1.data, res.data)
+
+
+class DriverLeaderboardAPITest(TestBase):
+    LEADERBOARD_URL = reverse("taxi:driver-leaderboard")
+
+    def setUp(self):
+        super().setUp()
+        driver_leaderboard.memory_backend = MemoryLeaderboardBackend()
+        self.default_driver.rate = 4
+        self.default_driver.save()
+        self.best_driver = self.sample_driver(
+            self.sample_user("best_driver@test.com", is_driver=True),
+            rate=5,
+        )
+        self.unrated_driver = self.sample_driver(
+            self.sample_user("unrated_driver@test.com", is_driver=True)
+        )
+
+    def test_leaderboard_sorted_by_rate(self):
+        res = self.client.get(
+            self.LEADERBOARD_URL, {"city": self.default_city.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [driver["id"] for driver in res.data],
+            [self.best_driver.id, self.default_driver.id],
+        )
+        self.assertEqual(res.data[0]["rank"], 1)
+
+    def test_leaderboard_requires_city(self):
+        res = self.client.get(self.LEADERBOARD_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_driver_rank(self):
+        res = self.client.get(
+            reverse("taxi:driver-rank", args=[self.default_driver.id])
+        )
+
+        self.assertEqual(res.data["rank"], 2)
+
+    @patch("taxi.views.send_message")
+    def test_rate_ride_updates_leaderboard(self, mock_send_message):
+        driver_leaderboard.top(self.default_city.id)
+        order = self.sample_order(self.default_user)
+        ride = Ride.objects.create(
+            order=order,
+            driver=self.unrated_driver,
+            car=self.sample_car(self.unrated_driver),
+            status="3",
+        )
+        self.client.force_authenticate(self.default_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("taxi:ride-rate-ride", args=[ride.id]), {"rate": 3}
+            )
+        res = self.client.get(
+            reverse("taxi:driver-rank", args=[self.unrated_driver.id])
+        )
+
+        self.assertEqual(res.data["rank"], 3)
+        self.assertEqual(len(driver_leaderboard.top(self.default_city.id)), 3)
+
+    def test_fired_driver_leaves_leaderboard_on_commit(self):
+        driver_leaderboard.top(self.default_city.id)
+        self.client.force_authenticate(self.default_admin)
+        url = reverse("taxi:driver-fire", args=[self.best_driver.id])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.get(url)
+        self.assertEqual(driver_leaderboard.rank(self.best_driver), 1)
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(
+            [
+                driver_id
+                for driver_id, _ in driver_leaderboard.top(
+                    self.default_city.id
+                )
+            ],
+            [self.default_driver.id],
+        )
@@ -279,3 +279,89 @@ class AdminDriverApplicationAPITest(TestBase):
                 user=self.default_user_for_application
             ).exists()
         )
+
+
+class BulkReviewDriverApplicationAPITest(TestBase):
+    BULK_REVIEW_URL = reverse("taxi:driverapplication-bulk-review")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.default_admin)
+        self.applications = [self.default_driver_application] + [
+            self.sample_driver_application(
+                self.sample_user(email=f"applicant{i}@test.com")
+            )
+            for i in range(3)
+        ]
+
+    def test_simple_user_cant_bulk_review(self):
+        self.client.force_authenticate(user=self.default_user)
+
+        res = self.client.post(
+            self.BULK_REVIEW_URL,
+            {"ids": [self.default_driver_application.id], "status": "A"},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_approve_creates_drivers(self):
+        ids = [application.id for application in self.applications]
+
+        with self.assertNumQueries(7):
+            res = self.client.post(
+                self.BULK_REVIEW_URL,
+                {"ids": ids, "status": "A"},
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in res.data], ids)
+        for application in self.applications:
+            application.refresh_from_db()
+            application.user.refresh_from_db()
+            self.assertEqual(application.status, "A")
+            self.assertIsNotNone(application.reviewed_at)
+            self.assertTrue(application.user.is_driver)
+            self.assertTrue(
+                Driver.objects.filter(user=application.user).exists()
+            )
+
+    def test_bulk_reject(self):
+        ids = [application.id for application in self.applications]
+
+        res = self.client.post(
+            self.BULK_REVIEW_URL, {"ids": ids, "status": "R"}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            DriverApplication.objects.filter(id__in=ids, status="R").count(),
+            len(ids),
+        )
+        self.assertFalse(
+            Driver.objects.filter(
+                user__in=[
+                    application.user for application in self.applications
+                ]
+            ).exists()
+        )
+
+    def test_bulk_review_reports_per_id_errors(self):
+        processed = self.sample_driver_application(
+            self.default_user, status="R"
+        )
+
+        res = self.client.post(
+            self.BULK_REVIEW_URL,
+            {
+                "ids": [self.default_driver_application.id, processed.id, 0],
+                "status": "A",
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]["status"], "Approved")
+        self.assertEqual(res.data[1]["error"], "Application already processed")
+        self.assertEqual(res.data[2]["error"], "Application not found")
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from payment.models import Payment
+from taxi.models import Order, Ride
+from taxi.services.driver_dashboard import driver_dashboard
+from taxi.tests.base import TestBase
+
+DASHBOARD_URL = reverse("taxi:driver-dashboard")
+
+
+class DriverDashboardTest(TestBase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def sample_ride(
+        self, age: timedelta, ride_status: str, rate: int | None = None
+    ) -> Ride:
+        order = self.sample_order(self.default_user)
+        Order.objects.filter(id=order.id).update(
+            date_created=timezone.now() - age, distance=1000
+        )
+        Payment.objects.create(order=order, status="2", money_to_pay="12.50")
+        return Ride.objects.create(
+            order=order,
+            driver=self.default_driver,
+            car=self.default_car,
+            status=ride_status,
+            rate=rate,
+        )
+
+    def test_dashboard(self):
+        self.sample_ride(timedelta(), "3", rate=5)
+        self.sample_ride(timedelta(), "2")
+        self.sample_ride(timedelta(days=30), "3", rate=3)
+        self.client.force_authenticate(self.default_driver_user)
+
+        res = self.client.get(DASHBOARD_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["today"],
+            {
+                "rides": 2,
+                "finished": 1,
+                "distance": 1000,
+                "earnings": "25.00",
+            },
+        )
+        self.assertEqual(res.data["total"]["rides"], 3)
+        self.assertEqual(res.data["total"]["distance"], 2000)
+        self.assertEqual(res.data["total"]["earnings"], "37.50")
+        self.assertEqual(
+            res.data["rating"],
+            {
+                "average": "4.00",
+                "count": 2,
+                "breakdown": {"1": 0, "2": 0, "3": 1, "4": 0, "5": 1},
+            },
+        )
+
+    def test_driver_without_rides(self):
+        self.client.force_authenticate(self.default_driver_user)
+
+        res = self.client.get(DASHBOARD_URL)
+
+        self.assertEqual(
+            res.data["week"],
+            {"rides": 0, "finished": 0, "distance": 0, "earnings": "0.00"},
+        )
+        self.assertIsNone(res.data["rating"]["average"])
+
+    def test_computed_with_one_query_and_cached(self):
+        self.sample_ride(timedelta(), "3", rate=4)
+        user_id = self.default_driver_user.id
+
+        with self.assertNumQueries(1):
+            driver_dashboard.get(user_id)
+        with self.assertNumQueries(0):
+            driver_dashboard.get(user_id)
+
+    def test_ride_changes_invalidate(self):
+        ride = self.sample_ride(timedelta(), "2")
+        user_id = self.default_driver_user.id
+        driver_dashboard.get(user_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ride.status = "3"
+            ride.rate = 5
+            ride.save()
+
+        dashboard = driver_dashboard.get(user_id)
+        self.assertEqual(dashboard["today"]["finished"], 1)
+        self.assertEqual(dashboard["rating"]["breakdown"]["5"], 1)
+
+    def test_change_during_computation_is_not_hidden(self):
+        ride = self.sample_ride(timedelta(), "2")
+        user_id = self.default_driver_user.id
+        compute = driver_dashboard.compute
+
+        def compute_then_finish(*args):
+            # The ride finishes while the stale figures are computed.
+            dashboard = compute(*args)
+            Ride.objects.filter(id=ride.id).update(status="3")
+            driver_dashboard.invalidate(user_id)
+            return dashboard
+
+        with patch.object(
+            driver_dashboard, "compute", side_effect=compute_then_finish
+        ):
+            stale = driver_dashboard.get(user_id)
+
+        self.assertEqual(stale["today"]["finished"], 0)
+        self.assertEqual(driver_dashboard.get(user_id)["today"]["finished"], 1)
+
+    def test_only_drivers(self):
+        self.client.force_authenticate(self.default_admin)
+
+        res = self.client.get(DASHBOARD_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from payment.models import Payment
+from payment.serializers import PaymentListSerializer
+from taxi.models import Driver, Order, Ride
+from taxi.serializers import (
+    DriverListSerializer,
+    OrderListSerializer,
+    RideListSerializer,
+)
+from taxi.services.fast_list import RowRenderer
+from taxi.tests.base import TestBase
+
+
+class RowRendererTest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.default_driver.rate = Decimal("4.5")
+        self.default_driver.save()
+        self.paid_order = self.sample_order(self.default_user)
+        Payment.objects.create(
+            order=self.paid_order,
+            status=Payment.StatusEnum.paid,
+            session_id="paid",
+            money_to_pay=Decimal("12.30"),
+        )
+        Ride.objects.create(
+            order=self.paid_order,
+            driver=self.default_driver,
+            car=self.default_car,
+            status="2",
+            rate=5,
+        )
+        self.sample_order(self.default_admin)
+
+    def assert_renders_like_serializer(
+        self,
+        serializer_class: type[serializers.Serializer],
+        queryset,
+    ):
+        renderer = RowRenderer(serializer_class)
+
+        fast = renderer.render_rows(renderer.values(queryset))
+        expected = serializer_class(queryset, many=True).data
+
+        self.assertEqual(
+            JSONRenderer().render(fast), JSONRenderer().render(expected)
+        )
+
+    def test_driver_list(self):
+        self.assert_renders_like_serializer(
+            DriverListSerializer, Driver.objects.all()
+        )
+
+    def test_order_list_with_and_without_payment(self):
+        self.assert_renders_like_serializer(
+            OrderListSerializer, Order.objects.all()
+        )
+
+    def test_ride_list(self):
+        self.assert_renders_like_serializer(
+            RideListSerializer, Ride.objects.all()
+        )
+
+    def test_payment_list(self):
+        self.assert_renders_like_serializer(
+            PaymentListSerializer, Payment.objects.all()
+        )
+
+    def test_method_fields_are_rejected(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Driver
+                fields = ("id", "label")
+
+        with self.assertRaises(ImproperlyConfigured):
+            RowRenderer(MethodSerializer)
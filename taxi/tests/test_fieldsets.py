@@ -0,0 +1,119 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from payment.models import Payment
+from taxi.models import Ride
+from taxi.serializers import RideDetailSerializer
+from taxi.services.fieldsets import join_plan
+from taxi.tests.base import TestBase
+
+RIDE_URL = reverse("taxi:ride-list")
+ORDER_URL = reverse("taxi:order-list")
+PAYMENT_URL = reverse("payment:payment-list")
+
+
+def get_ride_detail(ride_id: int) -> str:
+    return reverse("taxi:ride-detail", args=[ride_id])
+
+
+class SparseFieldsetTest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.order = self.sample_order(self.default_user)
+        self.ride = Ride.objects.create(
+            order=self.order,
+            driver=self.default_driver,
+            car=self.default_car,
+        )
+        self.client.force_authenticate(self.default_admin)
+
+    def test_fields_give_a_single_table_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                get_ride_detail(self.ride.id), {"fields": "id,status"}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data, {"id": self.ride.id, "status": "Waiting for client"}
+        )
+        rides = [q["sql"] for q in queries if "taxi_ride" in q["sql"]]
+        self.assertEqual(len(rides), 1)
+        self.assertNotIn("JOIN", rides[0])
+
+    def test_nested_fields(self):
+        res = self.client.get(
+            get_ride_detail(self.ride.id), {"fields": "id,order.city.name"}
+        )
+
+        self.assertEqual(
+            res.data,
+            {
+                "id": self.ride.id,
+                "order": {"city": {"name": self.default_city.name}},
+            },
+        )
+
+    def test_expand_collapses_other_objects_to_ids(self):
+        res = self.client.get(
+            get_ride_detail(self.ride.id), {"expand": "order"}
+        )
+
+        self.assertEqual(res.data["order"]["id"], self.order.id)
+        self.assertEqual(res.data["order"]["city"], self.default_city.id)
+        self.assertEqual(res.data["order"]["user"], self.default_user.id)
+        self.assertEqual(res.data["driver"], self.default_driver.id)
+        self.assertEqual(res.data["car"], self.default_car.id)
+
+    def test_unknown_field(self):
+        res = self.client.get(
+            get_ride_detail(self.ride.id), {"fields": "id,order.colour"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["fields"], ["Unknown field order.colour."])
+
+    def test_plain_field_cannot_be_expanded(self):
+        res = self.client.get(RIDE_URL, {"expand": "status"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fast_list_follows_fields(self):
+        res = self.client.get(ORDER_URL, {"fields": "id,distance"})
+
+        self.assertEqual(
+            res.data, [{"id": self.order.id, "distance": self.order.distance}]
+        )
+
+    def test_payment_list_expand(self):
+        payment = Payment.objects.create(
+            order=self.order, status="1", money_to_pay=10
+        )
+
+        res = self.client.get(
+            PAYMENT_URL, {"expand": "", "fields": "id,order"}
+        )
+
+        self.assertEqual(
+            res.data, [{"id": payment.id, "order": self.order.id}]
+        )
+
+    def test_join_plan_follows_shape(self):
+        serializer = RideDetailSerializer()
+
+        self.assertEqual(
+            join_plan(serializer),
+            (
+                [
+                    "car__driver__user",
+                    "driver__city",
+                    "driver__user",
+                    "order__city",
+                    "order__payment",
+                    "order__user",
+                ],
+                [],
+            ),
+        )
@@ -0,0 +1,141 @@
+import threading
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+
+from payment.models import Payment
+from taxi.models import Order, Ride
+from taxi.services.idempotency import cache_key
+from taxi.tests.base import TestBase
+
+ORDER_URL = reverse("taxi:order-list")
+
+
+def take_order_url(order_id: int) -> str:
+    return reverse("taxi:order-take-order", args=[order_id])
+
+
+@patch("taxi.views.send_message")
+@patch("taxi.serializers.send_message")
+@patch("taxi.views.payment_helper")
+class IdempotencyTest(TestBase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.payload = {
+            "city": self.default_city.id,
+            "street_from": "test street_from",
+            "street_to": "test street_to",
+            "distance": 51,
+        }
+
+    def create_order(self, key: str, **payload):
+        return self.client.post(
+            ORDER_URL,
+            {**self.payload, **payload},
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retried_create_is_replayed(self, mock_payment_helper, *mocks):
+        mock_payment_helper.return_value = Response(
+            {"session_url": "https://stripe.test"},
+            status=status.HTTP_201_CREATED,
+        )
+        self.client.force_authenticate(self.default_user)
+
+        first = self.create_order("retry-1")
+        second = self.create_order("retry-1")
+
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        mock_payment_helper.assert_called_once()
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_for_another_payload(self, mock_payment_helper, *mocks):
+        mock_payment_helper.return_value = Response(
+            status=status.HTTP_201_CREATED
+        )
+        self.client.force_authenticate(self.default_user)
+
+        self.create_order("retry-1")
+        res = self.create_order("retry-1", distance=80)
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_keys_are_scoped_per_user(self, mock_payment_helper, *mocks):
+        mock_payment_helper.return_value = Response(
+            status=status.HTTP_201_CREATED
+        )
+        for user in (self.default_user, self.default_driver_user):
+            self.client.force_authenticate(user)
+            self.create_order("same-key")
+
+        self.assertEqual(mock_payment_helper.call_count, 2)
+
+    def test_retried_take_order_is_replayed(self, *mocks):
+        order = self.sample_order(self.default_user)
+        Payment.objects.create(
+            status="2", session_id="test", money_to_pay=10, order=order
+        )
+        self.client.force_authenticate(self.default_driver_user)
+
+        responses = [
+            self.client.post(
+                take_order_url(order.id),
+                {"car": self.default_car.id},
+                HTTP_IDEMPOTENCY_KEY="take-1",
+            )
+            for _ in range(2)
+        ]
+
+        self.assertEqual(
+            [res.status_code for res in responses],
+            [status.HTTP_201_CREATED, status.HTTP_201_CREATED],
+        )
+        self.assertEqual(responses[0].data, responses[1].data)
+        self.assertEqual(Ride.objects.count(), 1)
+
+    def test_duplicate_waits_for_the_first_request(
+        self, mock_payment_helper, *mocks
+    ):
+        self.client.force_authenticate(self.default_user)
+        key = cache_key(self.default_user.id, "OrderViewSet.create", "slow")
+        cache.add(f"{key}:lock", 1)
+
+        def finish_first_request():
+            cache.set(
+                key,
+                {
+                    "fingerprint": "first",
+                    "status": status.HTTP_201_CREATED,
+                    "data": {"id": 1},
+                },
+            )
+            cache.delete(f"{key}:lock")
+
+        threading.Timer(0.2, finish_first_request).start()
+        with patch(
+            "taxi.services.idempotency.request_fingerprint",
+            return_value="first",
+        ):
+            res = self.create_order("slow")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data, {"id": 1})
+        mock_payment_helper.assert_not_called()
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0.1)
+    def test_duplicate_gives_up_waiting(self, mock_payment_helper, *mocks):
+        self.client.force_authenticate(self.default_user)
+        key = cache_key(self.default_user.id, "OrderViewSet.create", "slow")
+        cache.add(f"{key}:lock", 1)
+
+        res = self.create_order("slow")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        mock_payment_helper.assert_not_called()
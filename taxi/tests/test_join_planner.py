@@ -0,0 +1,105 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from payment.models import Payment
+from payment.serializers import PaymentSerializer
+from taxi.models import Order, Ride
+from taxi.serializers import CarSerializer, OrderDetailSerializer
+from taxi.services import join_planner as join_planner_module
+from taxi.services.join_planner import JoinPlanner
+from taxi.tests.base import TestBase
+
+
+class JoinPlannerTest(TestBase):
+    def test_plans_follow_source_paths(self):
+        planner = JoinPlanner()
+
+        self.assertEqual(planner.plan(CarSerializer), (["driver__user"], []))
+        self.assertEqual(
+            planner.plan(PaymentSerializer),
+            (["order__city", "order__payment", "order__user"], []),
+        )
+        self.assertEqual(
+            planner.plan(OrderDetailSerializer),
+            (["city", "payment", "user"], []),
+        )
+
+    def test_plan_is_computed_once(self):
+        planner = JoinPlanner()
+
+        with patch.object(
+            join_planner_module,
+            "join_plan",
+            wraps=join_planner_module.join_plan,
+        ) as join_plan:
+            planner.plan(CarSerializer)
+            planner.plan(CarSerializer)
+
+        join_plan.assert_called_once()
+
+    def test_serializer_of_another_model_adds_no_joins(self):
+        queryset = JoinPlanner().apply(
+            Order.objects.select_related("user"), CarSerializer
+        )
+
+        self.assertFalse(queryset.query.select_related)
+
+
+class ListQueryCountTest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.default_admin)
+
+    def add_rows(self) -> None:
+        user = self.sample_user(email=f"user{Order.objects.count()}@test.com")
+        driver = self.sample_driver(
+            self.sample_user(
+                email=f"driver{Order.objects.count()}@test.com",
+                is_driver=True,
+            )
+        )
+        car = self.sample_car(driver)
+        order = self.sample_order(user)
+        Payment.objects.create(order=order, status="2", money_to_pay=10)
+        Ride.objects.create(order=order, driver=driver, car=car)
+        self.sample_driver_application(user)
+
+    def count_queries(self, url: str) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_lists_do_not_grow_with_rows(self):
+        urls = [
+            reverse("taxi:car-list"),
+            reverse("taxi:city-list"),
+            reverse("taxi:driver-list"),
+            reverse("taxi:driverapplication-list"),
+            reverse("taxi:order-list"),
+            reverse("taxi:ride-list"),
+            reverse("payment:payment-list"),
+        ]
+        self.add_rows()
+        counts = {url: self.count_queries(url) for url in urls}
+        for _ in range(3):
+            self.add_rows()
+
+        self.assertEqual(
+            {url: self.count_queries(url) for url in urls}, counts
+        )
+
+    def test_details_are_joined(self):
+        self.add_rows()
+        ride = Ride.objects.get()
+        payment = Payment.objects.get()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("taxi:ride-detail", args=[ride.id]))
+            self.client.get(
+                reverse("payment:payment-detail", args=[payment.id])
+            )
+
+        self.assertEqual(len(queries), 2)
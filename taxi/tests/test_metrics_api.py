@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from taxi.services.metrics import registry
+from taxi.services.telegram_helper import deliver
+from taxi.tests.base import TestBase
+
+METRICS_URL = reverse("taxi:metrics")
+ORDER_URL = reverse("taxi:order-list")
+
+
+def sample(name: str, **labels) -> float:
+    return registry.get_sample_value(name, labels) or 0
+
+
+class MetricsAPITest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.default_user)
+
+    def test_requests_are_recorded_per_viewset_and_action(self):
+        before = sample(
+            "taxi_http_request_duration_seconds_count",
+            view="OrderViewSet",
+            action="list",
+        )
+        queries_before = sample(
+            "taxi_db_queries_per_request_sum",
+            view="OrderViewSet",
+            action="list",
+        )
+
+        self.client.get(ORDER_URL)
+
+        self.assertEqual(
+            sample(
+                "taxi_http_request_duration_seconds_count",
+                view="OrderViewSet",
+                action="list",
+            ),
+            before + 1,
+        )
+        self.assertGreater(
+            sample(
+                "taxi_db_queries_per_request_sum",
+                view="OrderViewSet",
+                action="list",
+            ),
+            queries_before,
+        )
+
+    def test_extra_actions_are_labelled_by_name(self):
+        order = self.sample_order(self.default_user)
+        before = sample(
+            "taxi_http_requests_total",
+            view="OrderViewSet",
+            action="take_order",
+            status="403",
+        )
+
+        self.client.post(reverse("taxi:order-take-order", args=[order.id]))
+
+        self.assertEqual(
+            sample(
+                "taxi_http_requests_total",
+                view="OrderViewSet",
+                action="take_order",
+                status="403",
+            ),
+            before + 1,
+        )
+
+    @patch("taxi.services.telegram_helper.bot")
+    def test_external_call_errors_are_counted(self, mock_bot):
+        mock_bot.send_message.side_effect = ConnectionError
+        labels = {"service": "telegram", "operation": "send_message"}
+        before = sample("taxi_external_call_errors_total", **labels)
+
+        with self.assertRaises(ConnectionError):
+            deliver("1", "hello")
+
+        self.assertEqual(
+            sample("taxi_external_call_errors_total", **labels), before + 1
+        )
+
+    def test_metrics_are_exposed_in_prometheus_format(self):
+        res = self.client.get(
+            METRICS_URL,
+            HTTP_AUTHORIZATION=(
+                f"Bearer {AccessToken.for_user(self.default_admin)}"
+            ),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            b"# TYPE taxi_http_request_duration_seconds histogram",
+            res.content,
+        )
+
+    def test_metrics_are_staff_only_without_a_token(self):
+        anonymous = self.client_class().get(METRICS_URL)
+        user = self.client.get(
+            METRICS_URL,
+            HTTP_AUTHORIZATION=(
+                f"Bearer {AccessToken.for_user(self.default_user)}"
+            ),
+        )
+
+        self.assertEqual(anonymous.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(user.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token_is_required_when_configured(self):
+        denied = self.client.get(METRICS_URL)
+        allowed = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer secret"
+        )
+
+        self.assertEqual(denied.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(allowed.status_code, status.HTTP_200_OK)
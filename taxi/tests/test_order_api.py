@@ -9,6 +9,7 @@ from rest_framework.response import Response
 from payment.models import Payment
 from taxi.models import Order, City, Driver, Car, Ride
 from taxi.serializers import OrderListSerializer
+from taxi.views import OrderViewSet
 from taxi.tests.base import TestBase
 
 ORDER_URL = reverse("taxi:order-list")
@@ -147,6 +148,26 @@ class DriverOrderAPITest(TestBase):
         self.assertTrue(Ride.objects.exists())
         mock_send_message.assert_called_once()
 
+    def test_driver_cant_take_order_closed_meanwhile(self):
+        order = self.sample_order(self.default_user)
+        Payment.objects.create(
+            status="2",
+            order=order,
+            session_id="123",
+            money_to_pay=50,
+        )
+        # The expiry sweeper closes the order after it has been looked up.
+        Order.objects.filter(id=order.id).update(is_active=False)
+
+        with patch.object(OrderViewSet, "get_object", return_value=order):
+            res = self.client.post(
+                reverse("taxi:order-take-order", args=[order.id]),
+                {"car": self.default_car.id},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ride.objects.exists())
+
     def test_driver_cant_take_order_if_has_active_ride(self):
         order1 = self.sample_order(self.default_user)
         Ride.objects.create(
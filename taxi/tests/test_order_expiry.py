@@ -0,0 +1,120 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.utils import timezone
+
+from payment.models import Payment
+from taxi import tasks
+from taxi.models import City, Order
+from taxi.services.order_expiry import OrderExpiryScheduler
+from taxi.tests.base import TestBase
+
+
+@override_settings(ORDER_TTL_MINUTES=30)
+class OrderExpiryTest(TestBase):
+    def aged_order(
+        self,
+        minutes: int,
+        city: City | None = None,
+        payment_status: str = Payment.StatusEnum.paid,
+    ) -> Order:
+        """An order paid ``minutes`` ago, an hour after its creation."""
+        order = Order.objects.create(
+            user=self.default_user,
+            city=city or self.default_city,
+            street_from="test street_from",
+            street_to="test street_to",
+            distance=51,
+        )
+        paid_at = timezone.now() - timedelta(minutes=minutes)
+        Order.objects.filter(id=order.id).update(
+            date_created=paid_at - timedelta(hours=1)
+        )
+        Payment.objects.create(
+            order=order,
+            status=payment_status,
+            session_id=f"cs_test_{order.id}",
+            money_to_pay=10,
+            created=paid_at,
+            paid_at=(
+                paid_at if payment_status == Payment.StatusEnum.paid else None
+            ),
+        )
+        return order
+
+    def assertActive(self, order: Order, active: bool) -> None:
+        order.refresh_from_db()
+        self.assertEqual(order.is_active, active)
+
+    def test_orders_expire_after_their_city_ttl(self):
+        fast_city = City.objects.create(name="fast", order_ttl_minutes=10)
+        fast_order = self.aged_order(20, fast_city)
+        young_order = self.aged_order(20)
+        old_order = self.aged_order(40)
+
+        expired = OrderExpiryScheduler().expire_due()
+
+        self.assertCountEqual(expired, [fast_order.id, old_order.id])
+        self.assertActive(fast_order, False)
+        self.assertActive(young_order, True)
+        self.assertActive(old_order, False)
+
+    def test_orders_waiting_for_payment_are_left_to_the_reaper(self):
+        pending = self.aged_order(
+            40, payment_status=Payment.StatusEnum.pending
+        )
+
+        expired = OrderExpiryScheduler().expire_due()
+
+        self.assertEqual(expired, [])
+        self.assertActive(pending, True)
+
+    def test_payments_of_expired_orders_are_refunded(self):
+        order = self.aged_order(40)
+
+        with (
+            patch("taxi.services.order_expiry.refund_payment") as refund,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            OrderExpiryScheduler().expire_due()
+
+        order.payment.refresh_from_db()
+        self.assertEqual(order.payment.status, Payment.StatusEnum.refunded)
+        refund.delay.assert_called_once_with(order.payment.session_id)
+
+    def test_later_orders_are_pulled_and_taken_orders_skipped(self):
+        scheduler = OrderExpiryScheduler()
+        taken = self.aged_order(5)
+        scheduler.expire_due()
+        late = self.aged_order(4)
+        Order.objects.filter(id=taken.id).update(is_active=False)
+
+        expired = scheduler.expire_due(timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(expired, [late.id])
+
+    @override_settings(ORDER_EXPIRY_BATCH_SIZE=2)
+    def test_task_expires_in_batches_and_notifies(self):
+        orders = [self.aged_order(40) for _ in range(5)]
+
+        with (
+            patch.object(tasks, "order_expiry", OrderExpiryScheduler()),
+            patch.object(tasks.notify_expired_orders, "delay") as notify,
+            self.assertNumQueries(2 + 3 * 7),
+        ):
+            expired = tasks.expire_unclaimed_orders()
+
+        self.assertEqual(expired, 5)
+        notify.assert_called_once()
+        self.assertCountEqual(
+            notify.call_args.args[0], [order.id for order in orders]
+        )
+
+    def test_operations_chat_is_notified(self):
+        order = self.aged_order(40)
+
+        with patch("taxi.tasks.send_message") as send_message:
+            tasks.notify_expired_orders([order.id])
+
+        self.assertIn(f"#{order.id}", send_message.call_args.args[0])
@@ -0,0 +1,152 @@
+import tempfile
+from unittest.mock import Mock, patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from taxi.services.profiling import profiler_lock
+from taxi.tests.base import TestBase
+
+CITY_URL = reverse("taxi:city-list")
+ORDER_URL = reverse("taxi:order-list")
+PROFILE_URL = reverse("taxi:profile-list")
+
+
+def profile_detail_url(profile_id: str) -> str:
+    return reverse("taxi:profile-detail", args=[profile_id])
+
+
+class ProfilerAPITest(TestBase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            PROFILER_DIR=directory.name, PROFILER_SAMPLE_RATE=0
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get_with_token(self, user, url: str, **headers):
+        return self.client.get(
+            url,
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}",
+            **headers,
+        )
+
+    def test_staff_request_with_header_is_profiled(self):
+        res = self.get_with_token(
+            self.default_admin, CITY_URL, HTTP_X_PROFILE="1"
+        )
+        profile_id = res["X-Profile-Id"]
+
+        self.client.force_authenticate(self.default_admin)
+        profiles = self.client.get(PROFILE_URL)
+        profile = self.client.get(profile_detail_url(profile_id))
+        stats = self.client.get(
+            reverse("taxi:profile-stats", args=[profile_id])
+        )
+
+        self.assertEqual(profiles.data[0]["id"], profile_id)
+        self.assertEqual(profile.data["path"], CITY_URL)
+        self.assertEqual(profile.data["user"], self.default_admin.email)
+        self.assertGreater(profile.data["sql_count"], 0)
+        self.assertTrue(
+            any(
+                "taxi_city" in query["sql"]
+                for query in profile.data["queries"]
+            )
+        )
+        self.assertIn("cumulative", profile.data["functions"])
+        self.assertEqual(stats.status_code, status.HTTP_200_OK)
+
+    def test_header_is_ignored_for_non_staff(self):
+        res = self.get_with_token(
+            self.default_user, CITY_URL, HTTP_X_PROFILE="1"
+        )
+
+        self.assertNotIn("X-Profile-Id", res)
+
+    def test_request_is_served_unprofiled_while_profiler_is_busy(self):
+        with profiler_lock:
+            res = self.get_with_token(
+                self.default_admin, CITY_URL, HTTP_X_PROFILE="1"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", res)
+        self.assertFalse(profiler_lock.locked())
+        res = self.get_with_token(
+            self.default_admin, CITY_URL, HTTP_X_PROFILE="1"
+        )
+        self.assertIn("X-Profile-Id", res)
+
+    def test_failed_profile_setup_releases_the_profiler(self):
+        with patch(
+            "taxi.services.profiling.RequestProfile",
+            side_effect=RuntimeError("no profiler"),
+        ):
+            with self.assertRaises(RuntimeError):
+                self.get_with_token(
+                    self.default_admin, CITY_URL, HTTP_X_PROFILE="1"
+                )
+
+        self.assertFalse(profiler_lock.locked())
+
+    @override_settings(PROFILER_SAMPLE_RATE=1, PROFILER_RING_SIZE=2)
+    def test_sampled_profiles_are_kept_in_a_ring(self):
+        ids = [
+            self.get_with_token(self.default_user, CITY_URL)["X-Profile-Id"]
+            for _ in range(3)
+        ]
+        self.client.force_authenticate(self.default_admin)
+
+        res = self.client.get(PROFILE_URL)
+
+        self.assertEqual([profile["id"] for profile in res.data], ids[:0:-1])
+        self.assertEqual(
+            self.client.get(profile_detail_url(ids[0])).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    @patch("taxi.services.telegram_helper.bot")
+    @patch("payment.services.payment_helper.stripe_gateway.client")
+    def test_stripe_calls_are_recorded(self, mock_client, mock_bot):
+        sessions = mock_client.return_value.checkout.sessions
+        sessions.create.return_value = Mock(
+            url="https://stripe.test/session", id="session"
+        )
+
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "city": self.default_city.id,
+                "street_from": "Airport",
+                "street_to": "Station",
+                "distance": 500,
+            },
+            HTTP_AUTHORIZATION=(
+                f"Bearer {AccessToken.for_user(self.default_admin)}"
+            ),
+            HTTP_X_PROFILE="1",
+        )
+        self.client.force_authenticate(self.default_admin)
+        profile = self.client.get(profile_detail_url(res["X-Profile-Id"]))
+
+        self.assertEqual(
+            [
+                (call["service"], call["operation"])
+                for call in profile.data["external_calls"]
+            ],
+            [("stripe", "checkout.Session.create")],
+        )
+        mock_bot.send_message.assert_not_called()
+
+    def test_only_admin_can_browse_profiles(self):
+        self.client.force_authenticate(self.default_user)
+
+        res = self.client.get(PROFILE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
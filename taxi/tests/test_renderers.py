@@ -0,0 +1,119 @@
+import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import msgpack
+import orjson
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from payment.models import Payment
+from taxi.models import Order
+from taxi.services.renderers import MessagePackRenderer, OrjsonRenderer
+from taxi.tests.base import TestBase
+
+ORDER_URL = reverse("taxi:order-list")
+
+SAMPLE = {
+    "id": 1,
+    "money_to_pay": Decimal("12.30"),
+    "date_created": datetime.datetime(
+        2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+    ),
+    "date": datetime.date(2024, 5, 1),
+    "duration": datetime.timedelta(minutes=5),
+    "payment_status": Payment.StatusEnum.paid,
+    "label": gettext_lazy("Paid"),
+    "street": "Khreshchatyk\u2028Kyiv",
+    "rates": (5, None, 4.5),
+}
+
+
+class RendererTest(TestBase):
+    def test_orjson_output_matches_drf_json_renderer(self):
+        self.assertEqual(
+            OrjsonRenderer().render(SAMPLE), JSONRenderer().render(SAMPLE)
+        )
+
+    def test_indented_output_falls_back_to_drf(self):
+        content = OrjsonRenderer().render(SAMPLE, "application/json; indent=4")
+
+        self.assertEqual(
+            content,
+            JSONRenderer().render(SAMPLE, "application/json; indent=4"),
+        )
+
+    def test_msgpack_encodes_values_as_json_does(self):
+        content = MessagePackRenderer().render(SAMPLE)
+
+        self.assertEqual(
+            msgpack.unpackb(content, raw=False, strict_map_key=False),
+            orjson.loads(OrjsonRenderer().render(SAMPLE)),
+        )
+
+
+class ContentNegotiationAPITest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.default_user)
+        order = self.sample_order(self.default_user)
+        Payment.objects.create(
+            order=order,
+            status=Payment.StatusEnum.paid,
+            session_id="paid",
+            money_to_pay=Decimal("12.30"),
+        )
+
+    def test_json_is_the_default(self):
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertEqual(
+            orjson.loads(res.content)[0]["payment_status"], "Paid"
+        )
+
+    def test_msgpack_is_selected_by_accept_header(self):
+        json_res = self.client.get(ORDER_URL)
+        res = self.client.get(ORDER_URL, HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(res["Content-Type"], "application/msgpack")
+        self.assertEqual(
+            msgpack.unpackb(res.content, raw=False),
+            orjson.loads(json_res.content),
+        )
+
+    @patch("taxi.serializers.send_message")
+    @patch("taxi.views.payment_helper")
+    def test_msgpack_request_body_is_parsed(
+        self, mock_payment_helper, mock_send_message
+    ):
+        mock_payment_helper.return_value = Response(
+            status=status.HTTP_201_CREATED
+        )
+        Order.objects.all().delete()
+
+        res = self.client.post(
+            ORDER_URL,
+            msgpack.packb(
+                {
+                    "city": self.default_city.id,
+                    "street_from": "Airport",
+                    "street_to": "Station",
+                    "distance": 500,
+                }
+            ),
+            content_type="application/msgpack",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Order.objects.filter(street_from="Airport").exists())
+
+    def test_malformed_msgpack_is_rejected(self):
+        res = self.client.post(
+            ORDER_URL, b"\xc1", content_type="application/msgpack"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from taxi.models import Ride, RideSummary
+from taxi.tests.base import TestBase
+
+RIDE_URL = reverse("taxi:ride-list")
+
+
+class RideSummaryTest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.order = self.sample_order(self.default_user)
+        self.ride = Ride.objects.create(
+            order=self.order,
+            driver=self.default_driver,
+            car=self.default_car,
+        )
+
+    def summary(self) -> RideSummary:
+        return RideSummary.objects.get(ride=self.ride)
+
+    def test_created_with_the_ride(self):
+        summary = self.summary()
+
+        self.assertEqual(summary.order_id, self.order.id)
+        self.assertEqual(summary.user_id, self.default_user.id)
+        self.assertEqual(summary.driver_id, self.default_driver.id)
+        self.assertEqual(summary.driver_user_id, self.default_driver_user.id)
+        self.assertEqual(
+            summary.driver_name, self.default_driver_user.full_name
+        )
+        self.assertEqual(summary.car_number, self.default_car.number)
+        self.assertEqual(summary.status, "1")
+
+    def test_follows_ride_transitions(self):
+        self.ride.status = "3"
+        self.ride.rate = 4
+        self.ride.save()
+
+        self.assertEqual(self.summary().status, "3")
+        self.assertEqual(self.summary().rate, 4)
+
+    def test_follows_driver_name_and_car_number(self):
+        self.default_driver_user.first_name = "Renamed"
+        self.default_driver_user.save()
+        self.default_car.number = "AA 0001"
+        self.default_car.save()
+
+        summary = self.summary()
+        self.assertEqual(summary.driver_name, "Renamed test")
+        self.assertEqual(summary.car_number, "AA 0001")
+
+    def test_deleted_with_the_ride(self):
+        self.ride.delete()
+
+        self.assertFalse(RideSummary.objects.exists())
+
+    def test_rebuild_repairs_drift(self):
+        RideSummary.objects.update(driver_name="stale")
+        Ride.objects.filter(id=self.ride.id).update(status="2")
+
+        out = StringIO()
+        call_command("rebuild_ride_summaries", "--batch-size=1", stdout=out)
+
+        self.assertIn("Rebuilt 1 ride summaries.", out.getvalue())
+        self.assertEqual(self.summary().status, "2")
+        self.assertEqual(
+            self.summary().driver_name, self.default_driver_user.full_name
+        )
+
+    def test_list_reads_one_table(self):
+        self.client.force_authenticate(self.default_driver_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RIDE_URL, {"status": "1"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in res.data], [self.ride.id])
+        self.assertEqual(len(queries), 1)
+        self.assertIn("taxi_ridesummary", queries[0]["sql"])
+        self.assertNotIn("JOIN", queries[0]["sql"])
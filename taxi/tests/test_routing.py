@@ -0,0 +1,244 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from payment.models import Payment
+from taxi.models import Order, StreetDistance
+from taxi.services.routing import (
+    DistanceService,
+    OrderHistoryRoutingBackend,
+    RoutingBackend,
+    distance_service,
+)
+from taxi.tests.base import TestBase
+
+ORDER_URL = reverse("taxi:order-list")
+
+
+class CountingBackend(RoutingBackend):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def distance(self, city_id, street_from, street_to) -> int:
+        self.calls += 1
+        return 700
+
+
+class EstimatingBackend(CountingBackend):
+    authoritative = False
+
+
+class UnknownRouteBackend(CountingBackend):
+    def distance(self, city_id, street_from, street_to) -> None:
+        self.calls += 1
+        return None
+
+
+class DistanceServiceTest(TestBase):
+    def test_route_is_computed_once(self):
+        backend = CountingBackend()
+        service = DistanceService(backend, cache_size=10)
+
+        for _ in range(3):
+            distance = service.resolve(
+                self.default_city.id, "Airport", "Main  station"
+            )
+
+        self.assertEqual(distance, 700)
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(service.stats()["memory_hits"], 2)
+        self.assertTrue(
+            StreetDistance.objects.filter(
+                street_from="airport", street_to="main station"
+            ).exists()
+        )
+
+    def test_matrix_is_used_after_eviction(self):
+        backend = CountingBackend()
+        service = DistanceService(backend, cache_size=1)
+
+        service.resolve(self.default_city.id, "a", "b")
+        service.resolve(self.default_city.id, "c", "d")
+        with self.assertNumQueries(1):
+            service.resolve(self.default_city.id, "a", "b")
+
+        self.assertEqual(backend.calls, 2)
+        self.assertEqual(service.stats()["table_hits"], 1)
+
+    def test_unknown_route_is_remembered(self):
+        backend = UnknownRouteBackend()
+        service = DistanceService(backend, cache_size=10)
+
+        self.assertIsNone(service.resolve(self.default_city.id, "a", "b"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(service.resolve(self.default_city.id, "a", "b"))
+
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(service.stats()["negative_hits"], 1)
+
+    @override_settings(ROUTING_NEGATIVE_TTL_SECONDS=0)
+    def test_unknown_route_is_asked_again_after_ttl(self):
+        backend = UnknownRouteBackend()
+        service = DistanceService(backend, cache_size=10)
+
+        service.resolve(self.default_city.id, "a", "b")
+        service.resolve(self.default_city.id, "a", "b")
+
+        self.assertEqual(backend.calls, 2)
+
+    def test_estimate_is_stored_as_estimated(self):
+        service = DistanceService(EstimatingBackend(), cache_size=10)
+
+        service.resolve(self.default_city.id, "a", "b")
+
+        self.assertTrue(StreetDistance.objects.get().estimated)
+
+    def test_estimate_is_asked_again_after_ttl(self):
+        backend = EstimatingBackend()
+        service = DistanceService(backend, cache_size=10)
+        service.resolve(self.default_city.id, "a", "b")
+        service.clear()
+        service.resolve(self.default_city.id, "a", "b")
+        self.assertEqual(backend.calls, 1)
+
+        StreetDistance.objects.update(
+            updated_at=timezone.now() - timedelta(days=2)
+        )
+        service.clear()
+        service.resolve(self.default_city.id, "a", "b")
+
+        self.assertEqual(backend.calls, 2)
+
+    def test_routed_distance_replaces_estimate(self):
+        StreetDistance.objects.create(
+            city=self.default_city,
+            street_from="a",
+            street_to="b",
+            distance=300,
+            estimated=True,
+        )
+        backend = CountingBackend()
+        service = DistanceService(backend, cache_size=10)
+
+        self.assertEqual(service.resolve(self.default_city.id, "a", "b"), 700)
+
+        route = StreetDistance.objects.get()
+        self.assertEqual(route.distance, 700)
+        self.assertFalse(route.estimated)
+        service.clear()
+        service.resolve(self.default_city.id, "a", "b")
+        self.assertEqual(backend.calls, 1)
+
+    def test_stale_estimate_is_kept_for_unknown_route(self):
+        StreetDistance.objects.create(
+            city=self.default_city,
+            street_from="a",
+            street_to="b",
+            distance=300,
+            estimated=True,
+        )
+        service = DistanceService(UnknownRouteBackend(), cache_size=10)
+
+        self.assertEqual(service.resolve(self.default_city.id, "a", "b"), 300)
+
+    def reported_order(self, user, distance: int, **params) -> Order:
+        order = Order.objects.create(
+            user=user,
+            city=self.default_city,
+            street_from="Airport",
+            street_to="Station",
+            distance=distance,
+            **params,
+        )
+        Payment.objects.create(
+            order=order,
+            status=Payment.StatusEnum.paid,
+            session_id=f"cs_test_{order.id}",
+            money_to_pay=10,
+        )
+        return order
+
+    def history_distance(self) -> int | None:
+        return OrderHistoryRoutingBackend().distance(
+            self.default_city.id, "airport", "station"
+        )
+
+    def test_history_backend_needs_enough_users(self):
+        users = [self.sample_user(f"rider{i}@test.com") for i in range(3)]
+        self.reported_order(users[0], 1000)
+        self.reported_order(users[1], 1200)
+        self.reported_order(users[1], 1300)
+
+        self.assertIsNone(self.history_distance())
+        self.reported_order(users[2], 5000)
+        self.assertEqual(self.history_distance(), 1300)
+
+    def test_history_backend_ignores_unpaid_and_routed_orders(self):
+        users = [self.sample_user(f"rider{i}@test.com") for i in range(3)]
+        self.reported_order(users[0], 1000)
+        self.reported_order(users[1], 1000)
+        Order.objects.create(
+            user=users[2],
+            city=self.default_city,
+            street_from="Airport",
+            street_to="Station",
+            distance=90000,
+        )
+        self.assertIsNone(self.history_distance())
+
+        self.reported_order(users[2], 1000, distance_routed=True)
+        self.assertIsNone(self.history_distance())
+
+
+class OrderDistanceAPITest(TestBase):
+    def setUp(self):
+        super().setUp()
+        # The service the serializer uses is shared by the whole run.
+        distance_service.clear()
+        self.addCleanup(distance_service.clear)
+        self.client.force_authenticate(self.default_user)
+
+    @patch("taxi.serializers.send_message")
+    @patch("taxi.views.payment_helper")
+    def test_known_route_overrides_client_distance(
+        self, mock_payment_helper, mock_send_message
+    ):
+        mock_payment_helper.return_value = Response(
+            status=status.HTTP_201_CREATED
+        )
+        StreetDistance.objects.create(
+            city=self.default_city,
+            street_from="airport",
+            street_to="station",
+            distance=12000,
+        )
+
+        self.client.post(
+            ORDER_URL,
+            {
+                "city": self.default_city.id,
+                "street_from": "Airport",
+                "street_to": "Station",
+            },
+        )
+
+        order = Order.objects.get()
+        self.assertEqual(order.distance, 12000)
+        self.assertTrue(order.distance_routed)
+
+    def test_unknown_route_requires_distance(self):
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "city": self.default_city.id,
+                "street_from": "nowhere",
+                "street_to": "somewhere",
+            },
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,63 @@
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from taxi.models import City
+from taxi.tests.base import TestBase
+
+SEARCH_URL = reverse("taxi:search-list")
+
+
+class SearchAPITest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.kyiv = City.objects.create(name="Kyiv")
+        City.objects.create(name="Lviv")
+        self.smith = self.sample_driver(
+            self.sample_user(
+                "smith@test.com",
+                first_name="John",
+                last_name="Smith",
+                is_driver=True,
+            )
+        )
+        self.sample_car(self.smith, number="AA1234BB")
+        self.client.force_authenticate(self.default_user)
+
+    def test_query_must_be_at_least_3_characters(self):
+        res = self.client.get(SEARCH_URL, {"q": "ky"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_ranks_similar_cities(self):
+        res = self.client.get(SEARCH_URL, {"q": "kyiw"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["cities"][0]["id"], self.kyiv.id)
+        self.assertNotIn("cars", res.data)
+
+    def test_search_drivers_by_last_name(self):
+        res = self.client.get(SEARCH_URL, {"q": "smth"})
+
+        self.assertEqual(
+            [driver["id"] for driver in res.data["drivers"]], [self.smith.id]
+        )
+
+    def test_admin_can_search_car_numbers(self):
+        self.client.force_authenticate(self.default_admin)
+
+        res = self.client.get(SEARCH_URL, {"q": "aa1234"})
+
+        self.assertEqual(res.data["cars"][0]["number"], "AA1234BB")
+
+    def test_city_search_uses_trigram_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(
+                "EXPLAIN SELECT id FROM taxi_city "
+                "WHERE UPPER(name) LIKE UPPER(%s)",
+                ["%kyi%"],
+            )
+            plan = "\\n".join(row[0] for row in cursor.fetchall())
+
+        self.assertIn("city_name_trgm", plan)
@@ -0,0 +1,84 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from taxi.models import SlowQuery
+from taxi.services.slow_queries import (
+    fingerprint,
+    normalize_sql,
+    slow_query_log,
+)
+from taxi.tests.base import TestBase
+
+CITY_URL = reverse("taxi:city-list")
+SLOW_QUERY_URL = reverse("taxi:slow-query-list")
+
+
+class SlowQueryTest(TestBase):
+    def setUp(self):
+        super().setUp()
+        slow_query_log.entries.clear()
+
+    def test_literals_share_a_fingerprint(self):
+        first = normalize_sql(
+            "SELECT * FROM taxi_order WHERE id IN (1, 2, 3) "
+            "AND street_from = 'Main'"
+        )
+        second = normalize_sql(
+            "SELECT  * FROM taxi_order WHERE id IN (%s, %s) "
+            "AND street_from = 'O''Neil'"
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(fingerprint(first), fingerprint(second))
+        self.assertIn("IN (...)", first)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_request_queries_are_captured_with_origin(self):
+        self.client.force_authenticate(self.default_user)
+        self.client.get(CITY_URL)
+        slow_query_log.flush()
+
+        city_query = SlowQuery.objects.get(
+            sql__contains='FROM "taxi_city"', origin="CityViewSet.list"
+        )
+        self.assertEqual(city_query.count, 1)
+        self.assertIn("taxi/", city_query.stack)
+        self.assertFalse(
+            SlowQuery.objects.filter(sql__contains="taxi_slowquery").exists()
+        )
+
+    def test_flush_merges_into_existing_rows(self):
+        sql = "SELECT * FROM taxi_ride WHERE driver_id = 1"
+        for duration in (10.0, 20.0, 300.0):
+            slow_query_log.record(sql, duration, "first", "")
+        slow_query_log.flush()
+        slow_query_log.record(sql, 50.0, "second", "")
+        slow_query_log.flush()
+
+        slow_query = SlowQuery.objects.get()
+        self.assertEqual(slow_query.count, 4)
+        self.assertEqual(slow_query.total_ms, 380.0)
+        self.assertEqual(slow_query.max_ms, 300.0)
+        self.assertEqual(slow_query.p95_ms, 300.0)
+        self.assertEqual(slow_query.origin, "first")
+
+    def test_admin_lists_top_offenders(self):
+        slow_query_log.record("SELECT 1", 500.0, "a", "")
+        for _ in range(3):
+            slow_query_log.record("SELECT * FROM taxi_car", 200.0, "b", "")
+        self.client.force_authenticate(self.default_admin)
+
+        by_total = self.client.get(SLOW_QUERY_URL)
+        by_max = self.client.get(SLOW_QUERY_URL, {"order": "max_ms"})
+
+        self.assertEqual(by_total.status_code, status.HTTP_200_OK)
+        self.assertEqual(by_total.data[0]["origin"], "b")
+        self.assertEqual(by_max.data[0]["origin"], "a")
+
+    def test_non_admin_cannot_list(self):
+        self.client.force_authenticate(self.default_user)
+
+        res = self.client.get(SLOW_QUERY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
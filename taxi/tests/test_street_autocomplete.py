@@ -0,0 +1,103 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from taxi.models import City, Order
+from taxi.services.street_index import CityStreetIndex, StreetIndex
+from taxi.tests.base import TestBase
+
+
+def streets_url(city_id: int) -> str:
+    return reverse("taxi:city-streets", args=[city_id])
+
+
+class CityStreetIndexTest(TestBase):
+    def test_prefix_matches_are_ranked_by_frequency(self):
+        index = CityStreetIndex()
+        index.add("Shevchenka", 2)
+        index.add("Shuliavska", 5)
+        index.add("  shevchenka ")
+        index.add("Sahaidachnoho", 9)
+
+        self.assertEqual(
+            index.complete("SH", limit=10),
+            [
+                {"street": "Shuliavska", "count": 5},
+                {"street": "Shevchenka", "count": 3},
+            ],
+        )
+        self.assertEqual(len(index.complete("s", limit=2)), 2)
+        self.assertEqual(index.complete("x", limit=10), [])
+
+
+class StreetIndexTest(TestBase):
+    def create_order(self, street_from: str, street_to: str, **params):
+        return Order.objects.create(
+            user=self.default_user,
+            city=params.get("city", self.default_city),
+            street_from=street_from,
+            street_to=street_to,
+            distance=100,
+        )
+
+    def test_index_is_loaded_once_and_served_from_memory(self):
+        self.create_order("Khreshchatyk", "Airport")
+        self.create_order("Airport", "Khreshchatyk")
+        index = StreetIndex()
+
+        index.complete(self.default_city.id, "k")
+        with self.assertNumQueries(0):
+            suggestions = index.complete(self.default_city.id, "kh")
+
+        self.assertEqual(suggestions, [{"street": "Khreshchatyk", "count": 2}])
+
+    def test_refresh_pulls_only_new_orders(self):
+        other_city = City.objects.create(name="other")
+        self.create_order("Khreshchatyk", "Airport")
+        index = StreetIndex()
+        index.complete(self.default_city.id, "k")
+
+        self.create_order("Khreshchatyk", "Kontraktova")
+        self.create_order("Kyrylivska", "Airport", city=other_city)
+        index.refresh(self.default_city.id)
+
+        self.assertEqual(
+            index.complete(self.default_city.id, "k"),
+            [
+                {"street": "Khreshchatyk", "count": 2},
+                {"street": "Kontraktova", "count": 1},
+            ],
+        )
+
+    @override_settings(STREET_INDEX_REFRESH_SECONDS=0)
+    def test_stale_index_is_refreshed_on_query(self):
+        index = StreetIndex()
+        index.complete(self.default_city.id, "a")
+
+        self.create_order("Airport", "Lvivska")
+
+        self.assertEqual(
+            index.complete(self.default_city.id, "a"),
+            [{"street": "Airport", "count": 1}],
+        )
+
+
+class StreetAutocompleteAPITest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.default_user)
+
+    def test_autocomplete_streets(self):
+        self.sample_order(self.default_driver_user)
+
+        res = self.client.get(
+            streets_url(self.default_city.id), {"q": "test street_t"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [{"street": "test street_to", "count": 1}])
+
+    def test_prefix_is_required(self):
+        res = self.client.get(streets_url(self.default_city.id))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
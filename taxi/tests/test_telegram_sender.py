@@ -0,0 +1,158 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from telebot import apihelper
+
+from taxi.services.fake_telegram import FakeBotAPI
+from taxi.services.telegram_helper import deliver
+from taxi.services.telegram_sender import (
+    MESSAGE_LIMIT,
+    TelegramSender,
+    digest,
+)
+
+CHAT_ID = "42"
+
+
+@override_settings(
+    REDIS_URL=None,
+    TELEGRAM_BURST=5,
+    TELEGRAM_MESSAGES_PER_MINUTE=60,
+    TELEGRAM_DIGEST_WINDOW_SECONDS=5,
+)
+class TelegramSenderTest(TestCase):
+    def setUp(self):
+        self.api = FakeBotAPI(per_minute=2)
+        self.api.start()
+        self.addCleanup(self.api.server_close)
+        self.addCleanup(self.api.shutdown)
+        for patcher in (
+            patch.object(apihelper, "API_URL", self.api.api_url),
+            patch("taxi.services.telegram_sender.current_app"),
+        ):
+            self.addCleanup(patcher.stop)
+            self.app = patcher.start()
+        self.sender = TelegramSender(deliver)
+        # Stands in for Redis, so flushes go through the Celery task.
+        self.sender.memory_backend.shared = True
+
+    def enqueue(
+        self, *texts: str, sender: TelegramSender | None = None
+    ) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            for text in texts:
+                (sender or self.sender).enqueue(CHAT_ID, text)
+
+    def scheduled_countdowns(self) -> list[float]:
+        return [
+            call.kwargs["countdown"]
+            for call in self.app.send_task.call_args_list
+        ]
+
+    def test_burst_is_sent_as_one_digest(self):
+        self.enqueue("order 1", "order 2", "order 3")
+        self.sender.flush(CHAT_ID)
+
+        self.assertEqual(self.scheduled_countdowns(), [5])
+        self.assertEqual(len(self.api.messages), 1)
+        chat_id, text = self.api.messages[0]
+        self.assertEqual(chat_id, CHAT_ID)
+        self.assertTrue(text.startswith("3 updates:"))
+        self.assertIn("order 3", text)
+        self.assertEqual(
+            self.sender.stats(),
+            {"sent": 1, "merged": 2, "delayed": 0, "dropped": 0, "failed": 0},
+        )
+
+    def test_telegram_429_requeues_the_digest(self):
+        for text in ("first", "second", "third"):
+            self.enqueue(text)
+            self.sender.flush(CHAT_ID)
+
+        self.assertEqual(len(self.api.messages), 2)
+        self.assertEqual(self.api.rejected, 1)
+        self.assertEqual(self.sender.backend.pop_all(CHAT_ID), ["third"])
+        self.assertEqual(self.sender.stats()["delayed"], 1)
+        self.assertGreater(self.scheduled_countdowns()[-1], 5)
+
+    @override_settings(TELEGRAM_BURST=1, TELEGRAM_MESSAGES_PER_MINUTE=20)
+    def test_empty_bucket_delays_the_flush(self):
+        self.enqueue("first")
+        self.sender.flush(CHAT_ID)
+        self.enqueue("second", "third")
+        self.sender.flush(CHAT_ID)
+
+        self.assertEqual(len(self.api.messages), 1)
+        self.assertEqual(self.sender.stats()["delayed"], 2)
+        self.assertAlmostEqual(self.scheduled_countdowns()[-1], 3, places=0)
+
+    @override_settings(TELEGRAM_MAX_PENDING=2)
+    def test_events_over_the_pending_limit_are_dropped(self):
+        self.enqueue("first", "second", "third")
+
+        self.assertEqual(
+            self.sender.backend.pop_all(CHAT_ID), ["first", "second"]
+        )
+        self.assertEqual(self.sender.stats()["dropped"], 1)
+
+    def test_messages_wait_for_the_transaction(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.sender.enqueue(CHAT_ID, "rolled back?")
+
+        self.assertEqual(self.sender.backend.pending(CHAT_ID), 0)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_digest_overflow_goes_out_with_the_next_digest(self):
+        self.enqueue(*(f"{n}" * 1000 for n in range(6)))
+        self.sender.flush(CHAT_ID)
+
+        self.assertEqual(len(self.api.messages), 1)
+        self.assertEqual(
+            self.sender.backend.pop_all(CHAT_ID), ["4" * 1000, "5" * 1000]
+        )
+        self.assertEqual(self.scheduled_countdowns(), [5, 0])
+        self.assertEqual(
+            self.sender.stats(),
+            {"sent": 1, "merged": 3, "delayed": 2, "dropped": 0, "failed": 0},
+        )
+
+    def test_without_redis_the_queuing_process_sends(self):
+        web, worker = TelegramSender(deliver), TelegramSender(deliver)
+
+        with patch("taxi.services.telegram_sender.threading.Timer") as timer:
+            self.enqueue("order 1", sender=web)
+        worker.flush(CHAT_ID)
+
+        self.assertEqual(self.api.messages, [])
+        timer.assert_called_once_with(0, web.flush, [CHAT_ID])
+        web.flush(CHAT_ID)
+        self.assertEqual(self.api.messages, [(CHAT_ID, "order 1")])
+        self.app.send_task.assert_not_called()
+
+    @override_settings(TELEGRAM_BURST=1, TELEGRAM_MESSAGES_PER_MINUTE=20)
+    def test_without_redis_a_timer_flushes_when_a_token_is_free(self):
+        sender = TelegramSender(deliver)
+
+        with patch("taxi.services.telegram_sender.threading.Timer") as timer:
+            self.enqueue("first", sender=sender)
+            sender.flush(CHAT_ID)
+            self.enqueue("second", "third", sender=sender)
+            sender.flush(CHAT_ID)
+
+        self.assertEqual(self.api.messages, [(CHAT_ID, "first")])
+        self.assertEqual(timer.call_count, 3)
+        countdown, flush, args = timer.call_args.args
+        self.assertAlmostEqual(countdown, 3, places=0)
+        sender.memory_backend.buckets.clear()
+        flush(*args)
+        self.assertEqual(len(self.api.messages), 2)
+        self.assertTrue(self.api.messages[1][1].startswith("2 updates:"))
+
+    def test_digest_is_cut_at_the_message_limit(self):
+        texts = ["x" * 1000] * 6
+
+        message, dropped = digest(texts)
+
+        self.assertLessEqual(len(message), MESSAGE_LIMIT)
+        self.assertEqual(dropped, 2)
+        self.assertTrue(message.endswith("…and 2 more"))
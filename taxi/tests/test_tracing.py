@@ -0,0 +1,102 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from django.test import override_settings
+from django.urls import reverse
+
+from taxi.services import tracing
+from taxi.tasks import reconcile_city_dashboards
+from taxi.tests.base import TestBase
+
+CITY_URL = reverse("taxi:city-list")
+ORDER_URL = reverse("taxi:order-list")
+
+
+class TracingTest(TestBase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.trace_file = Path(directory.name) / "spans.jsonl"
+        settings_override = override_settings(
+            TRACING_ENABLED=True, TRACING_FILE=self.trace_file
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_authenticate(self.default_user)
+
+    def spans(self) -> list[dict]:
+        with self.trace_file.open() as file:
+            return [json.loads(line) for line in file]
+
+    @patch("taxi.services.telegram_helper.bot")
+    @patch("payment.services.payment_helper.stripe_gateway.client")
+    def test_order_creation_is_traced(self, mock_client, mock_bot):
+        sessions = mock_client.return_value.checkout.sessions
+        sessions.create.return_value = Mock(
+            url="https://stripe.test/session", id="session"
+        )
+
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "city": self.default_city.id,
+                "street_from": "Airport",
+                "street_to": "Station",
+                "distance": 500,
+            },
+        )
+
+        spans = self.spans()
+        root = next(span for span in spans if span["parent_id"] is None)
+        names = {span["name"] for span in spans}
+        self.assertEqual(root["name"], "OrderViewSet.create")
+        self.assertEqual(root["trace_id"], res["X-Trace-Id"])
+        self.assertTrue(
+            {
+                "serializer.validate",
+                "db.query",
+                "stripe.checkout.Session.create",
+            }
+            <= names
+        )
+        self.assertEqual(
+            {span["trace_id"] for span in spans}, {root["trace_id"]}
+        )
+
+    def test_incoming_traceparent_is_continued(self):
+        trace_id = "0af7651916cd43dd8448eb211c80319c"
+
+        self.client.get(
+            CITY_URL,
+            HTTP_TRACEPARENT=f"00-{trace_id}-b7ad6b7169203331-01",
+        )
+
+        root = next(
+            span for span in self.spans() if span["name"] == "CityViewSet.list"
+        )
+        self.assertEqual(root["trace_id"], trace_id)
+        self.assertEqual(root["parent_id"], "b7ad6b7169203331")
+
+    def test_context_is_propagated_into_celery_tasks(self):
+        headers = {}
+        with tracing.span("publisher") as publisher:
+            tracing.inject_trace_headers(headers=headers)
+
+        reconcile_city_dashboards.apply(headers=headers)
+
+        task_span = next(
+            span
+            for span in self.spans()
+            if span["name"] == "celery.taxi.tasks.reconcile_city_dashboards"
+        )
+        self.assertEqual(task_span["trace_id"], publisher.trace_id)
+        self.assertEqual(task_span["parent_id"], publisher.span_id)
+
+    @override_settings(TRACING_ENABLED=False)
+    def test_nothing_is_recorded_when_disabled(self):
+        self.client.get(CITY_URL)
+
+        self.assertFalse(self.trace_file.exists())
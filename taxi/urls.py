@@ -8,6 +8,10 @@ from taxi.views import (
     OrderViewSet,
     RideViewSet,
     CarViewSet,
+    SearchViewSet,
+    ProfileViewSet,
+    SlowQueryViewSet,
+    metrics,
 )
 
 app_name = "taxi"
@@ -19,5 +23,8 @@ router.register("drivers", DriverViewSet)
 router.register("orders", OrderViewSet)
 router.register("rides", RideViewSet)
 router.register("cars", CarViewSet)
+router.register("search", SearchViewSet, basename="search")
+router.register("profiles", ProfileViewSet, basename="profile")
+router.register("slow_queries", SlowQueryViewSet, basename="slow-query")
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [path("metrics/", metrics, name="metrics")]
@@ -1,16 +1,34 @@
-from datetime import datetime
+import hmac
+from datetime import datetime, timedelta
 
+from django.conf import settings
 from django.db import transaction
 from django.db.models import Q, Avg, QuerySet
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse
+from django.utils import timezone
+from django_filters import FilterSet
 from rest_framework.decorators import action
+from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
+from prometheus_client import CONTENT_TYPE_LATEST
 from rest_framework import mixins, status, serializers
 
 from payment.services.payment_helper import payment_helper
-from taxi.models import City, DriverApplication, Driver, Order, Ride, Car
+from taxi.models import (
+    City,
+    CityHourlyStats,
+    CityStats,
+    DriverApplication,
+    Driver,
+    Order,
+    Ride,
+    RideSummary,
+    Car,
+)
+from taxi.services import city_stats
 from taxi.services.filters import (
     CarFilters,
     CityFilters,
@@ -18,54 +36,170 @@ from taxi.services.filters import (
     DriverFilters,
     OrderFilters,
     RideFilters,
+    RideSummaryFilters,
+)
+from taxi.services.application_review import bulk_review_applications
+from taxi.services.batch import run_batch
+from taxi.services.demand import demand_counters
+from taxi.services.driver_dashboard import driver_dashboard
+from taxi.services.fast_list import FastListMixin
+from taxi.services.fieldsets import SparseFieldsetMixin
+from taxi.services.idempotency import idempotent
+from taxi.services.leaderboard import driver_leaderboard
+from taxi.services.metrics import render_metrics
+from taxi.services.permissions import (
+    IsAdminOrReadOnly,
+    IsDriver,
+    IsDriverOrAdminUser,
+    is_staff_request,
 )
-from taxi.services.permissions import IsAdminOrReadOnly, IsDriverOrAdminUser
+from taxi.services.profiling import profile_store
+from taxi.services.search import search_cars, search_cities, search_drivers
+from taxi.services.slow_queries import top_slow_queries
+from taxi.services.street_index import street_index
 from taxi.serializers import (
     CitySerializer,
+    CityAdminSerializer,
+    CityStatsSerializer,
+    CityHourlyStatsSerializer,
+    CityDashboardQuerySerializer,
+    CitySurgeSerializer,
+    StreetAutocompleteQuerySerializer,
+    StreetSuggestionSerializer,
     DriverApplicationSerializer,
     DriverSerializer,
     DriverApplicationListSerializer,
     DriverApplicationDetailSerializer,
+    DriverApplicationBulkReviewSerializer,
     OrderSerializer,
     TakeOrderSerializer,
     RideListSerializer,
+    RideSummaryListSerializer,
     CarSerializer,
     DriverListSerializer,
     DriverDetailSerializer,
+    DriverDashboardSerializer,
+    DriverLeaderboardQuerySerializer,
     OrderListSerializer,
     OrderDetailSerializer,
     RideDetailSerializer,
     RideRateSerializer,
+    SearchQuerySerializer,
+    DriverSearchSerializer,
+    CitySearchSerializer,
+    CarSearchSerializer,
+    SlowQuerySerializer,
+    SlowQueryTopSerializer,
+    BatchSerializer,
 )
 from taxi.services.telegram_helper import send_message
 
 
-class CityViewSet(ModelViewSet):
+class CityViewSet(SparseFieldsetMixin, ModelViewSet):
     queryset = City.objects.all()
     serializer_class = CitySerializer
     permission_classes = [IsAdminOrReadOnly]
     filterset_class = CityFilters
 
+    def get_serializer_class(self) -> serializers.SerializerMetaclass:
+        if self.request.user.is_staff:
+            return CityAdminSerializer
+        return CitySerializer
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[IsAdminUser],
+    )
+    def dashboard(self, request: Request, pk: int = None) -> Response:
+        """
+        Operations figures for the city, read from the rollup tables.
+        Only admin have permissions to do that.
+        `hours` (1-168, default 24) sets the length of the hourly series.
+        """
+        city = self.get_object()
+        query_serializer = CityDashboardQuerySerializer(
+            data=request.query_params
+        )
+        query_serializer.is_valid(raise_exception=True)
+        since = city_stats.truncate_hour(
+            timezone.now()
+            - timedelta(hours=query_serializer.validated_data["hours"] - 1)
+        )
+        stats = CityStats.objects.filter(city=city).first() or CityStats(
+            city=city
+        )
+        hourly = CityHourlyStats.objects.filter(city=city, hour__gte=since)
+        return Response(
+            {
+                "city": CitySerializer(city).data,
+                **CityStatsSerializer(stats).data,
+                "hourly": CityHourlyStatsSerializer(hourly, many=True).data,
+            },
+            status=status.HTTP_200_OK,
+        )
 
-class CarViewSet(ModelViewSet):
+    @action(
+        detail=True,
+        methods=["get"],
+    )
+    def surge(self, request: Request, pk: int = None) -> Response:
+        """
+        Current supply and demand of the city and the surge multiplier
+        applied to new orders.
+        """
+        city = self.get_object()
+        snapshot = demand_counters.snapshot(city.id)
+        snapshot["multiplier"] = demand_counters.multiplier(snapshot)
+        return Response(
+            {"city": city.id, **CitySurgeSerializer(snapshot).data},
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=True,
+        methods=["get"],
+    )
+    def streets(self, request: Request, pk: int = None) -> Response:
+        """
+        Autocomplete street names of the city by prefix (`q`),
+        most used in past orders first. `limit` is 1-20, default 10.
+        """
+        city = self.get_object()
+        query_serializer = StreetAutocompleteQuerySerializer(
+            data=request.query_params
+        )
+        query_serializer.is_valid(raise_exception=True)
+        suggestions = street_index.complete(
+            city.id,
+            query_serializer.validated_data["q"],
+            query_serializer.validated_data["limit"],
+        )
+        return Response(
+            StreetSuggestionSerializer(suggestions, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+class CarViewSet(SparseFieldsetMixin, ModelViewSet):
     queryset = Car.objects.all()
     serializer_class = CarSerializer
     permission_classes = [IsDriverOrAdminUser]
     filterset_class = CarFilters
 
     def get_queryset(self) -> QuerySet:
-        queryset = self.queryset.all()
+        queryset = super().get_queryset()
         if not self.request.user.is_staff:
             queryset = queryset.filter(driver__user=self.request.user)
         return queryset
 
 
-class DriverApplicationViewSet(ModelViewSet):
-    queryset = DriverApplication.objects.select_related("user", "city")
+class DriverApplicationViewSet(SparseFieldsetMixin, ModelViewSet):
+    queryset = DriverApplication.objects.all()
     filterset_class = DriverApplicationFilters
 
     def get_queryset(self) -> QuerySet:
-        queryset = self.queryset.all()
+        queryset = super().get_queryset()
         if not self.request.user.is_staff:
             queryset = queryset.filter(user=self.request.user)
         return queryset
@@ -75,6 +209,8 @@ class DriverApplicationViewSet(ModelViewSet):
             return DriverApplicationListSerializer
         if self.action == "retrieve":
             return DriverApplicationDetailSerializer
+        if self.action == "bulk_review":
+            return DriverApplicationBulkReviewSerializer
         return DriverApplicationSerializer
 
     def get_permissions(self) -> list:
@@ -84,6 +220,7 @@ class DriverApplicationViewSet(ModelViewSet):
             "destroy",
             "reject",
             "apply",
+            "bulk_review",
         ]:
             return [IsAdminUser()]
         return [IsAuthenticated()]
@@ -116,6 +253,9 @@ class DriverApplicationViewSet(ModelViewSet):
             application.status = "A"
             application.reviewed_at = datetime.now()
             application.save()
+            transaction.on_commit(
+                lambda: demand_counters.record_drivers_freed(driver.city_id)
+            )
             driver_serializer = DriverSerializer(driver)
             return Response(
                 driver_serializer.data, status=status.HTTP_201_CREATED
@@ -142,6 +282,24 @@ class DriverApplicationViewSet(ModelViewSet):
             serializer = self.get_serializer_class()(application)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=["post"],
+    )
+    def bulk_review(self, request: Request) -> Response:
+        """
+        Approve ("A") or reject ("R") a list of applications at once.
+        Only admin have permissions to do that.
+        Returns the result for every requested id.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_review_applications(
+            serializer.validated_data["ids"],
+            serializer.validated_data["status"],
+        )
+        return Response(results, status=status.HTTP_200_OK)
+
     def create(self, request: Request, *args, **kwargs) -> Response:
         """
         User can apply for a driver. Only admin can see all applications.
@@ -152,11 +310,13 @@ class DriverApplicationViewSet(ModelViewSet):
 
 
 class DriverViewSet(
+    SparseFieldsetMixin,
+    FastListMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     GenericViewSet,
 ):
-    queryset = Driver.objects.select_related("user", "city")
+    queryset = Driver.objects.all()
     filterset_class = DriverFilters
 
     def get_serializer_class(self) -> serializers.SerializerMetaclass:
@@ -164,11 +324,15 @@ class DriverViewSet(
             return DriverListSerializer
         if self.action == "retrieve":
             return DriverDetailSerializer
+        if self.action == "dashboard":
+            return DriverDashboardSerializer
         return DriverSerializer
 
     def get_permissions(self) -> list:
         if self.action in ["update", "partial_update", "destroy", "fire"]:
             return [IsAdminUser()]
+        if self.action == "dashboard":
+            return [IsDriver()]
         return [AllowAny()]
 
     @action(
@@ -184,20 +348,94 @@ class DriverViewSet(
             user = driver.user
             user.is_driver = False
             user.save()
+            city_id, driver_id = driver.city_id, driver.id
+            transaction.on_commit(
+                lambda: driver_leaderboard.remove(city_id, driver_id)
+            )
+            if not Ride.objects.filter(
+                driver=driver, status__in=["1", "2"]
+            ).exists():
+                transaction.on_commit(
+                    lambda: demand_counters.record_drivers_removed(
+                        driver.city_id
+                    )
+                )
             driver.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(
+        detail=False,
+        methods=["get"],
+    )
+    def leaderboard(self, request: Request) -> Response:
+        """
+        Top rated drivers of the `city`, `limit` (1-100, default 10)
+        sets how many are returned.
+        """
+        query_serializer = DriverLeaderboardQuerySerializer(
+            data=request.query_params
+        )
+        query_serializer.is_valid(raise_exception=True)
+        top = driver_leaderboard.top(
+            query_serializer.validated_data["city"].id,
+            query_serializer.validated_data["limit"],
+        )
+        drivers = Driver.objects.select_related("user").in_bulk(
+            [driver_id for driver_id, score in top]
+        )
+        return Response(
+            [
+                {"rank": rank, **DriverListSerializer(drivers[driver_id]).data}
+                for rank, (driver_id, score) in enumerate(top, start=1)
+                if driver_id in drivers
+            ],
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="me/dashboard",
+    )
+    def dashboard(self, request: Request) -> Response:
+        """
+        Today's, this week's and all-time rides, finished distance and
+        paid earnings of the current driver, with their rating
+        breakdown. Cached until one of the driver's rides changes.
+        """
+        return Response(
+            self.get_serializer(driver_dashboard.get(request.user.id)).data,
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=True,
+        methods=["get"],
+    )
+    def rank(self, request: Request, pk: int = None) -> Response:
+        """
+        Position of the driver in the leaderboard of his city.
+        """
+        driver = self.get_object()
+        return Response(
+            {
+                "rank": driver_leaderboard.rank(driver),
+                **DriverListSerializer(driver).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
 
 class OrderViewSet(
+    SparseFieldsetMixin,
+    FastListMixin,
     GenericViewSet,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
 ):
-    queryset = Order.objects.select_related("user", "city").prefetch_related(
-        "payment"
-    )
+    queryset = Order.objects.all()
     filterset_class = OrderFilters
 
     def get_serializer_class(self) -> serializers.SerializerMetaclass:
@@ -210,7 +448,7 @@ class OrderViewSet(
         return OrderSerializer
 
     def get_queryset(self) -> QuerySet:
-        queryset = self.queryset.all()
+        queryset = super().get_queryset()
         if not self.request.user.is_staff:
             if not self.request.user.is_driver:
                 queryset = queryset.filter(user=self.request.user)
@@ -228,34 +466,49 @@ class OrderViewSet(
             return [IsDriverOrAdminUser()]
         return [IsAuthenticated()]
 
+    @idempotent
     def create(self, request: Request, *args, **kwargs) -> Response:
         """
         User can't create an order if he already has an active order.
         User can't create and order if he has pending payment.
         Distance must be greater than 50.
+        Send an `Idempotency-Key` header to make retries safe.
         """
         serializer = self.get_serializer_class()(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        return payment_helper(order=serializer.instance)
+        with transaction.atomic():
+            self.perform_create(serializer)
+            response = payment_helper(order=serializer.instance)
+            # Without a checkout session the order could never be paid
+            # and would block the user's next one.
+            if response.status_code != status.HTTP_201_CREATED:
+                transaction.set_rollback(True)
+        return response
 
     @action(
         detail=True,
         methods=["post"],
     )
+    @idempotent
     def take_order(self, request: Request, pk: int = None) -> Response:
         """
         Take an active order. Only driver have permissions to do that.
         Driver can take only one order at a time.
         Driver can't take an order if he has an active ride.
         Driver must choose a car for the order.
+        Send an `Idempotency-Key` header to make retries safe.
         """
         with transaction.atomic():
             order = self.get_object()
-            order.is_active = False
-            order.save()
+            # The expiry sweeper may close and refund the order meanwhile.
+            order = Order.objects.select_for_update().get(pk=order.pk)
+            if not order.is_active:
+                return Response(
+                    "The order is no longer active",
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             driver = Driver.objects.get(user=self.request.user)
             if Ride.objects.filter(
                 driver=driver, status__in=["1", "2"]
@@ -264,9 +517,19 @@ class OrderViewSet(
                     "You already have an active ride",
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+            city_stats.record_orders_closed(order.city_id)
+            order.is_active = False
+            order.save()
             car_id = request.data.get("car")
             car = Car.objects.get(id=car_id)
             ride = Ride.objects.create(order=order, driver=driver, car=car)
+            city_stats.record_ride_status(order.city_id, None, ride.status)
+            transaction.on_commit(
+                lambda: demand_counters.record_order_taken(order.city_id)
+            )
+            transaction.on_commit(
+                lambda: demand_counters.record_drivers_removed(driver.city_id)
+            )
             serializer = RideListSerializer(ride)
             telegram_message = (
                 f"Driver {driver.user.full_name} has taken order #{order.id}."
@@ -276,39 +539,54 @@ class OrderViewSet(
 
 
 class RideViewSet(
+    SparseFieldsetMixin,
+    FastListMixin,
     GenericViewSet,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.DestroyModelMixin,
 ):
     queryset = Ride.objects.all()
-    filterset_class = RideFilters
+
+    @property
+    def filterset_class(self) -> type[FilterSet]:
+        if self.action == "list":
+            return RideSummaryFilters
+        return RideFilters
+
+    def visible_rides(self, user_lookup: str, driver_lookup: str) -> Q:
+        user = self.request.user
+        if not user.is_staff and not user.is_driver:
+            return Q(**{user_lookup: user})
+        if user.is_driver:
+            return Q(**{driver_lookup: user}) | Q(**{user_lookup: user})
+        return Q()
 
     def get_queryset(self) -> QuerySet:
-        queryset = self.queryset.select_related(
-            "order__user",
-            "order__city",
-            "car",
-            "driver__user",
-            "order__payment",
-            "driver__city",
-        )
-        if not self.request.user.is_staff and not self.request.user.is_driver:
-            queryset = queryset.filter(order__user=self.request.user)
-        elif self.request.user.is_driver:
-            queryset = queryset.filter(
-                Q(driver__user=self.request.user)
-                | Q(order__user=self.request.user)
+        if self.action == "list":
+            return RideSummary.objects.filter(
+                self.visible_rides("user", "driver_user")
             )
-        return queryset
+        return (
+            super()
+            .get_queryset()
+            .filter(self.visible_rides("order__user", "driver__user"))
+        )
 
     def get_serializer_class(self) -> serializers.SerializerMetaclass:
+        if self.action == "list":
+            return RideSummaryListSerializer
         if self.action == "retrieve":
             return RideDetailSerializer
         if self.action == "rate_ride":
             return RideRateSerializer
         return RideListSerializer
 
+    def get_join_serializer_class(self) -> serializers.SerializerMetaclass:
+        if self.action == "rate_ride":
+            return RideDetailSerializer
+        return super().get_join_serializer_class()
+
     def get_permissions(self) -> list:
         if self.action == "destroy":
             return [IsAdminUser()]
@@ -327,6 +605,7 @@ class RideViewSet(
         """
         with transaction.atomic():
             ride = self.get_object()
+            city_stats.record_ride_status(ride.order.city_id, ride.status, "2")
             ride.status = "2"
             ride.save()
             serializer = self.get_serializer_class()(ride)
@@ -343,6 +622,13 @@ class RideViewSet(
         """
         with transaction.atomic():
             ride = self.get_object()
+            city_stats.record_ride_status(ride.order.city_id, ride.status, "3")
+            if ride.status != "3":
+                transaction.on_commit(
+                    lambda: demand_counters.record_drivers_freed(
+                        ride.driver.city_id
+                    )
+                )
             ride.status = "3"
             ride.save()
             serializer = self.get_serializer_class()(ride)
@@ -382,5 +668,121 @@ class RideViewSet(
                 Avg("rate")
             )["rate__avg"]
             driver.save()
+            transaction.on_commit(lambda: driver_leaderboard.update(driver))
             serializer = RideDetailSerializer(ride)
             return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class SearchViewSet(GenericViewSet):
+    serializer_class = SearchQuerySerializer
+    permission_classes = [AllowAny]
+
+    def list(self, request: Request) -> Response:
+        """
+        Ranked fuzzy search over driver names and city names.
+        Car numbers are searched for admins only.
+        `q` needs at least 3 characters, `limit` is per section (max 50).
+        """
+        query_serializer = self.get_serializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        query = query_serializer.validated_data["q"]
+        limit = query_serializer.validated_data["limit"]
+        results = {
+            "drivers": DriverSearchSerializer(
+                search_drivers(query, limit), many=True
+            ).data,
+            "cities": CitySearchSerializer(
+                search_cities(query, limit), many=True
+            ).data,
+        }
+        if request.user.is_staff:
+            results["cars"] = CarSearchSerializer(
+                search_cars(query, limit), many=True
+            ).data
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class ProfileViewSet(GenericViewSet):
+    permission_classes = [IsAdminUser]
+    lookup_value_regex = r"\d+-\d+"
+
+    def list(self, request: Request) -> Response:
+        """
+        Request profiles captured by the sampling profiler, newest first.
+        Only admin have permissions to do that.
+        """
+        return Response(profile_store.list(), status=status.HTTP_200_OK)
+
+    def retrieve(self, request: Request, pk: str = None) -> Response:
+        """
+        Full profile: SQL statements by duration, Stripe and Telegram
+        calls and the top functions by cumulative time.
+        """
+        summary = profile_store.get(pk)
+        if summary is None:
+            raise Http404
+        return Response(summary, status=status.HTTP_200_OK)
+
+    @action(
+        detail=True,
+        methods=["get"],
+    )
+    def stats(self, request: Request, pk: str = None) -> FileResponse:
+        """Raw pstats dump of the profile, e.g. for snakeviz."""
+        path = profile_store.stats_path(pk)
+        if path is None:
+            raise Http404
+        return FileResponse(path.open("rb"), as_attachment=True)
+
+
+class SlowQueryViewSet(GenericViewSet):
+    serializer_class = SlowQuerySerializer
+    permission_classes = [IsAdminUser]
+
+    def list(self, request: Request) -> Response:
+        """
+        Top slow statements by fingerprint with their worst origin and
+        stack. `order` is total_ms (default), p95_ms, max_ms or count;
+        `limit` is 1-100, default 20.
+        """
+        query_serializer = SlowQueryTopSerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        slow_queries = top_slow_queries(**query_serializer.validated_data)
+        return Response(
+            self.get_serializer(slow_queries, many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+class BatchView(GenericAPIView):
+    serializer_class = BatchSerializer
+    permission_classes = [IsAuthenticated]
+    # Every item goes through its own view's throttles.
+    throttle_classes = []
+
+    def post(self, request: Request) -> Response:
+        """
+        Run up to BATCH_MAX_REQUESTS GET requests to the API in one
+        round trip, authenticated once. Responses come back in request
+        order with their own status code.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        responses = run_batch(request, serializer.validated_data["requests"])
+        return Response({"responses": responses}, status=status.HTTP_200_OK)
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Prometheus scrape endpoint. When METRICS_TOKEN is set the scraper
+    must send it as a bearer token, otherwise only staff may read it.
+    """
+    if settings.METRICS_TOKEN:
+        if not hmac.compare_digest(
+            request.headers.get("Authorization", ""),
+            f"Bearer {settings.METRICS_TOKEN}",
+        ):
+            return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    elif not is_staff_request(request):
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
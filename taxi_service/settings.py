@@ -12,10 +12,12 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import os
 from datetime import timedelta
+from decimal import Decimal
 from pathlib import Path
 
 from celery.schedules import crontab
 from dotenv import load_dotenv
+from kombu import Exchange, Queue
 
 
 load_dotenv()
@@ -47,6 +49,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "drf_spectacular",
     "rest_framework",
     "debug_toolbar",
@@ -58,6 +61,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "taxi.middleware.MetricsMiddleware",
+    "taxi.middleware.TracingMiddleware",
+    "taxi.middleware.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -66,6 +72,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "taxi.middleware.SamplingProfilerMiddleware",
 ]
 
 ROOT_URLCONF = "taxi_service.urls"
@@ -162,6 +169,17 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "taxi.services.renderers.OrjsonRenderer",
+        "taxi.services.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "taxi.services.parsers.OrjsonParser",
+        "taxi.services.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 SIMPLE_JWT = {
@@ -184,9 +202,88 @@ SPECTACULAR_SETTINGS = {
 }
 
 STRIPE_SECRET_KEY = os.getenv("STRIPE_API_KEY")
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE")
+STRIPE_CONNECT_TIMEOUT_SECONDS = 3
+STRIPE_TIMEOUT = 10
+STRIPE_TIMEOUTS = {
+    "checkout.Session.create": 10,
+    "checkout.Session.expire": 5,
+    "checkout.Session.retrieve": 5,
+    "Refund.create": 10,
+}
+STRIPE_MAX_RETRIES = 2
+STRIPE_RETRY_BACKOFF_SECONDS = 0.25
+STRIPE_BREAKER_FAILURES = 5
+STRIPE_BREAKER_RESET_SECONDS = 30
 
 SITE_DOMAIN = "http://127.0.0.1:8000/"
 
+REDIS_URL = os.getenv("REDIS_URL")
+
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+        if REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
+SURGE_WINDOW_SECONDS = 600
+SURGE_BUCKET_SECONDS = 10
+SURGE_STEP = Decimal("0.25")
+SURGE_MAX_MULTIPLIER = Decimal("3.0")
+
+ROUTING_BACKEND = "taxi.services.routing.OrderHistoryRoutingBackend"
+ROUTING_CACHE_SIZE = 10000
+ROUTING_MIN_SAMPLES = 3
+ROUTING_ESTIMATE_TTL_SECONDS = 24 * 60 * 60
+ROUTING_NEGATIVE_TTL_SECONDS = 5 * 60
+
+STREET_INDEX_REFRESH_SECONDS = 30
+
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+PROFILER_HEADER = "X-Profile"
+PROFILER_DIR = os.getenv("PROFILER_DIR", BASE_DIR / "profiles")
+PROFILER_RING_SIZE = 200
+PROFILER_TOP_FUNCTIONS = 40
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED") == "1"
+TRACING_FILE = os.getenv("TRACING_FILE", BASE_DIR / "traces" / "spans.jsonl")
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_FLUSH_SECONDS = 60
+SLOW_QUERY_SAMPLES = 200
+
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
+TELEGRAM_DIGEST_WINDOW_SECONDS = 5
+TELEGRAM_MESSAGES_PER_MINUTE = 20
+TELEGRAM_BURST = 3
+TELEGRAM_MAX_PENDING = 200
+
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_LOCK_SECONDS = 30
+IDEMPOTENCY_WAIT_SECONDS = 10
+
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 8
+
+DRIVER_DASHBOARD_CACHE_SECONDS = 10 * 60
+
+ORDER_TTL_MINUTES = 30
+ORDER_EXPIRY_BATCH_SIZE = 500
+ORDER_EXPIRY_RESYNC_SECONDS = 600
+
+PENDING_PAYMENT_TTL_MINUTES = 60
+PENDING_PAYMENT_CHUNK_SIZE = 500
+PENDING_PAYMENT_EXPIRE_SESSIONS = (
+    os.getenv("PENDING_PAYMENT_EXPIRE_SESSIONS") == "1"
+)
+
 CELERY_BROKER_URL = os.environ["CELERY_BROKER_URL"]
 CELERY_RESULT_BACKEND = os.environ["CELERY_RESULT_BACKEND"]
 CELERY_ACCEPT_CONTENT = ["json"]
@@ -194,9 +291,62 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Europe/Kiev"
 
+# Reports get a queue of their own so dispatch tasks are not queued
+# behind them; the compose "queues" profile runs a worker per queue.
+# Priorities go from 0 (highest) to 9, as the Redis transport orders
+# them; RabbitMQ reads them the other way round, so the broker must be
+# Redis.
+CELERY_TASK_QUEUES = [
+    Queue(name, Exchange(name), routing_key=name)
+    for name in ("dispatch", "notifications", "payments", "reports")
+]
+CELERY_TASK_DEFAULT_QUEUE = "dispatch"
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_TASK_ROUTES = {
+    "taxi.tasks.expire_unclaimed_orders": {"queue": "dispatch", "priority": 0},
+    "taxi.tasks.queue_probe": {"queue": "dispatch", "priority": 0},
+    "taxi.tasks.notify_expired_orders": {
+        "queue": "notifications",
+        "priority": 3,
+    },
+    "taxi.tasks.flush_telegram_chat": {
+        "queue": "notifications",
+        "priority": 3,
+    },
+    "payment.tasks.expire_stale_payments": {
+        "queue": "payments",
+        "priority": 3,
+    },
+    "payment.tasks.refund_payment": {"queue": "payments", "priority": 3},
+    "taxi.tasks.reconcile_city_dashboards": {
+        "queue": "reports",
+        "priority": 7,
+    },
+    "payment.tasks.check_daily_profit": {"queue": "reports", "priority": 9},
+    "taxi.tasks.queue_load": {"queue": "reports", "priority": 9},
+}
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
 CELERY_BEAT_SCHEDULE = {
     "Task_one_schedule": {
         "task": "payment.tasks.check_daily_profit",
         "schedule": crontab(minute=59, hour=23),
-    }
+    },
+    "reconcile_city_dashboards": {
+        "task": "taxi.tasks.reconcile_city_dashboards",
+        "schedule": crontab(minute="*/15"),
+    },
+    "expire_unclaimed_orders": {
+        "task": "taxi.tasks.expire_unclaimed_orders",
+        "schedule": crontab(),
+    },
+    "expire_stale_payments": {
+        "task": "payment.tasks.expire_stale_payments",
+        "schedule": crontab(minute="*/5"),
+    },
 }
@@ -20,6 +20,8 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from taxi.views import BatchView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/user/", include("user.urls", namespace="user")),
@@ -31,4 +33,5 @@ urlpatterns = [
         name="swagger-ui",
     ),
     path("api/v1/payment/", include("payment.urls", namespace="payment")),
+    path("api/v1/batch/", BatchView.as_view(), name="batch"),
 ] + debug_toolbar_urls()